@@ -1,4 +1,6 @@
 from model.loader import load_model
+from agents.transcript_compaction import compact_turns
+from prompts.evidence_packing import at_turn
 from prompts.templates_four import (
     get_system_prompt,
     user_prompt_opening_pro1,
@@ -171,29 +173,32 @@ def run_four_agents_intent(claim, evidence):
     reformulated_con = reformulation_result["reformulated_con"]
     
     # Step 2: Opening statements (pro agents use reformulated pro claim, con agents use reformulated con claim)
-    pro1_open = opening_pro1(reformulated_pro, evidence)
-    pro2_open = opening_pro2(reformulated_pro, evidence)
-    con1_open = opening_con1(reformulated_con, evidence)
-    con2_open = opening_con2(reformulated_con, evidence)
+    pro1_open = opening_pro1(reformulated_pro, at_turn(evidence, "opening"))
+    pro2_open = opening_pro2(reformulated_pro, at_turn(evidence, "opening"))
+    con1_open = opening_con1(reformulated_con, at_turn(evidence, "opening"))
+    con2_open = opening_con2(reformulated_con, at_turn(evidence, "opening"))
     
     # Step 3: Rebuttals
-    pro1_rebut = rebuttal_pro1(reformulated_pro, evidence, con1_open, con2_open)
-    pro2_rebut = rebuttal_pro2(reformulated_pro, evidence, con1_open, con2_open)
-    con1_rebut = rebuttal_con1(reformulated_con, evidence, pro1_open, pro2_open)
-    con2_rebut = rebuttal_con2(reformulated_con, evidence, pro1_open, pro2_open)
+    pro1_rebut = rebuttal_pro1(reformulated_pro, at_turn(evidence, "rebuttal"), con1_open, con2_open)
+    pro2_rebut = rebuttal_pro2(reformulated_pro, at_turn(evidence, "rebuttal"), con1_open, con2_open)
+    con1_rebut = rebuttal_con1(reformulated_con, at_turn(evidence, "rebuttal"), pro1_open, pro2_open)
+    con2_rebut = rebuttal_con2(reformulated_con, at_turn(evidence, "rebuttal"), pro1_open, pro2_open)
     
     # Step 4: Closings
-    pro1_close = closing_pro1(reformulated_pro, evidence)
-    pro2_close = closing_pro2(reformulated_pro, evidence)
-    con1_close = closing_con1(reformulated_con, evidence)
-    con2_close = closing_con2(reformulated_con, evidence)
+    pro1_close = closing_pro1(reformulated_pro, at_turn(evidence, "closing"))
+    pro2_close = closing_pro2(reformulated_pro, at_turn(evidence, "closing"))
+    con1_close = closing_con1(reformulated_con, at_turn(evidence, "closing"))
+    con2_close = closing_con2(reformulated_con, at_turn(evidence, "closing"))
     
     # Step 5: Judge verdict
     final_result = judge_final_verdict(
-        claim, evidence,
-        pro1_open, pro2_open, con1_open, con2_open,
-        pro1_rebut, pro2_rebut, con1_rebut, con2_rebut,
-        pro1_close, pro2_close, con1_close, con2_close
+        claim, at_turn(evidence, "judge"),
+        *compact_turns(
+            claim,
+            pro1_opening=pro1_open, pro2_opening=pro2_open, con1_opening=con1_open, con2_opening=con2_open,
+            pro1_rebuttal=pro1_rebut, pro2_rebuttal=pro2_rebut, con1_rebuttal=con1_rebut, con2_rebuttal=con2_rebut,
+            pro1_closing=pro1_close, pro2_closing=pro2_close, con1_closing=con1_close, con2_closing=con2_close
+        )
     )
     
     return {
@@ -1,4 +1,6 @@
 from model.loader import load_model
+from agents.transcript_compaction import compact_turns
+from prompts.evidence_packing import at_turn
 from prompts.templates_four_people import (
     get_system_prompt,
     user_prompt_opening_politician,
@@ -188,29 +190,35 @@ def run_four_agents_people_intent(claim, evidence):
     domain_specialist = infer_domain_specialist(claim)
     
     # Step 3: Opening statements (politician uses reformulated pro, scientist uses reformulated con)
-    pol_open = opening_politician(reformulated_pro, evidence)
-    sci_open = opening_scientist(reformulated_con, evidence)
-    jour_open = opening_journalist(claim, evidence)  # Journalist uses original claim
-    dom_open = opening_domain_scientist(claim, evidence, domain_specialist)  # Domain scientist uses original claim
+    pol_open = opening_politician(reformulated_pro, at_turn(evidence, "opening"))
+    sci_open = opening_scientist(reformulated_con, at_turn(evidence, "opening"))
+    jour_open = opening_journalist(claim, at_turn(evidence, "opening"))  # Journalist uses original claim
+    dom_open = opening_domain_scientist(claim, at_turn(evidence, "opening"), domain_specialist)  # Domain scientist uses original claim
     
     # Step 4: Rebuttals
-    pol_rebut = rebuttal_politician(reformulated_pro, evidence, sci_open, jour_open, dom_open)
-    sci_rebut = rebuttal_scientist(reformulated_con, evidence, pol_open, jour_open, dom_open)
-    jour_rebut = rebuttal_journalist(claim, evidence, pol_open, sci_open, dom_open)
-    dom_rebut = rebuttal_domain_scientist(claim, evidence, pol_open, sci_open, jour_open, domain_specialist)
+    pol_rebut = rebuttal_politician(reformulated_pro, at_turn(evidence, "rebuttal"), sci_open, jour_open, dom_open)
+    sci_rebut = rebuttal_scientist(reformulated_con, at_turn(evidence, "rebuttal"), pol_open, jour_open, dom_open)
+    jour_rebut = rebuttal_journalist(claim, at_turn(evidence, "rebuttal"), pol_open, sci_open, dom_open)
+    dom_rebut = rebuttal_domain_scientist(claim, at_turn(evidence, "rebuttal"), pol_open, sci_open, jour_open, domain_specialist)
     
     # Step 5: Closings
-    pol_close = closing_politician(reformulated_pro, evidence)
-    sci_close = closing_scientist(reformulated_con, evidence)
-    jour_close = closing_journalist(claim, evidence)
-    dom_close = closing_domain_scientist(claim, evidence, domain_specialist)
+    pol_close = closing_politician(reformulated_pro, at_turn(evidence, "closing"))
+    sci_close = closing_scientist(reformulated_con, at_turn(evidence, "closing"))
+    jour_close = closing_journalist(claim, at_turn(evidence, "closing"))
+    dom_close = closing_domain_scientist(claim, at_turn(evidence, "closing"), domain_specialist)
     
     # Step 6: Judge verdict
     final_result = judge_final_verdict(
-        claim, evidence, 
-        pol_open, sci_open, jour_open, dom_open,
-        pol_rebut, sci_rebut, jour_rebut, dom_rebut,
-        pol_close, sci_close, jour_close, dom_close
+        claim, at_turn(evidence, "judge"),
+        *compact_turns(
+            claim,
+            politician_opening=pol_open, scientist_opening=sci_open,
+            journalist_opening=jour_open, domain_scientist_opening=dom_open,
+            politician_rebuttal=pol_rebut, scientist_rebuttal=sci_rebut,
+            journalist_rebuttal=jour_rebut, domain_scientist_rebuttal=dom_rebut,
+            politician_closing=pol_close, scientist_closing=sci_close,
+            journalist_closing=jour_close, domain_scientist_closing=dom_close
+        )
     )
     
     return {
@@ -1,4 +1,6 @@
+from concurrent.futures import ThreadPoolExecutor
 from model.loader import load_model
+from model.generation import generate_batch
 from prompts.templates import (
     get_system_prompt,
     user_prompt_intent_inference,
@@ -65,6 +67,46 @@ def run_model(system_prompt: str, user_prompt: str, max_tokens: int = 300):
         response = tokenizer.decode(outputs[0], skip_special_tokens=True)
         return response.split("<|assistant|>")[-1].strip()
 
+def run_model_batch(system_prompts: list, user_prompts: list, max_tokens: int = 300, max_workers: int = 8):
+    """Run a batch of prompts: one padded generate call for local models, concurrent requests for GPT"""
+    if model is None:
+        # GPT: issue the requests concurrently, preserving order
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(
+                lambda pair: run_model(pair[0], pair[1], max_tokens=max_tokens),
+                zip(system_prompts, user_prompts)
+            ))
+
+    return generate_batch(tokenizer, model, system_prompts, user_prompts, max_tokens)
+
+def infer_intents_batch(claims, batch_size=16):
+    """Stage 1: infer the intent of every claim, batch_size prompts per model call"""
+    intents = []
+    for i in range(0, len(claims), batch_size):
+        batch = claims[i:i + batch_size]
+        intents.extend(run_model_batch(
+            [get_system_prompt("fact_checker")] * len(batch),
+            [user_prompt_intent_inference(claim) for claim in batch],
+            max_tokens=150
+        ))
+    return intents
+
+def reformulate_claims_batch(claims, intents, batch_size=16):
+    """Stage 2: pro and con reformulations for every claim, both sides sharing one batch"""
+    pros, cons = [], []
+    # Each claim contributes two prompts, so half as many claims fit in a batch
+    step = max(batch_size // 2, 1)
+    for i in range(0, len(claims), step):
+        batch_claims = claims[i:i + step]
+        batch_intents = intents[i:i + step]
+        user_prompts = (
+            [user_prompt_reformulate_pro(claim, intent) for claim, intent in zip(batch_claims, batch_intents)] +
+            [user_prompt_reformulate_con(claim, intent) for claim, intent in zip(batch_claims, batch_intents)]
+        )
+        outputs = run_model_batch([get_system_prompt("debater")] * len(user_prompts), user_prompts, max_tokens=100)
+        pros.extend(outputs[:len(batch_claims)])
+        cons.extend(outputs[len(batch_claims):])
+    return pros, cons
 
 def intent_enhanced_reformulation(claim: str):
 
@@ -84,4 +126,13 @@ def intent_enhanced_reformulation(claim: str):
         "intent": intent,
         "reformulated_pro": reformulated_pro,
         "reformulated_con": reformulated_con
-    }
\ No newline at end of file
+    }
+
+def intent_enhanced_reformulation_batch(claims, batch_size=16):
+    """Batched equivalent of intent_enhanced_reformulation for a list of claims"""
+    intents = infer_intents_batch(claims, batch_size=batch_size)
+    pros, cons = reformulate_claims_batch(claims, intents, batch_size=batch_size)
+    return [
+        {"intent": intent, "reformulated_pro": pro, "reformulated_con": con}
+        for intent, pro, con in zip(intents, pros, cons)
+    ]
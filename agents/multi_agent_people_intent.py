@@ -1,5 +1,7 @@
 
 from model.loader import load_model
+from agents.transcript_compaction import compact_turns
+from prompts.evidence_packing import at_turn
 from prompts.templates_people import (
     get_system_prompt,
     politician_opening_prompt,
@@ -154,18 +156,24 @@ def run_multi_agent_people(claim, evidence):
     reformulated_con = reformulation_result["reformulated_con"]
     
     # Step 2: Politician uses pro reformulation, Scientist uses con reformulation
-    pol_open = opening_politician(reformulated_pro, evidence)
-    sci_open = opening_scientist(reformulated_con, evidence)
+    pol_open = opening_politician(reformulated_pro, at_turn(evidence, "opening"))
+    sci_open = opening_scientist(reformulated_con, at_turn(evidence, "opening"))
     
-    pol_rebut = rebuttal_politician(reformulated_pro, evidence, sci_open)
-    sci_rebut = rebuttal_scientist(reformulated_con, evidence, pol_open)
+    pol_rebut = rebuttal_politician(reformulated_pro, at_turn(evidence, "rebuttal"), sci_open)
+    sci_rebut = rebuttal_scientist(reformulated_con, at_turn(evidence, "rebuttal"), pol_open)
     
-    pol_close = closing_politician(reformulated_pro, evidence)
-    sci_close = closing_scientist(reformulated_con, evidence)
+    pol_close = closing_politician(reformulated_pro, at_turn(evidence, "closing"))
+    sci_close = closing_scientist(reformulated_con, at_turn(evidence, "closing"))
     
     # Step 3: Judge evaluates with original claim but reformulated arguments
     final_verdict = judge_final_verdict(
-        claim, evidence, pol_open, sci_open, pol_rebut, sci_rebut, pol_close, sci_close
+        claim, at_turn(evidence, "judge"),
+        *compact_turns(
+            claim,
+            politician_opening=pol_open, scientist_opening=sci_open,
+            politician_rebuttal=pol_rebut, scientist_rebuttal=sci_rebut,
+            politician_closing=pol_close, scientist_closing=sci_close
+        )
     )
     
     return {
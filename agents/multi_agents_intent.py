@@ -1,4 +1,6 @@
 from model.loader import load_model
+from agents.transcript_compaction import compact_turns
+from prompts.evidence_packing import at_turn
 from prompts.templates import (
     get_system_prompt,
     user_prompt_opening_pro,
@@ -136,18 +138,24 @@ def run_multi_agent_intent(claim, evidence):
     reformulated_con = reformulation_result["reformulated_con"]
     
     # Step 2: Pro agent uses reformulated pro claim, Con agent uses reformulated con claim
-    pro_open = opening_pro(reformulated_pro, evidence)
-    con_open = opening_con(reformulated_con, evidence)
+    pro_open = opening_pro(reformulated_pro, at_turn(evidence, "opening"))
+    con_open = opening_con(reformulated_con, at_turn(evidence, "opening"))
     
-    pro_rebut = rebuttal_pro(reformulated_pro, evidence, con_open)
-    con_rebut = rebuttal_con(reformulated_con, evidence, pro_open)
+    pro_rebut = rebuttal_pro(reformulated_pro, at_turn(evidence, "rebuttal"), con_open)
+    con_rebut = rebuttal_con(reformulated_con, at_turn(evidence, "rebuttal"), pro_open)
     
-    pro_close = closing_pro(reformulated_pro, evidence)
-    con_close = closing_con(reformulated_con, evidence)
+    pro_close = closing_pro(reformulated_pro, at_turn(evidence, "closing"))
+    con_close = closing_con(reformulated_con, at_turn(evidence, "closing"))
     
     # Step 3: Judge evaluates with original claim but reformulated arguments
     final_verdict = judge_final_verdict(
-        claim, evidence, pro_open, con_open, pro_rebut, con_rebut, pro_close, con_close
+        claim, at_turn(evidence, "judge"),
+        *compact_turns(
+            claim,
+            pro_opening=pro_open, con_opening=con_open,
+            pro_rebuttal=pro_rebut, con_rebuttal=con_rebut,
+            pro_closing=pro_close, con_closing=con_close
+        )
     )
     
     return {
@@ -1,4 +1,6 @@
 from model.loader import load_model
+from agents.transcript_compaction import compact_turns
+from prompts.evidence_packing import at_turn
 from prompts.templates_stance_3 import (
     get_system_prompt,
     user_prompt_opening_pro,
@@ -152,32 +154,35 @@ def run_multi_agent_stance_3_intent(claim, evidence):
     reformulated_con = reformulation_result["reformulated_con"]
     
     # Step 2: Generate opening statements for pro and con first (using reformulated claims)
-    pro_open = opening_pro(reformulated_pro, evidence)
-    con_open = opening_con(reformulated_con, evidence)
+    pro_open = opening_pro(reformulated_pro, at_turn(evidence, "opening"))
+    con_open = opening_con(reformulated_con, at_turn(evidence, "opening"))
     
     # Step 3: Generate flexible opening statement (needs pro and con arguments)
-    flex_open = opening_flexible(claim, evidence, pro_open, con_open)
+    flex_open = opening_flexible(claim, at_turn(evidence, "opening"), pro_open, con_open)
     
     # Step 4: Generate rebuttals
-    pro_rebut = rebuttal_pro(reformulated_pro, evidence, con_open)
-    con_rebut = rebuttal_con(reformulated_con, evidence, pro_open)
+    pro_rebut = rebuttal_pro(reformulated_pro, at_turn(evidence, "rebuttal"), con_open)
+    con_rebut = rebuttal_con(reformulated_con, at_turn(evidence, "rebuttal"), pro_open)
     
     # Step 5: Generate flexible rebuttal (needs pro and con arguments)
-    flex_rebut = rebuttal_flexible(claim, evidence, pro_rebut, con_rebut)
+    flex_rebut = rebuttal_flexible(claim, at_turn(evidence, "rebuttal"), pro_rebut, con_rebut)
     
     # Step 6: Generate closings
-    pro_close = closing_pro(reformulated_pro, evidence)
-    con_close = closing_con(reformulated_con, evidence)
+    pro_close = closing_pro(reformulated_pro, at_turn(evidence, "closing"))
+    con_close = closing_con(reformulated_con, at_turn(evidence, "closing"))
     
     # Step 7: Generate flexible closing (needs pro and con arguments)
-    flex_close = closing_flexible(claim, evidence, pro_close, con_close)
+    flex_close = closing_flexible(claim, at_turn(evidence, "closing"), pro_close, con_close)
     
     # Step 8: Judge verdict
     final_result = judge_final_verdict(
-        claim, evidence,
-        flex_open, pro_open, con_open,
-        flex_rebut, pro_rebut, con_rebut,
-        flex_close, pro_close, con_close
+        claim, at_turn(evidence, "judge"),
+        *compact_turns(
+            claim,
+            flexible_opening=flex_open, pro_opening=pro_open, con_opening=con_open,
+            flexible_rebuttal=flex_rebut, pro_rebuttal=pro_rebut, con_rebuttal=con_rebut,
+            flexible_closing=flex_close, pro_closing=pro_close, con_closing=con_close
+        )
     )
     
     return {
@@ -0,0 +1,163 @@
+import os
+import json
+import argparse
+from tqdm import tqdm
+from model.generation import chat_prompt, generate_batch
+from prompts.templates import get_system_prompt, user_prompt_rejudge
+from eval.evaluation import LABELS, parse_verdict, parse_verdict_text, verdict_text
+
+# Global model info - set by set_model_info() or the CLI below
+model_info = None
+
+def set_model_info(info):
+    """Set the global model info"""
+    global model_info
+    model_info = info
+
+def is_gpt(info):
+    first, _ = info
+    return hasattr(first, 'chat') and hasattr(first.chat, 'completions')
+
+def run_model_batch(system_prompt: str, user_prompts: list, max_tokens: int = 200):
+    """Greedy batched generation for local models; one call per prompt for gpt."""
+    if model_info is None:
+        raise ValueError("Model not loaded. Please call set_model_info() first.")
+
+    if is_gpt(model_info):
+        client, model_name = model_info
+        responses = []
+        for user_prompt in user_prompts:
+            response = client.chat.completions.create(
+                model=model_name,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                max_tokens=max_tokens,
+                temperature=0.0
+            )
+            responses.append(response.choices[0].message.content.strip())
+        return responses
+
+    tokenizer, model = model_info
+    return generate_batch(tokenizer, model, [system_prompt] * len(user_prompts), user_prompts, max_tokens)
+
+def constrained_verdicts(system_prompt: str, user_prompts: list):
+    """
+    Constrained decoding for local models: score each label as the continuation
+    of "[VERDICT]:" and take the most likely one, so a verdict is always produced.
+    """
+    import torch
+    tokenizer, model = model_info
+    label_ids = [tokenizer(f" {label}", add_special_tokens=False)["input_ids"] for label in LABELS]
+    verdicts = []
+    for user_prompt in user_prompts:
+        prefix_ids = tokenizer(chat_prompt(system_prompt, user_prompt) + "[VERDICT]:")["input_ids"]
+        sequences = [prefix_ids + ids for ids in label_ids]
+        length = max(map(len, sequences))
+        pad_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+        input_ids = torch.tensor([seq + [pad_id] * (length - len(seq)) for seq in sequences], device=model.device)
+        attention_mask = torch.tensor([[1] * len(seq) + [0] * (length - len(seq)) for seq in sequences], device=model.device)
+        with torch.no_grad():
+            log_probs = torch.log_softmax(model(input_ids=input_ids, attention_mask=attention_mask).logits.float(), dim=-1)
+        scores = []
+        for row, ids in enumerate(label_ids):
+            # Logits at position t predict token t + 1
+            positions = torch.arange(len(prefix_ids) - 1, len(prefix_ids) - 1 + len(ids), device=model.device)
+            targets = torch.tensor(ids, device=model.device)
+            scores.append(log_probs[row, positions, targets].sum().item())
+        verdicts.append(LABELS[max(range(len(LABELS)), key=scores.__getitem__)])
+    return verdicts
+
+def format_transcript(content):
+    """Stored debate turns (every string field except the verdict) as labelled sections."""
+    if not isinstance(content, dict):
+        return ""
+    return "\n\n".join(f"--- {key.replace('_', ' ').title()} ---\n{value}"
+                       for key, value in content.items()
+                       if key not in ("final_verdict", "verdict", "rejudge") and isinstance(value, str) and value.strip())
+
+def find_unparsed(answer_map):
+    return [example_id for example_id, content in answer_map.items() if parse_verdict(content)[1] is None]
+
+def set_verdict(content, text):
+    if isinstance(content, list):
+        content[:1] = [text]
+    else:
+        content["final_verdict"] = text
+
+def rejudge(answer_map, examples, batch_size=8, constrained=False, max_chars=2000):
+    """
+    Re-run only the judge turn for every entry whose verdict no rule can parse,
+    updating answer_map in place. Returns {example_id: method} for the entries
+    that got a parseable verdict ("strict" prompt or "constrained" decoding).
+    """
+    pending = [example_id for example_id in find_unparsed(answer_map) if example_id in examples]
+    repaired = {}
+    system_prompt = get_system_prompt("judge")
+    for start in tqdm(range(0, len(pending), batch_size), desc="Re-judging"):
+        batch = pending[start:start + batch_size]
+        prompts = [user_prompt_rejudge(examples[example_id]["claim"], examples[example_id]["evidence_full_text"],
+                                       format_transcript(answer_map[example_id]),
+                                       verdict_text(answer_map[example_id])[0][:max_chars])
+                   for example_id in batch]
+        outputs = run_model_batch(system_prompt, prompts)
+        retry = []
+        for example_id, prompt, output in zip(batch, prompts, outputs):
+            content = answer_map[example_id]
+            previous, ladder = verdict_text(content)
+            if parse_verdict_text(output, ladder)[1] is None:
+                retry.append((example_id, prompt))
+                continue
+            if isinstance(content, dict):
+                content["rejudge"] = {"method": "strict", "previous_verdict": previous}
+            set_verdict(content, output)
+            repaired[example_id] = "strict"
+        if constrained and retry and not is_gpt(model_info):
+            for (example_id, _), verdict in zip(retry, constrained_verdicts(system_prompt, [p for _, p in retry])):
+                content = answer_map[example_id]
+                previous = verdict_text(content)[0]
+                if isinstance(content, dict):
+                    content["rejudge"] = {"method": "constrained", "previous_verdict": previous}
+                set_verdict(content, f"[VERDICT]: {verdict}")
+                repaired[example_id] = "constrained"
+    return repaired
+
+def main():
+    from model.loader import load_model
+    parser = argparse.ArgumentParser(description="Re-run the judge turn for answer_map entries whose verdict cannot be parsed")
+    parser.add_argument("--answer_map", type=str, required=True, help="Answer map written by main.py, updated in place")
+    parser.add_argument("--input_file", type=str, required=True, help="Input file the answer map was generated from")
+    parser.add_argument("--model", choices=["llama", "qwen", "gpt"], default="llama")
+    parser.add_argument("--model_path", type=str, default=None)
+    parser.add_argument("--api_key", type=str, default=None)
+    parser.add_argument("--batch_size", type=int, default=8)
+    parser.add_argument("--constrained", action="store_true",
+                        help="Local models: if the strict prompt still fails, pick the most likely label after '[VERDICT]:'")
+    args = parser.parse_args()
+
+    with open(args.answer_map, "r") as f:
+        answer_map = json.load(f)
+    with open(args.input_file, "r") as f:
+        examples = json.load(f)
+    unparsed = find_unparsed(answer_map)
+    print(f"{len(unparsed)} of {len(answer_map)} entries have no parseable verdict")
+    if not unparsed:
+        return
+
+    if args.model == "gpt":
+        set_model_info(load_model(model_type=args.model, api_key=args.api_key))
+    else:
+        set_model_info(load_model(model_path=args.model_path, model_type=args.model))
+
+    repaired = rejudge(answer_map, examples, args.batch_size, args.constrained)
+    # Write-then-rename so an interrupted run never leaves a truncated answer map
+    tmp_file = args.answer_map + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(answer_map, f, indent=2)
+    os.replace(tmp_file, args.answer_map)
+    methods = {method: list(repaired.values()).count(method) for method in set(repaired.values())}
+    print(f"Repaired {len(repaired)} of {len(unparsed)} verdicts {methods}; saved to {args.answer_map}")
+
+if __name__ == "__main__":
+    main()
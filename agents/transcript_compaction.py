@@ -0,0 +1,97 @@
+import re
+from prompts.templates import get_system_prompt, user_prompt_compact_transcript
+
+# Compaction settings - set by main.py
+compaction_method = "none"
+model_info = None
+
+def set_compaction(method, info=None):
+    """Set the compaction method ("none", "extractive" or "llm") and the model used by "llm"."""
+    global compaction_method, model_info
+    if method not in ("none", "extractive", "llm"):
+        raise ValueError(f"Unknown compaction method: {method}")
+    compaction_method = method
+    model_info = info
+
+def run_model(system_prompt: str, user_prompt: str, max_tokens: int = 300):
+    """Run model inference based on model type"""
+    if model_info is None:
+        raise ValueError("Model not loaded. Please call set_compaction() with model info first.")
+
+    first, second = model_info
+    if hasattr(first, 'chat') and hasattr(first.chat, 'completions'):
+        client, model_name = model_info
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        response = client.chat.completions.create(
+            model=model_name,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=0.7
+        )
+        return response.choices[0].message.content.strip()
+
+    tokenizer, model = model_info
+    full_prompt = f"<|begin_of_text|><|system|>\n{system_prompt}\n<|user|>\n{user_prompt}<|assistant|>\n"
+    inputs = tokenizer(full_prompt, return_tensors="pt").to(model.device)
+    outputs = model.generate(
+        **inputs,
+        max_new_tokens=max_tokens,
+        do_sample=False,
+        eos_token_id=tokenizer.eos_token_id
+    )
+    response = tokenizer.decode(outputs[0], skip_special_tokens=True)
+    return response.split("<|assistant|>")[-1].strip()
+
+# === Extractive compaction ===
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+CITATION = re.compile(r"\[(\d+)\]")
+EVIDENCE_CUES = ("evidence", "according to", "report", "data", "study", "shows", "states")
+
+def cited_evidence(text):
+    return sorted(set(CITATION.findall(text)), key=int)
+
+def compact_turn_extractive(text, max_sentences=2, max_chars=400):
+    """Keep the opening sentence and the sentences that lean most on evidence."""
+    sentences = [s.strip() for s in SENTENCE_SPLIT.split(text.replace("\n", " ")) if s.strip()]
+    if not sentences:
+        return ""
+
+    def score(index):
+        sentence = sentences[index].lower()
+        value = 2 * len(CITATION.findall(sentence))
+        value += sum(cue in sentence for cue in EVIDENCE_CUES)
+        value += bool(re.search(r"\d", sentence)) + ('"' in sentence)
+        return value + (index == 0)
+
+    keep = sorted(sorted(range(len(sentences)), key=score, reverse=True)[:max_sentences])
+    claims = " ".join(sentences[i] for i in keep)[:max_chars]
+    cited = cited_evidence(text)
+    evidence = ", ".join(f"[{n}]" for n in cited) if cited else "none"
+    return f"CLAIMS: {claims} | EVIDENCE: {evidence}"
+
+# === LLM compaction: one call per debate ===
+def compact_turns_llm(claim, turns, tokens_per_turn=80):
+    output = run_model(get_system_prompt("fact_checker"), user_prompt_compact_transcript(claim, turns),
+                       max_tokens=tokens_per_turn * len(turns))
+    summaries = {}
+    for line in output.splitlines():
+        label, sep, summary = line.strip().strip("*-# ").partition(":")
+        if sep and label.strip() in turns and "CLAIMS:" in summary:
+            summaries[label.strip()] = summary.strip()
+    # Fall back to extractive compaction for any turn the model skipped or mangled
+    return {label: summaries.get(label) or compact_turn_extractive(text) for label, text in turns.items()}
+
+def compact_turns(claim, **turns):
+    """
+    Condense labelled debate turns (e.g. pro_opening=..., con_rebuttal=...) for
+    the judge prompt, returning them in the same order. With method "none" the
+    turns are returned unchanged.
+    """
+    if compaction_method == "none":
+        return list(turns.values())
+    if compaction_method == "extractive":
+        return [compact_turn_extractive(text) for text in turns.values()]
+    return list(compact_turns_llm(claim, turns).values())
@@ -1,110 +1,94 @@
+import os
 import json
-import re
+import argparse
+import numpy as np
+from eval.evaluation import LABELS, UNKNOWN, load_predictions, load_groundtruth, resolve_subset_ids, aligned_label_matrix, agreement_report
 
-def extract_verdict_single(verdict_list):
-    """从single格式中提取verdict"""
-    text = verdict_list[0] if verdict_list else ""
-    patterns = [
-        r'\[?VERDICT\]:\s*(TRUE|FALSE|HALF-TRUE)',
-        r'\*\*VERDICT\*\*:.*?(TRUE|FALSE|HALF-TRUE)',
-        r'VERDICT\s*:\s*(TRUE|FALSE|HALF-TRUE)',
-        r'VERDICT.*?(TRUE|FALSE|HALF-TRUE)',
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, text, re.MULTILINE | re.DOTALL | re.IGNORECASE)
-        if match:
-            return match.group(1).upper()
-    return "UNKNOWN"
+DEFAULT_FILES = [
+    'data_compare/retrieved_evidence_bgebase_answer_map_multi_people.json',
+    'data_compare/retrieved_evidence_bgebase_answer_map_multi.json',
+    'data_compare/retrieved_evidence_bgebase_answer_map_single.json',
+]
 
-def extract_verdict_multi(content):
-    """从multi格式中提取verdict"""
-    text = content.get("final_verdict", "") or content.get("verdict", "")
-    patterns = [
-        r'\[?VERDICT\]:\s*(TRUE|FALSE|HALF-TRUE)',
-        r'VERDICT\s*:\s*(TRUE|FALSE|HALF-TRUE)',
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, text, re.MULTILINE | re.DOTALL | re.IGNORECASE)
-        if match:
-            return match.group(1).upper()
-    keyword_match = re.search(r'\b(TRUE|FALSE|HALF-TRUE)\b', text, re.IGNORECASE)
-    return keyword_match.group(1).upper() if keyword_match else "UNKNOWN"
-
-def load_predictions(file_path):
-    """加载预测文件并提取verdict"""
-    with open(file_path, 'r') as f:
-        data = json.load(f)
-    
-    predictions = {}
-    for example_id, content in data.items():
-        if isinstance(content, list):
-            verdict = extract_verdict_single(content)
-        else:
-            verdict = extract_verdict_multi(content)
-        predictions[example_id] = verdict
-    
-    return predictions
+def print_matrix(title, names, matrix):
+    """打印N×N矩阵，行列用文件编号表示"""
+    print(f"\n{title}")
+    print("      " + "".join(f"{f'[{j}]':>8}" for j in range(len(names))))
+    for i, row in enumerate(matrix):
+        print(f"{f'[{i}]':<6}" + "".join(f"{value:>8.1%}" for value in row))
 
 def main():
-    # 加载groundtruth
-    with open('data/GT_test_all.json', 'r') as f:
-        groundtruth = json.load(f)
-    
-    # 加载三个预测文件
-    file1_predictions = load_predictions('data_compare/retrieved_evidence_bgebase_answer_map_multi_people.json')
-    file2_predictions = load_predictions('data_compare/retrieved_evidence_bgebase_answer_map_multi.json')
-    file3_predictions = load_predictions('data_compare/retrieved_evidence_bgebase_answer_map_single.json')
-    
-    # 找出第一个文件判断正确，后两个文件判断错误的案例
-    correct_cases = []
-    
-    for example_id, true_label in groundtruth.items():
-        # 检查三个文件是否都有结果
-        if (example_id in file1_predictions and 
-            example_id in file2_predictions and 
-            example_id in file3_predictions):
-            
-            file1_pred = file1_predictions[example_id]
-            file2_pred = file2_predictions[example_id]
-            file3_pred = file3_predictions[example_id]
-            
-            # 检查第一个文件判断正确，后两个文件判断错误
-            if (file1_pred == true_label and 
-                file2_pred != true_label and 
-                file3_pred != true_label):
-                
-                correct_cases.append({
-                    'example_id': example_id,
-                    'groundtruth': true_label,
-                    'file1_prediction': file1_pred,
-                    'file2_prediction': file2_pred,
-                    'file3_prediction': file3_pred
-                })
-    
-    # 输出结果
-    print(f"找到 {len(correct_cases)} 个案例：第一个文件判断正确，后两个文件判断错误")
-    print("=" * 80)
-    
-    for case in correct_cases:
-        print(f"案例ID: {case['example_id']}")
-        print(f"Groundtruth: {case['groundtruth']}")
-        print(f"文件1预测: {case['file1_prediction']} ✓")
-        print(f"文件2预测: {case['file2_prediction']} ✗")
-        print(f"文件3预测: {case['file3_prediction']} ✗")
-        print("-" * 40)
-    
-    # 统计不同错误类型的分布
-    print("\n错误类型统计:")
-    error_types = {}
-    for case in correct_cases:
-        file2_error = f"{case['groundtruth']} -> {case['file2_prediction']}"
-        file3_error = f"{case['groundtruth']} -> {case['file3_prediction']}"
-        
-        error_types[file2_error] = error_types.get(file2_error, 0) + 1
-        error_types[file3_error] = error_types.get(file3_error, 0) + 1
-    
-    for error_type, count in sorted(error_types.items(), key=lambda x: x[1], reverse=True):
-        print(f"{error_type}: {count}次")
+    parser = argparse.ArgumentParser(description='Pairwise agreement, error overlap and oracle-ensemble accuracy across prediction files')
+    parser.add_argument('--prediction', nargs='+', default=DEFAULT_FILES,
+                        help='Prediction files to compare (N >= 2)')
+    parser.add_argument('--groundtruth', type=str, default='data/GT_test_all.json')
+    parser.add_argument('--subset', type=str, default=None,
+                        help='Only compare a named subset (e.g. veracity_150) or the ids in a {category: [ids]} file')
+    parser.add_argument('--only_right', type=int, default=None,
+                        help='List the cases where only this file (index) is right and all others are wrong')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Write matrices and per-example "who got it right" bitmasks as JSON')
+    args = parser.parse_args()
+
+    # 加载groundtruth和预测文件
+    groundtruth = load_groundtruth(args.groundtruth)
+    subset_ids = resolve_subset_ids(args.subset) if args.subset else None
+    names = [os.path.basename(f) for f in args.prediction]
+    predictions = [load_predictions(f)[0] for f in args.prediction]
+
+    ids, y_true, y_pred = aligned_label_matrix(predictions, groundtruth, subset_ids)
+    report = agreement_report(y_true, y_pred)
+
+    print(f"共同样本数: {report['n']}")
+    for i, name in enumerate(names):
+        print(f"[{i}] {name}  acc={report['accuracy'][i]:.2%}  unique_correct={report['unique_correct'][i]}  "
+              f"oracle_without={report['oracle_without'][i]:.2%}")
+    print(f"\nOracle-ensemble accuracy (任一文件判断正确): {report['oracle_accuracy']:.2%}")
+    print(f"Majority-vote accuracy: {report['majority_vote_accuracy']:.2%}")
+
+    print_matrix("Agreement (两个文件预测相同的比例):", names, report['agreement'])
+    print_matrix("Both wrong (两个文件都判断错误的比例):", names, report['both_wrong'])
+    print_matrix("Row right, column wrong (行文件正确、列文件错误的比例):", names, report['i_right_j_wrong'])
+
+    # 按"谁判断正确"的位掩码统计样本分布
+    bitmask = report['bitmask']
+    patterns, counts = np.unique(bitmask, return_counts=True)
+    print("\n正确模式分布 (位i=1表示文件[i]判断正确):")
+    for pattern, count in sorted(zip(patterns.tolist(), counts.tolist()), key=lambda x: x[1], reverse=True):
+        print(f"{pattern:0{len(names)}b}"[::-1] + f": {count}")
+
+    # 找出只有指定文件判断正确、其他文件都判断错误的案例
+    if args.only_right is not None:
+        target = 1 << args.only_right
+        labels = LABELS + [UNKNOWN]
+        cases = np.nonzero(bitmask == target)[0]
+        print(f"\n找到 {len(cases)} 个案例：文件[{args.only_right}]判断正确，其他文件判断错误")
+        print("=" * 80)
+        error_types = {}
+        for idx in cases:
+            print(f"案例ID: {ids[idx]}")
+            print(f"Groundtruth: {labels[y_true[idx]]}")
+            for i in range(len(names)):
+                mark = "✓" if i == args.only_right else "✗"
+                print(f"文件{i}预测: {labels[y_pred[i, idx]]} {mark}")
+                if i != args.only_right:
+                    error_type = f"{labels[y_true[idx]]} -> {labels[y_pred[i, idx]]}"
+                    error_types[error_type] = error_types.get(error_type, 0) + 1
+            print("-" * 40)
+
+        # 统计不同错误类型的分布
+        print("\n错误类型统计:")
+        for error_type, count in sorted(error_types.items(), key=lambda x: x[1], reverse=True):
+            print(f"{error_type}: {count}次")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'files': args.prediction,
+                **{key: value for key, value in report.items() if key != 'bitmask'},
+                'bitmask': dict(zip(ids, bitmask.tolist())),
+            }, f, indent=2)
+        print(f"\n结果已保存到: {args.output}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,213 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import tempfile
+import subprocess
+from main import MODES
+from eval.evaluation import load_groundtruth, load_subset, evaluate_file
+
+# Bump when the metrics or the way they are measured change; older baselines
+# then have to be re-recorded instead of being compared.
+BASELINE_VERSION = 2
+DEFAULT_BASELINE = os.path.join("benchmarks", "baseline.json")
+DEFAULT_INPUT = os.path.join("data", "matching_evidence.json")
+DEFAULT_SUBSET = "bench_15"
+
+HIGHER_IS_BETTER = ["accuracy", "macro_f1", "tokens_per_sec", "turns_per_sec"]
+LOWER_IS_BETTER = ["peak_rss_mb", "calls_per_claim", "prompt_tokens_per_claim", "unknown"]
+# The only metrics the stub pins: its replies depend on the prompt alone, so these
+# repeat exactly, while timing and RSS would only measure the machine.
+DETERMINISTIC_METRICS = ["accuracy", "macro_f1", "unknown", "calls_per_claim", "prompt_tokens_per_claim"]
+# accuracy, macro_f1 and unknown are absolute (0.07 = 7 points, i.e. one claim of
+# bench_15), everything else relative. Wide enough for the run-to-run spread of a
+# real model, compared as medians over --repeats runs.
+DEFAULT_TOLERANCES = {
+    "accuracy": 0.07,
+    "macro_f1": 0.07,
+    "unknown": 1.0,
+    "tokens_per_sec": 0.25,
+    "turns_per_sec": 0.25,
+    "peak_rss_mb": 0.10,
+    "calls_per_claim": 0.10,
+    "prompt_tokens_per_claim": 0.10,
+}
+# The stub is exact, so any change is a regression
+STUB_TOLERANCES = {name: 0.0 for name in DETERMINISTIC_METRICS}
+ABSOLUTE_TOLERANCES = {"accuracy", "macro_f1", "unknown"}
+
+def pinned_metrics(model):
+    return DETERMINISTIC_METRICS if model == "stub" else HIGHER_IS_BETTER + LOWER_IS_BETTER
+
+def parse_tolerances(spec, model="stub"):
+    """'tokens_per_sec=0.3,peak_rss_mb=0.2' on top of the model's default tolerances."""
+    tolerances = dict(STUB_TOLERANCES if model == "stub" else DEFAULT_TOLERANCES)
+    for item in filter(None, (spec or "").split(",")):
+        name, _, value = item.partition("=")
+        if name.strip() not in tolerances:
+            raise ValueError(f"Unknown metric in tolerance spec: {name}")
+        tolerances[name.strip()] = float(value)
+    return tolerances
+
+def answer_map_path(output_dir, input_file, mode, model):
+    # Same naming as main.py
+    input_basename = os.path.splitext(os.path.basename(input_file))[0]
+    return os.path.join(output_dir, f"{input_basename}_answer_map_{mode}_{model}.json")
+
+def peak_rss_mb(rusage):
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return rusage.ru_maxrss / (1024 * 1024 if platform.system() == "Darwin" else 1024)
+
+def run_mode(mode, args, groundtruth, subset_ids, output_dir):
+    """Run main.py for one mode in a child process and collect its metrics."""
+    command = [sys.executable, "main.py", "--mode", mode, "--model", args.model,
+               "--input_file", args.input_file, "--subset", args.subset,
+               "--output_dir", output_dir, "--track_usage"]
+    if args.model_path:
+        command += ["--model_path", args.model_path]
+    log_file = os.path.join(output_dir, f"{mode}.log")
+    with open(log_file, "w") as log:
+        process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+        # wait4 gives this child's own peak RSS, not the maximum over all children
+        _, status, rusage = os.wait4(process.pid, 0)
+    if status != 0:
+        with open(log_file, "r") as log:
+            raise RuntimeError(f"{mode} failed:\n" + "".join(log.readlines()[-20:]))
+
+    answer_map = answer_map_path(output_dir, args.input_file, mode, args.model)
+    result = evaluate_file(answer_map, groundtruth, subset_ids)
+    with open(answer_map.replace(".json", "_usage.json"), "r") as f:
+        usage = list(json.load(f).values())
+    wall_seconds = sum(u["wall_seconds"] for u in usage)
+    calls = sum(u["calls"] for u in usage)
+    return {
+        "claims": len(usage),
+        "accuracy": result["accuracy"],
+        "macro_f1": result["macro_f1"],
+        "unknown": result["unknown"],
+        "tokens_per_sec": sum(u["completion_tokens"] for u in usage) / wall_seconds if wall_seconds else 0.0,
+        "turns_per_sec": calls / wall_seconds if wall_seconds else 0.0,
+        "peak_rss_mb": peak_rss_mb(rusage),
+        "calls_per_claim": calls / len(usage),
+        "prompt_tokens_per_claim": sum(u["prompt_tokens"] for u in usage) / len(usage),
+    }
+
+def median_of(runs, metrics):
+    """Median per metric over repeated runs, so one slow or fast outlier cannot move the result."""
+    return {"claims": runs[0]["claims"], **{name: statistics.median(run[name] for run in runs) for name in metrics}}
+
+def compare(baseline, current, tolerances):
+    """[(mode, metric, baseline value, current value, regressed)] for every pinned metric of every mode in both."""
+    rows = []
+    for mode, metrics in current.items():
+        if mode not in baseline:
+            continue
+        for name in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+            old, new = baseline[mode].get(name), metrics.get(name)
+            if old is None or new is None:
+                continue
+            slack = tolerances[name] if name in ABSOLUTE_TOLERANCES else tolerances[name] * abs(old)
+            regressed = new < old - slack if name in HIGHER_IS_BETTER else new > old + slack
+            rows.append((mode, name, old, new, regressed))
+    return rows
+
+def format_comparison(rows):
+    width = max([len(mode) for mode, *_ in rows] + [4])
+    lines = [f"{'mode':<{width}} {'metric':<24} {'baseline':>12} {'current':>12} {'change':>8}"]
+    for mode, name, old, new, regressed in rows:
+        change = f"{(new - old) / old:+.1%}" if old else "-"
+        lines.append(f"{mode:<{width}} {name:<24} {old:>12.4g} {new:>12.4g} {change:>8}" + ("  REGRESSED" if regressed else ""))
+    return "\n".join(lines)
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Pin accuracy and throughput of every main.py mode against a recorded baseline")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--model", choices=["stub", "llama", "qwen"], default="stub",
+                        help="stub needs no weights; use a small local model for real throughput numbers")
+    parser.add_argument("--model_path", type=str, default=None)
+    parser.add_argument("--input_file", type=str, default=DEFAULT_INPUT)
+    parser.add_argument("--subset", type=str, default=DEFAULT_SUBSET, help="Named subset with the fixed claim set")
+    parser.add_argument("--groundtruth", type=str, default="data/GT_test_all.json")
+    parser.add_argument("--repeats", type=int, default=None,
+                        help="Runs per mode, compared by their median (default: 1 for the stub, 3 otherwise)")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=str, default=None,
+                        help="Per-metric overrides, e.g. 'tokens_per_sec=0.3,peak_rss_mb=0.2'")
+    parser.add_argument("--update", action="store_true", help="Record the results as the new baseline instead of comparing")
+    args = parser.parse_args()
+    tolerances = parse_tolerances(args.tolerance, args.model)
+    metrics = pinned_metrics(args.model)
+    repeats = args.repeats or (1 if args.model == "stub" else 3)
+
+    groundtruth = load_groundtruth(args.groundtruth)
+    subset = load_subset(args.subset)
+    subset_ids = subset.id_set()
+    settings = {"version": BASELINE_VERSION, "model": args.model, "model_path": args.model_path,
+                "input_file": args.input_file, "subset": args.subset, "subset_version": subset.version}
+
+    baseline = None
+    if not args.update:
+        if not os.path.exists(args.baseline):
+            parser.error(f"no baseline at {args.baseline}; record one with --update")
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        mismatched = [key for key, value in settings.items() if baseline.get(key) != value]
+        if mismatched:
+            parser.error(f"baseline was recorded with different {', '.join(mismatched)}; re-record it with --update")
+
+    results, failures = {}, {}
+    for mode in args.modes:
+        runs = []
+        try:
+            for _ in range(repeats):
+                with tempfile.TemporaryDirectory() as output_dir:
+                    runs.append(run_mode(mode, args, groundtruth, subset_ids, output_dir))
+        except (RuntimeError, OSError, ValueError) as e:
+            failures[mode] = str(e)
+            print(f"{mode:<28} FAILED\n{e}")
+            continue
+        results[mode] = median_of(runs, metrics)
+        summary = f"{mode:<28} acc={results[mode]['accuracy']:.2%} {results[mode]['prompt_tokens_per_claim']:.0f} prompt tok/claim"
+        if "tokens_per_sec" in results[mode]:
+            summary += (f" {results[mode]['tokens_per_sec']:.1f} tok/s {results[mode]['turns_per_sec']:.2f} turns/s "
+                        f"{results[mode]['peak_rss_mb']:.0f} MB")
+        print(summary)
+
+    if args.update:
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r") as f:
+                previous = json.load(f)
+            # Keep modes that were not re-run, if the settings still match
+            if all(previous.get(key) == value for key, value in settings.items()):
+                results = {**previous["modes"], **results}
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({**settings, "git_commit": git_commit(), "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                       "python": platform.python_version(), "machine": platform.machine(), "modes": results}, f, indent=2)
+        print(f"Baseline saved to: {args.baseline}")
+        if failures:
+            print(f"Not recorded (failed): {', '.join(failures)}")
+        return
+
+    rows = compare(baseline["modes"], results, tolerances)
+    print()
+    print(format_comparison(rows))
+    regressions = [(mode, name) for mode, name, *_, regressed in rows if regressed]
+    # A mode that ran when the baseline was recorded must still run
+    regressions += [(mode, "failed") for mode in failures if mode in baseline["modes"]]
+    if regressions:
+        print(f"\n{len(regressions)} regressions: " + ", ".join(f"{mode}.{name}" for mode, name in regressions))
+        sys.exit(1)
+    print("\nNo regressions")
+
+if __name__ == "__main__":
+    main()
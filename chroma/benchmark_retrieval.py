@@ -0,0 +1,165 @@
+import os
+import json
+import math
+import time
+import argparse
+import numpy as np
+from chroma import ChromaClient, build_embedding_function
+from fusion import fuse
+
+def recall_at_k(ranked_ids, gold_ids):
+    return len(set(ranked_ids) & gold_ids) / len(gold_ids) if gold_ids else 0.0
+
+def reciprocal_rank(ranked_ids, gold_ids):
+    for rank, evidence_id in enumerate(ranked_ids):
+        if evidence_id in gold_ids:
+            return 1.0 / (rank + 1)
+    return 0.0
+
+def ndcg_at_k(ranked_ids, gold_ids, k):
+    dcg = sum(1.0 / math.log2(rank + 2) for rank, evidence_id in enumerate(ranked_ids[:k]) if evidence_id in gold_ids)
+    ideal = sum(1.0 / math.log2(rank + 2) for rank in range(min(len(gold_ids), k)))
+    return dcg / ideal if ideal > 0 else 0.0
+
+def build_index(model_name, evidence_id_to_text, store_dir, encoder="torch", rebuild=False, batch_size=256):
+    """
+    Build (or reuse) one collection per embedding model and return the client
+    and the build time in seconds. The time of a reused index is read back
+    from the timing file written when it was built; it is None when the index
+    was not built from empty here and no timing file exists.
+    """
+    model_slug = model_name.split("/")[-1]
+    path = os.path.join(store_dir, f"{model_slug}_{encoder}")
+    timing_file = os.path.join(path, "build_time.json")
+    client = ChromaClient(
+        vector_name="evidence",
+        path=path,
+        embedding_function=build_embedding_function(encoder, model_name=model_name)
+    )
+    if rebuild and client.collection.count() > 0:
+        client.chroma_client.delete_collection("evidence")
+        client = ChromaClient(vector_name="evidence", path=path, embedding_function=client.embedding_function)
+
+    existing = client.collection.count()
+    if existing >= len(evidence_id_to_text) and os.path.exists(timing_file):
+        with open(timing_file, "r") as f:
+            return client, json.load(f)["seconds"]
+
+    contents = list(evidence_id_to_text.values())
+    metadatas = [{"evidence_id": int(evidence_id)} for evidence_id in evidence_id_to_text]
+    start = time.perf_counter()
+    client.add_documents(contents, metadatas, batch_size=batch_size)
+    seconds = time.perf_counter() - start
+    if existing > 0:
+        # add_documents skipped what was already embedded, so this is not a build time
+        return client, None
+    with open(timing_file, "w") as f:
+        json.dump({"seconds": seconds, "documents": len(contents)}, f)
+    return client, seconds
+
+def run_config(client, examples, top_k, fusion, rrf_k=60):
+    """Query every example under one configuration and collect quality and latency metrics."""
+    recalls, rrs, ndcgs, latencies = [], [], [], []
+    for example in examples:
+        start = time.perf_counter()
+        if fusion == "none":
+            results = client.query(example["claim"], top_k=top_k, include=["metadatas"])
+            ranked_ids = [meta["evidence_id"] for meta in results["metadatas"][0]]
+        else:
+            results = client.query_batch([example["pro_claim"], example["con_claim"]], top_k=top_k,
+                                         include=["metadatas", "distances"])
+            id_lists = [[meta["evidence_id"] for meta in metas] for metas in results["metadatas"]]
+            fused = fuse(id_lists, distance_lists=results["distances"], top_k=top_k, method=fusion, rrf_k=rrf_k)
+            ranked_ids = [evidence_id for evidence_id, _ in fused]
+        latencies.append(time.perf_counter() - start)
+
+        gold_ids = example["gold_ids"]
+        recalls.append(recall_at_k(ranked_ids, gold_ids))
+        rrs.append(reciprocal_rank(ranked_ids, gold_ids))
+        ndcgs.append(ndcg_at_k(ranked_ids, gold_ids, top_k))
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "recall": float(np.mean(recalls)),
+        "mrr": float(np.mean(rrs)),
+        "ndcg": float(np.mean(ndcgs)),
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "queries": len(examples)
+    }
+
+def load_examples(data_dir, reformulation_file=None, limit=None):
+    """Join claims, gold evidence ids and (optionally) pro/con reformulations per example."""
+    with open(os.path.join(data_dir, "example_to_claim.json"), "r") as f:
+        example_to_claim = json.load(f)
+    with open(os.path.join(data_dir, "example_to_evidence_map.json"), "r") as f:
+        example_to_evidence_map = json.load(f)
+    reformulations = {}
+    if reformulation_file:
+        with open(reformulation_file, "r") as f:
+            reformulations = json.load(f)
+
+    examples = []
+    for example_id, gold_ids in example_to_evidence_map.items():
+        if not gold_ids or example_id not in example_to_claim:
+            continue
+        example = {"example_id": example_id, "claim": example_to_claim[example_id], "gold_ids": set(gold_ids)}
+        if example_id in reformulations:
+            example["pro_claim"] = reformulations[example_id]["pro_claim"]
+            example["con_claim"] = reformulations[example_id]["con_claim"]
+        examples.append(example)
+    return examples[:limit] if limit else examples
+
+def format_build_seconds(seconds):
+    return "cached" if seconds is None else f"{seconds:.1f}"
+
+def print_table(rows):
+    header = f"{'model':<24} {'encoder':<10} {'fusion':<9} {'k':>4} {'recall@k':>9} {'MRR':>7} {'nDCG@k':>8} {'p50 ms':>8} {'p95 ms':>8} {'build s':>8}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(f"{row['model'].split('/')[-1]:<24} {row['encoder']:<10} {row['fusion']:<9} {row['top_k']:>4} "
+              f"{row['recall']:>9.2%} {row['mrr']:>7.3f} {row['ndcg']:>8.3f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {format_build_seconds(row['build_seconds']):>8}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark retrieval quality and speed against gold evidence")
+    parser.add_argument("--models", nargs="+", default=["BAAI/bge-base-en-v1.5"],
+                        help="Embedding models to compare, e.g. BAAI/bge-base-en-v1.5 BAAI/bge-large-en-v1.5")
+    parser.add_argument("--encoders", nargs="+", default=["torch"], choices=["torch", "onnx", "onnx_int8"])
+    parser.add_argument("--top_k", nargs="+", type=int, default=[10, 20])
+    parser.add_argument("--fusion", nargs="+", default=["none"], choices=["none", "rrf", "distance"],
+                        help="'none' queries with the claim; rrf/distance fuse pro/con reformulations")
+    parser.add_argument("--reformulations", type=str, default=None,
+                        help="Output of chroma_intent_enhanced_query.py providing pro_claim/con_claim (needed for fusion)")
+    parser.add_argument("--data_dir", type=str, default="../data")
+    parser.add_argument("--store_dir", type=str, default="./chroma_bench")
+    parser.add_argument("--rebuild_index", action="store_true")
+    parser.add_argument("--limit", type=int, default=None, help="Only benchmark the first N examples")
+    parser.add_argument("--output", type=str, default=None, help="Optional JSON file for the result rows")
+    args = parser.parse_args()
+
+    with open(os.path.join(args.data_dir, "evidence_id_to_text.json"), "r") as f:
+        evidence_id_to_text = json.load(f)
+    examples = load_examples(args.data_dir, args.reformulations, args.limit)
+    fusion_examples = [example for example in examples if "pro_claim" in example]
+    if any(fusion != "none" for fusion in args.fusion) and not fusion_examples:
+        raise ValueError("Fusion configurations need --reformulations with pro_claim/con_claim for the benchmarked examples")
+
+    rows = []
+    for model_name in args.models:
+        for encoder in args.encoders:
+            client, build_seconds = build_index(model_name, evidence_id_to_text, args.store_dir,
+                                                encoder=encoder, rebuild=args.rebuild_index)
+            for fusion in args.fusion:
+                config_examples = examples if fusion == "none" else fusion_examples
+                for top_k in args.top_k:
+                    result = run_config(client, config_examples, top_k, fusion)
+                    result.update({"model": model_name, "encoder": encoder, "fusion": fusion,
+                                   "top_k": top_k, "build_seconds": build_seconds})
+                    rows.append(result)
+
+    print_table(rows)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
@@ -1,3 +1,6 @@
+import os
+import json
+import hashlib
 import chromadb
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
@@ -6,36 +9,250 @@ from chromadb import PersistentClient
 
 class SentenceTransformerEmbeddingFunction(EmbeddingFunction):
     def __init__(self, model_name='BAAI/bge-base-en-v1.5'):
+        self.model_name = model_name
         self.model = SentenceTransformer(model_name, trust_remote_code=True)
 
     def __call__(self, input: Documents) -> list:
         return self.model.encode(input).tolist()
 
+def build_embedding_function(encoder="torch", model_name='BAAI/bge-base-en-v1.5', onnx_dir=None,
+                             cache_size=0, cache_path=None):
+    """
+    Create the embedding function used for both ingestion and queries.
+
+    Args:
+        encoder: "torch" (fp32 SentenceTransformer), "onnx" (fp32 ONNX) or "onnx_int8"
+        model_name: Hugging Face model name for the torch encoder
+        onnx_dir: directory written by onnx_encoder.py export
+        cache_size: size of the in-memory LRU embedding cache (0 disables caching unless cache_path is set)
+        cache_path: optional SQLite file backing the embedding cache across runs
+    """
+    if encoder == "torch":
+        embedding_function = SentenceTransformerEmbeddingFunction(model_name)
+    elif encoder in ("onnx", "onnx_int8"):
+        from onnx_encoder import OnnxEmbeddingFunction
+        embedding_function = OnnxEmbeddingFunction(
+            model_dir=onnx_dir or f"./onnx/{model_name.split('/')[-1]}",
+            quantized=(encoder == "onnx_int8")
+        )
+    else:
+        raise ValueError(f"Unsupported encoder: {encoder}")
+
+    if cache_size or cache_path:
+        from embedding_cache import CachedEmbeddingFunction
+        embedding_function = CachedEmbeddingFunction(
+            embedding_function,
+            model_name=f"{model_name}:{encoder}",
+            max_size=cache_size or 100000,
+            cache_path=cache_path
+        )
+    return embedding_function
+
 class ChromaClient:
-    def __init__(self, vector_name="default", path="./chroma_store"):
+    def __init__(self, vector_name="default", path="./chroma_store", embedding_function=None, remote_url=None,
+                 index="chroma", index_prefix=None, rerank=100):
+        """
+        Args:
+            index: "chroma" (fp32 HNSW), or "int8"/"pq" to serve queries from a compressed
+                index saved by quantized_index.py, with exact re-rank of the top `rerank` hits
+            index_prefix: location of the compressed index (default: <path>/<vector_name>_<index>)
+        """
         self.vector_name = vector_name
-        self.id = 100
+
+        if remote_url:
+            # Remote mode: the model and index live in retrieval_server.py; only queries are supported
+            from retrieval_server import RemoteCollection
+            self.embedding_function = None
+            self.chroma_client = None
+            self.collection = RemoteCollection(remote_url)
+            return
+
+        self.embedding_function = embedding_function or SentenceTransformerEmbeddingFunction()
+
+        if index != "chroma":
+            # Compressed mode: only the quantized codes are held in memory; queries only
+            from quantized_index import CompressedCollection, default_index_prefix
+            self.chroma_client = None
+            self.collection = CompressedCollection.load(
+                index_prefix or default_index_prefix(path, vector_name, index),
+                self.embedding_function, kind=index, rerank=rerank
+            )
+            return
 
         self.chroma_client = PersistentClient(path=path)
         self.collection = self.chroma_client.get_or_create_collection(
             name=vector_name,
-            embedding_function=SentenceTransformerEmbeddingFunction()
+            embedding_function=self.embedding_function
         )
 
+    def reset(self):
+        """Drop and recreate the collection, so no document keeps metadata from an earlier numbering."""
+        if self.chroma_client is None:
+            # Remote and compressed collections are query-only, like their get/upsert/add/delete
+            from retrieval_server import ReadOnlyCollectionError
+            raise ReadOnlyCollectionError("This collection is read-only; reset it with a local Chroma-backed ChromaClient")
+        try:
+            self.chroma_client.delete_collection(name=self.vector_name)
+        except Exception:
+            pass  # Collection did not exist yet; the error type differs across chromadb versions
+        self.collection = self.chroma_client.get_or_create_collection(
+            name=self.vector_name,
+            embedding_function=self.embedding_function
+        )
+
+    @staticmethod
+    def document_id(content):
+        """Collection ID derived from the normalized content, so re-ingesting a sentence never collides."""
+        return hashlib.md5(content.strip().encode('utf-8')).hexdigest()
+
     def add_document(self, content, metadata):
-        self.collection.add(documents=[content], metadatas=[metadata], ids=[str(self.id)])
-        self.id += 1
+        self.collection.upsert(documents=[content], metadatas=[metadata], ids=[self.document_id(content)])
+
+    def add_documents(self, contents, metadatas, batch_size=256):
+        """
+        Add documents in batches, embedding only those not already in the collection.
+
+        Returns:
+            Number of documents that were newly embedded.
+        """
+        added = 0
+        for start in range(0, len(contents), batch_size):
+            batch_contents = contents[start:start + batch_size]
+            batch_metadatas = metadatas[start:start + batch_size]
+            batch_ids = [self.document_id(content) for content in batch_contents]
+
+            existing = set(self.collection.get(ids=batch_ids, include=[])["ids"])
+            new_ids, new_contents, new_metadatas = [], [], []
+            for doc_id, content, metadata in zip(batch_ids, batch_contents, batch_metadatas):
+                if doc_id in existing:
+                    continue
+                existing.add(doc_id)
+                new_ids.append(doc_id)
+                new_contents.append(content)
+                new_metadatas.append(metadata)
+
+            if new_ids:
+                self.collection.upsert(documents=new_contents, metadatas=new_metadatas, ids=new_ids)
+                added += len(new_ids)
+        return added
+
+    def tag_documents(self, content_tags, batch_size=256):
+        """
+        Set boolean membership keys (see example_key/source_key) on documents that
+        are already in the collection, keeping the keys they carry from earlier runs.
 
-    def query(self, query_text, top_k=10, include=["documents", "metadatas"]):
+        Args:
+            content_tags: {content: iterable of metadata keys to set to True}
+
+        Returns:
+            Number of documents whose metadata changed.
+        """
+        updated = 0
+        items = [(self.document_id(content), set(keys)) for content, keys in content_tags.items()]
+        for start in range(0, len(items), batch_size):
+            batch = dict(items[start:start + batch_size])
+            found = self.collection.get(ids=list(batch), include=["metadatas"])
+            ids, metadatas = [], []
+            for doc_id, metadata in zip(found["ids"], found["metadatas"]):
+                metadata = metadata or {}
+                missing = batch[doc_id] - set(metadata)
+                if missing:
+                    ids.append(doc_id)
+                    metadatas.append({**metadata, **{key: True for key in missing}})
+            if ids:
+                self.collection.update(ids=ids, metadatas=metadatas)
+                updated += len(ids)
+        return updated
+
+    def delete_documents(self, contents, batch_size=256):
+        """
+        Remove documents by content, e.g. sentences that were collapsed onto a
+        canonical evidence id after an earlier build embedded them.
+
+        Returns:
+            Number of documents that were in the collection and got deleted.
+        """
+        deleted = 0
+        doc_ids = [self.document_id(content) for content in contents]
+        for start in range(0, len(doc_ids), batch_size):
+            existing = self.collection.get(ids=doc_ids[start:start + batch_size], include=[])["ids"]
+            if existing:
+                self.collection.delete(ids=existing)
+                deleted += len(existing)
+        return deleted
+
+    @classmethod
+    def load_alias_ids(cls, data_dir):
+        """Mapping document id -> canonical evidence_id for the near-duplicate aliases chroma_add.py recorded."""
+        path = os.path.join(data_dir, "evidence_aliases.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r") as f:
+            return {cls.document_id(text): evidence_id for text, evidence_id in json.load(f).items()}
+
+    @staticmethod
+    def canonical_hits(doc_ids, metadatas, alias_ids=None, distances=None):
+        """
+        Evidence ids (and distances) of one query's hits. A hit on an aliased
+        near-duplicate resolves to its canonical id, and an id that repeats
+        keeps only its best-ranked hit.
+        """
+        alias_ids = alias_ids or {}
+        evidence_ids, kept_distances, seen = [], [], set()
+        for rank, (doc_id, metadata) in enumerate(zip(doc_ids, metadatas)):
+            evidence_id = alias_ids.get(doc_id, metadata["evidence_id"])
+            if evidence_id in seen:
+                continue
+            seen.add(evidence_id)
+            evidence_ids.append(evidence_id)
+            if distances is not None:
+                kept_distances.append(distances[rank])
+        return evidence_ids, kept_distances
+
+    @staticmethod
+    def example_key(example_id):
+        """Metadata key set to True on every document that is evidence of the example."""
+        return f"example_{example_id}"
+
+    @staticmethod
+    def source_key(source):
+        """Metadata key set to True on every document ingested from the source file."""
+        return f"source_{source}"
+
+    @classmethod
+    def example_filter(cls, example_ids):
+        """
+        Build a `where` clause restricting a query to the evidence of the given examples.
+
+        A sentence shared between examples carries one membership key per
+        example, so the filter is an $or over those keys.
+        """
+        clauses = [{cls.example_key(example_id): True} for example_id in sorted(map(str, example_ids))]
+        if not clauses:
+            raise ValueError("example_filter needs at least one example id")
+        return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+    def query(self, query_text, top_k=10, include=["documents", "metadatas"], where=None):
         return self.collection.query(
             query_texts=[query_text],
             n_results=top_k,
+            where=where,
             include=include
         )
 
-    def query_score(self, query_text, top_k=10, include=["documents", "metadatas", "distances"]):
+    def query_score(self, query_text, top_k=10, include=["documents", "metadatas", "distances"], where=None):
         return self.collection.query(
             query_texts=[query_text],
             n_results=top_k,
+            where=where,
+            include=include
+        )
+
+    def query_batch(self, query_texts, top_k=10, include=["documents", "metadatas", "distances"], where=None):
+        """Query several texts in one call; results are lists of lists aligned with query_texts."""
+        return self.collection.query(
+            query_texts=query_texts,
+            n_results=top_k,
+            where=where,
             include=include
-        )
\ No newline at end of file
+        )
@@ -1,38 +1,123 @@
+import os
 import json
 import hashlib
+import argparse
 from tqdm import tqdm
-from chroma import ChromaClient
+from chroma import ChromaClient, build_embedding_function
+from evidence_store import EvidenceStore
+from near_dup import NearDuplicateIndex
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Add evidence sentences to the ChromaDB vector store")
+    parser.add_argument(
+        "--input_file",
+        type=str,
+        default="../data/test.json",
+        help="JSON list of examples with example_id, claim and evidence"
+    )
+    parser.add_argument(
+        "--data_dir",
+        type=str,
+        default="../data",
+        help="Directory holding the persisted evidence mappings"
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Drop the collection and persisted mappings, then re-embed and assign evidence ids from scratch"
+    )
+    parser.add_argument(
+        "--near_dup_threshold",
+        type=float,
+        default=None,
+        help="Collapse near-duplicate sentences (MinHash Jaccard >= threshold, e.g. 0.8) onto one canonical evidence id"
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=256,
+        help="Number of sentences embedded per Chroma call (default: 256)"
+    )
+    parser.add_argument(
+        "--encoder",
+        choices=["torch", "onnx", "onnx_int8"],
+        default="torch",
+        help="Embedding backend: fp32 SentenceTransformer, ONNX, or int8-quantized ONNX (default: torch)"
+    )
+    return parser.parse_args()
+
+def load_json(path, default):
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return json.load(f)
+    return default
+
+def save_json(data, path):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+args = parse_args()
+
+evidence_id_to_text_path = os.path.join(args.data_dir, "evidence_id_to_text.json")
+example_to_evidence_map_path = os.path.join(args.data_dir, "example_to_evidence_map.json")
+example_to_claim_path = os.path.join(args.data_dir, "example_to_claim.json")
+evidence_aliases_path = os.path.join(args.data_dir, "evidence_aliases.json")
 
 # Load examples from file
-with open("../data/test.json", "r") as f:
+with open(args.input_file, "r") as f:
     all_examples = json.load(f)
+source = os.path.basename(args.input_file)
 
-chroma_client = ChromaClient(vector_name="evidence_bgebase")
+chroma_client = ChromaClient(vector_name="evidence_bgebase", embedding_function=build_embedding_function(args.encoder))
+if args.rebuild:
+    # Existing documents would be skipped by add_documents and keep their old evidence_id metadata
+    chroma_client.reset()
 
-# Global evidence counter
-global_evidence_id = 0
-
-# Use a hash set to skip duplicate content
-seen_evidence_hashes = set()
+# Mapping: evidence_id → sentence_text (persisted, keys are strings in JSON)
+evidence_id_to_text = {} if args.rebuild else {int(k): v for k, v in load_json(evidence_id_to_text_path, {}).items()}
 
 # Mapping: example_id → list of assigned evidence_id
-example_to_evidence_map = {}
+example_to_evidence_map = {} if args.rebuild else load_json(example_to_evidence_map_path, {})
+
+# Mapping: example_id → claim
+example_to_claim = {} if args.rebuild else load_json(example_to_claim_path, {})
+
+# Mapping: alias sentence_text → canonical evidence_id (near-duplicates collapsed at ingest)
+evidence_aliases = {} if args.rebuild else load_json(evidence_aliases_path, {})
+
+# Mapping: sentence_hash → evidence_id, rebuilt from the persisted texts and aliases
+evidence_hash_to_id = {
+    hashlib.md5(text.encode('utf-8')).hexdigest(): evidence_id
+    for evidence_id, text in evidence_id_to_text.items()
+}
+for alias_text, canonical_id in evidence_aliases.items():
+    evidence_hash_to_id[hashlib.md5(alias_text.encode('utf-8')).hexdigest()] = canonical_id
 
-# Mapping: sentence_hash → evidence_id
-evidence_hash_to_id = {}
+# Near-duplicate index over the canonical sentences already in the store
+near_dup_index = None
+if args.near_dup_threshold is not None:
+    near_dup_index = NearDuplicateIndex(threshold=args.near_dup_threshold)
+    for evidence_id, text in tqdm(evidence_id_to_text.items(), desc="Indexing existing evidence"):
+        near_dup_index.add(evidence_id, text)
+aliased_count = 0
 
 # Mapping: sentence_text → evidence_id
-evidence_text_to_id = {}
+evidence_text_to_id = {text: evidence_id for evidence_id, text in evidence_id_to_text.items()}
 
-# Mapping: evidence_id → sentence_text
-evidence_id_to_text = {}
+# Global evidence counter continues after the highest persisted id
+global_evidence_id = max(evidence_id_to_text, default=-1) + 1
+first_new_evidence_id = global_evidence_id
 
-# Mapping: example_id → claim
-example_to_claim = {}
+# Sentences that still need to be embedded (delta only)
+new_contents = []
+new_evidence_ids = []
+
+# Mapping: evidence_id → membership keys (example and source) collected this run
+evidence_tags = {}
 
-# Main insertion loop with progress bar
+# Main assignment loop with progress bar
 for example in tqdm(all_examples, desc="Processing examples"):
-    example_id = example["example_id"]
+    example_id = str(example["example_id"])
     claim = example["claim"]
     evidence_list = example["evidence"]
     example_to_evidence_map[example_id] = []
@@ -43,20 +128,66 @@ for example in tqdm(all_examples, desc="Processing examples"):
         sentence_norm = sentence.strip()
         sentence_hash = hashlib.md5(sentence_norm.encode('utf-8')).hexdigest()
 
+        canonical_id = None
+        if sentence_hash not in evidence_hash_to_id and near_dup_index is not None:
+            signature = near_dup_index.signature(sentence_norm)
+            canonical_id = near_dup_index.find(sentence_norm, signature)
+
         if sentence_hash in evidence_hash_to_id:
             evidence_id = evidence_hash_to_id[sentence_hash]
+        elif canonical_id is not None:
+            # Near-duplicate of an existing sentence: reuse its id and record the alias
+            evidence_id = canonical_id
+            evidence_hash_to_id[sentence_hash] = evidence_id
+            evidence_aliases[sentence_norm] = evidence_id
+            aliased_count += 1
         else:
             evidence_id = global_evidence_id
             evidence_hash_to_id[sentence_hash] = evidence_id
             evidence_text_to_id[sentence_norm] = evidence_id
             evidence_id_to_text[evidence_id] = sentence_norm
             global_evidence_id += 1
-            chroma_client.add_document(
-                content=sentence,
-                metadata={
-                    "evidence_id": evidence_id
-                }
-            )
-        example_to_evidence_map[example_id].append(evidence_id)
-
-print(f"\nInserted {global_evidence_id} unique evidence sentences.")
\ No newline at end of file
+            new_contents.append(sentence_norm)
+            new_evidence_ids.append(evidence_id)
+            if near_dup_index is not None:
+                near_dup_index.add(evidence_id, sentence_norm, signature)
+        # Near-duplicate collapsing can map two sentences of one example onto the same id
+        if near_dup_index is None or evidence_id not in example_to_evidence_map[example_id]:
+            example_to_evidence_map[example_id].append(evidence_id)
+        # Tags go on the canonical sentence, so aliased evidence is still found by membership
+        evidence_tags.setdefault(evidence_id, set()).update(
+            (ChromaClient.example_key(example_id), ChromaClient.source_key(source)))
+
+# Upsert only the new sentences; ids are content hashes so a repeated run is a no-op
+new_metadatas = [
+    {"evidence_id": evidence_id, **{key: True for key in sorted(evidence_tags[evidence_id])}}
+    for evidence_id in new_evidence_ids
+]
+embedded = chroma_client.add_documents(new_contents, new_metadatas, batch_size=args.batch_size)
+
+# Sentences embedded by an earlier run gain the membership of this run's examples
+new_ids = set(new_evidence_ids)
+tagged = chroma_client.tag_documents(
+    {evidence_id_to_text[evidence_id]: keys for evidence_id, keys in evidence_tags.items() if evidence_id not in new_ids},
+    batch_size=args.batch_size
+)
+
+# Aliased sentences embedded by an earlier build would still be searchable under a stale id
+removed_aliases = chroma_client.delete_documents(list(evidence_aliases), batch_size=args.batch_size) if evidence_aliases else 0
+
+save_json({str(k): v for k, v in evidence_id_to_text.items()}, evidence_id_to_text_path)
+save_json(example_to_evidence_map, example_to_evidence_map_path)
+save_json(example_to_claim, example_to_claim_path)
+save_json(evidence_aliases, evidence_aliases_path)
+EvidenceStore.build(evidence_id_to_text, os.path.join(args.data_dir, "evidence_store"))
+
+print(f"\nAssigned {global_evidence_id - first_new_evidence_id} new evidence ids "
+      f"({first_new_evidence_id}..{global_evidence_id - 1}), embedded {embedded} sentences, "
+      f"updated the membership of {tagged} existing sentences.")
+print(f"Store now holds {len(evidence_id_to_text)} unique evidence sentences.")
+if near_dup_index is not None:
+    distinct = len(evidence_id_to_text) + len(evidence_aliases)
+    print(f"Near-duplicate collapsing: {aliased_count} new aliases this run, {len(evidence_aliases)} in total, "
+          f"{removed_aliases} aliased documents removed from the collection; "
+          f"corpus shrank from {distinct} to {len(evidence_id_to_text)} sentences "
+          f"({len(evidence_aliases) / distinct:.2%} smaller).")
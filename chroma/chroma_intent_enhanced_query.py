@@ -1,4 +1,6 @@
-from chroma import ChromaClient
+from chroma import ChromaClient, build_embedding_function
+from evidence_store import open_evidence_store
+from fusion import fuse
 import sys
 import os
 import json
@@ -7,7 +9,9 @@ import argparse
 from tqdm import tqdm
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from agents.intent_enhanced_retrieval import intent_enhanced_reformulation, set_model_info
+from agents.intent_enhanced_retrieval import (
+    intent_enhanced_reformulation, infer_intents_batch, reformulate_claims_batch, set_model_info
+)
 from model.loader import load_model
 
 # Add command line argument parsing
@@ -35,6 +39,60 @@ def parse_args():
         default="gpt-4o-mini",
         help="GPT model name (default: gpt-4o-mini)"
     )
+    parser.add_argument(
+        "--top_k",
+        type=int,
+        default=20,
+        help="Number of fused evidence sentences kept per claim (default: 20)"
+    )
+    parser.add_argument(
+        "--fusion",
+        choices=["rrf", "distance"],
+        default="rrf",
+        help="How pro and con rankings are merged: reciprocal rank fusion or normalized distance (default: rrf)"
+    )
+    parser.add_argument(
+        "--rrf_k",
+        type=int,
+        default=60,
+        help="RRF damping constant (default: 60)"
+    )
+    parser.add_argument(
+        "--encoder",
+        choices=["torch", "onnx", "onnx_int8"],
+        default="torch",
+        help="Embedding backend: fp32 SentenceTransformer, ONNX, or int8-quantized ONNX (default: torch)"
+    )
+    parser.add_argument(
+        "--embedding_cache",
+        type=str,
+        default=None,
+        help="SQLite file caching query embeddings across runs (default: no cache)"
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=16,
+        help="Number of prompts per LLM generate call (concurrent requests for gpt) (default: 16)"
+    )
+    parser.add_argument(
+        "--query_batch_size",
+        type=int,
+        default=64,
+        help="Number of claims whose pro/con queries are sent to Chroma in one call (default: 64)"
+    )
+    parser.add_argument(
+        "--retrieval_server",
+        type=str,
+        default=None,
+        help="URL of a running retrieval_server.py; queries go there instead of loading a local model and index"
+    )
+    parser.add_argument(
+        "--index",
+        choices=["chroma", "int8", "pq"],
+        default="chroma",
+        help="Query the fp32 Chroma index, or a compressed index saved by quantized_index.py --save_kind (default: chroma)"
+    )
     return parser.parse_args()
 
 # Parse arguments
@@ -45,7 +103,15 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
 
 # Initialize ChromaDB client
-chroma_client = ChromaClient(vector_name="evidence_bgebase", path="./chroma_store")
+if args.retrieval_server:
+    chroma_client = ChromaClient(vector_name="evidence_bgebase", remote_url=args.retrieval_server)
+else:
+    chroma_client = ChromaClient(
+        vector_name="evidence_bgebase",
+        path="./chroma_store",
+        embedding_function=build_embedding_function(args.encoder, cache_path=args.embedding_cache),
+        index=args.index
+    )
 
 # Load test claims with correct path
 test_file_path = os.path.join(project_root, "data", "test.json")
@@ -53,28 +119,61 @@ with open(test_file_path, "r") as f:
     all_examples = json.load(f)
 print(f"Loaded {len(all_examples)} examples from test.json")
 
-# Load evidence_id_to_text mapping with correct path
-evidence_file_path = os.path.join(project_root, "data", "evidence_id_to_text.json")
-with open(evidence_file_path, "r") as f:
-    evidence_id_to_text = json.load(f)
-print(f"Loaded {len(evidence_id_to_text)} evidence mappings")
+# Memory-mapped evidence texts (built from evidence_id_to_text.json on first use)
+evidence_store = open_evidence_store(os.path.join(project_root, "data"))
+print(f"Opened evidence store with {len(evidence_store)} evidence slots")
+
+# Hits on near-duplicates resolve to their canonical evidence id
+alias_ids = ChromaClient.load_alias_ids(os.path.join(project_root, "data"))
 
 # Output file - include model type in filename
 output_file = os.path.join(project_root, "data", f"retrieved_evidence_bgebase_intent_enhanced_{args.model}.json")
 
-# Load or initialize output map
-if os.path.exists(output_file):
-    with open(output_file, "r") as f:
-        example_to_retrieved_map = json.load(f)
-    print(f"Loaded existing data with {len(example_to_retrieved_map)} examples")
-else:
-    example_to_retrieved_map = {}
-    print("Starting fresh")
+# Append-only progress log: one JSON record per finished (stage, example).
+# The pipeline resumes from it, and the final JSON is written once at the end.
+log_file = os.path.splitext(output_file)[0] + ".jsonl"
+
+def read_log(path):
+    intents, reformulations, retrieved = {}, {}, {}
+    if not os.path.exists(path):
+        return intents, reformulations, retrieved
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Torn last line from an interrupted run; the example is simply redone
+                continue
+            if record["stage"] == "intent":
+                intents[record["example_id"]] = record["intent"]
+            elif record["stage"] == "reformulation":
+                reformulations[record["example_id"]] = (record["pro_claim"], record["con_claim"])
+            elif record["stage"] == "retrieval":
+                retrieved[record["example_id"]] = record["result"]
+    return intents, reformulations, retrieved
+
+def append_log(path, records):
+    with open(path, "a") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
 
 def save_to_json(data, filename):
     with open(filename, "w") as f:
         json.dump(data, f, indent=2)
 
+intents, reformulations, example_to_retrieved_map = read_log(log_file)
+
+# Results of runs made before the log existed are kept as finished
+if os.path.exists(output_file):
+    with open(output_file, "r") as f:
+        for example_id, result in json.load(f).items():
+            example_to_retrieved_map.setdefault(example_id, result)
+print(f"Resuming with {len(intents)} intents, {len(reformulations)} reformulations, "
+      f"{len(example_to_retrieved_map)} finished examples")
+
 # Test ChromaDB connection first
 print("Testing ChromaDB connection...")
 try:
@@ -109,87 +208,104 @@ except Exception as e:
     traceback.print_exc()
     sys.exit(1)
 
-for example in tqdm(all_examples, desc="Processing examples"):
-    example_id = str(example["example_id"])
+claims = {str(example["example_id"]): example["claim"] for example in all_examples}
+pending_ids = [example_id for example_id in claims if example_id not in example_to_retrieved_map]
 
-    if example_id in example_to_retrieved_map:
+# Stage 1: batch-infer intents for all pending claims
+need_intent = [example_id for example_id in pending_ids if example_id not in intents]
+for i in tqdm(range(0, len(need_intent), args.batch_size), desc="Stage 1: intents"):
+    batch_ids = need_intent[i:i + args.batch_size]
+    try:
+        batch_intents = infer_intents_batch([claims[eid] for eid in batch_ids], batch_size=args.batch_size)
+    except Exception as e:
+        print(f"Error inferring intents for {batch_ids}: {e}")
+        traceback.print_exc()
         continue
+    intents.update(zip(batch_ids, batch_intents))
+    append_log(log_file, [
+        {"stage": "intent", "example_id": eid, "intent": intent}
+        for eid, intent in zip(batch_ids, batch_intents)
+    ])
 
+# Stage 2: batch both reformulations (pro and con prompts share each generate call)
+need_reformulation = [eid for eid in pending_ids if eid in intents and eid not in reformulations]
+for i in tqdm(range(0, len(need_reformulation), args.batch_size), desc="Stage 2: reformulations"):
+    batch_ids = need_reformulation[i:i + args.batch_size]
     try:
-        claim = example["claim"]
-
-        # Step 1: Reformulate into pro and con versions
-        result = intent_enhanced_reformulation(claim)
-        pro_claim = result["reformulated_pro"]
-        con_claim = result["reformulated_con"]
-
-        # Step 2: Query ChromaDB with pro_claim and con_claim only (each gets 10 results)
-        pro_results = chroma_client.query(query_text=pro_claim, top_k=10, include=["metadatas"])
-        con_results = chroma_client.query(query_text=con_claim, top_k=10, include=["metadatas"])
-
-        # Step 3: Process pro results
-        pro_evidence_ids = []
-        pro_evidence_texts = []
-        if pro_results["metadatas"]:
-            for metadata in pro_results["metadatas"][0]:  # ChromaDB returns list of lists
-                evidence_id = metadata["evidence_id"]
-                evidence_id_str = str(evidence_id)
-                pro_evidence_ids.append(evidence_id)
-                if evidence_id_str in evidence_id_to_text:
-                    pro_evidence_texts.append(evidence_id_to_text[evidence_id_str])
-                else:
-                    pro_evidence_texts.append("Evidence not found")
-
-        # Step 4: Process con results
-        con_evidence_ids = []
-        con_evidence_texts = []
-        if con_results["metadatas"]:
-            for metadata in con_results["metadatas"][0]:  # ChromaDB returns list of lists
-                evidence_id = metadata["evidence_id"]
-                evidence_id_str = str(evidence_id)
-                con_evidence_ids.append(evidence_id)
-                if evidence_id_str in evidence_id_to_text:
-                    con_evidence_texts.append(evidence_id_to_text[evidence_id_str])
-                else:
-                    con_evidence_texts.append("Evidence not found")
-
-        # Step 5: Merge and deduplicate results using set
-        combined_ids = pro_evidence_ids + con_evidence_ids
-        combined_texts = pro_evidence_texts + con_evidence_texts
-
-        # Use set to deduplicate IDs (this will lose order but match the desired approach)
-        final_evidence_ids = list(set(combined_ids))
-
-        # Get corresponding texts for deduplicated IDs
-        final_evidence_texts = []
-        for evidence_id in final_evidence_ids:
-            evidence_id_str = str(evidence_id)
-            if evidence_id_str in evidence_id_to_text:
-                final_evidence_texts.append(evidence_id_to_text[evidence_id_str])
-            else:
-                final_evidence_texts.append("Evidence not found")
-
-        # Step 6: Save
-        example_to_retrieved_map[example_id] = {
-            "claim": claim,
-            "intent": result["intent"],
+        pros, cons = reformulate_claims_batch(
+            [claims[eid] for eid in batch_ids],
+            [intents[eid] for eid in batch_ids],
+            batch_size=args.batch_size
+        )
+    except Exception as e:
+        print(f"Error reformulating {batch_ids}: {e}")
+        traceback.print_exc()
+        continue
+    reformulations.update(zip(batch_ids, zip(pros, cons)))
+    append_log(log_file, [
+        {"stage": "reformulation", "example_id": eid, "pro_claim": pro, "con_claim": con}
+        for eid, pro, con in zip(batch_ids, pros, cons)
+    ])
+
+# Stage 3: batched retrieval; every claim contributes its pro and con query to one Chroma call
+need_retrieval = [eid for eid in pending_ids if eid in reformulations]
+for i in tqdm(range(0, len(need_retrieval), args.query_batch_size), desc="Stage 3: retrieval"):
+    batch_ids = need_retrieval[i:i + args.query_batch_size]
+    try:
+        query_texts = [text for eid in batch_ids for text in reformulations[eid]]
+        results = chroma_client.query_batch(
+            query_texts=query_texts,
+            top_k=args.top_k,
+            include=["metadatas", "distances"]
+        )
+    except Exception as e:
+        print(f"Error retrieving evidence for {batch_ids}: {e}")
+        traceback.print_exc()
+        continue
+
+    records = []
+    for j, example_id in enumerate(batch_ids):
+        pro_claim, con_claim = reformulations[example_id]
+        pro_evidence_ids, pro_distances = ChromaClient.canonical_hits(
+            results["ids"][2 * j], results["metadatas"][2 * j], alias_ids, results["distances"][2 * j])
+        con_evidence_ids, con_distances = ChromaClient.canonical_hits(
+            results["ids"][2 * j + 1], results["metadatas"][2 * j + 1], alias_ids, results["distances"][2 * j + 1])
+
+        # Fuse both rankings into one stable, fixed-size list
+        fused = fuse(
+            [pro_evidence_ids, con_evidence_ids],
+            distance_lists=[pro_distances, con_distances],
+            top_k=args.top_k,
+            method=args.fusion,
+            rrf_k=args.rrf_k
+        )
+        final_evidence_ids = [evidence_id for evidence_id, _ in fused]
+
+        result = {
+            "claim": claims[example_id],
+            "intent": intents[example_id],
             "pro_claim": pro_claim,
             "con_claim": con_claim,
             "pro_evidence_ids": pro_evidence_ids,
-            "pro_evidence_texts": pro_evidence_texts,
+            "pro_evidence_texts": evidence_store.get_many(pro_evidence_ids, default="Evidence not found"),
             "con_evidence_ids": con_evidence_ids,
-            "con_evidence_texts": con_evidence_texts,
+            "con_evidence_texts": evidence_store.get_many(con_evidence_ids, default="Evidence not found"),
+            "fusion": args.fusion,
             "evidences_ids": final_evidence_ids,
-            "evidence_full_text": final_evidence_texts
+            "evidence_scores": [score for _, score in fused],
+            "evidence_full_text": evidence_store.get_many(final_evidence_ids, default="Evidence not found")
         }
+        example_to_retrieved_map[example_id] = result
+        records.append({"stage": "retrieval", "example_id": example_id, "result": result})
+    append_log(log_file, records)
 
-        save_to_json(example_to_retrieved_map, output_file)
-
-    except Exception as e:
-        print(f"Error on {example_id}: {e}")
-        traceback.print_exc()
-        save_to_json(example_to_retrieved_map, output_file)
-        continue
+# Write the final JSON once, in input order
+save_to_json(
+    {eid: example_to_retrieved_map[eid] for eid in claims if eid in example_to_retrieved_map},
+    output_file
+)
 
 print(f"All done. Total processed: {len(example_to_retrieved_map)}")
-print(f"Output saved to: {output_file}")
\ No newline at end of file
+print(f"Output saved to: {output_file}")
+if args.embedding_cache and chroma_client.embedding_function is not None:
+    print(f"Embedding cache: {chroma_client.embedding_function.stats()}")
\ No newline at end of file
@@ -1,31 +1,136 @@
-from chroma import ChromaClient
+from chroma import ChromaClient, build_embedding_function
+from evidence_store import open_evidence_store
 import json
+import argparse
 from tqdm import tqdm
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Retrieve evidence for every claim with basic vector search")
+    parser.add_argument(
+        "--top_k",
+        type=int,
+        default=20,
+        help="Number of bi-encoder hits retrieved per claim (default: 20)"
+    )
+    parser.add_argument(
+        "--rerank_model",
+        type=str,
+        default=None,
+        help="Cross-encoder used to re-rank the bi-encoder hits, e.g. BAAI/bge-reranker-base (default: no re-ranking)"
+    )
+    parser.add_argument(
+        "--rerank_top_k",
+        type=int,
+        default=10,
+        help="Number of evidence sentences kept after re-ranking (default: 10)"
+    )
+    parser.add_argument(
+        "--rerank_batch_size",
+        type=int,
+        default=64,
+        help="Cross-encoder batch size (default: 64)"
+    )
+    parser.add_argument(
+        "--rerank_cache",
+        type=str,
+        default="../data/rerank_score_cache.json",
+        help="File used to cache cross-encoder scores by (claim hash, evidence_id)"
+    )
+    parser.add_argument(
+        "--output_file",
+        type=str,
+        default="../data/retrieved_evidence_bgebase.json",
+        help="Where to write the retrieved evidence map"
+    )
+    parser.add_argument(
+        "--encoder",
+        choices=["torch", "onnx", "onnx_int8"],
+        default="torch",
+        help="Embedding backend: fp32 SentenceTransformer, ONNX, or int8-quantized ONNX (default: torch)"
+    )
+    parser.add_argument(
+        "--embedding_cache",
+        type=str,
+        default=None,
+        help="SQLite file caching query embeddings across runs (default: no cache)"
+    )
+    parser.add_argument(
+        "--scope",
+        choices=["global", "oracle", "subset"],
+        default="global",
+        help="global: search the whole store; oracle: search only each example's own gold evidence; "
+             "subset: search only the evidence of the examples in --subset_file (default: global)"
+    )
+    parser.add_argument(
+        "--subset_file",
+        type=str,
+        default="../veracity_examples_results.json",
+        help="JSON {category: [example_id, ...]} selecting the examples of a subset run"
+    )
+    parser.add_argument(
+        "--retrieval_server",
+        type=str,
+        default=None,
+        help="URL of a running retrieval_server.py; queries go there instead of loading a local model and index"
+    )
+    parser.add_argument(
+        "--index",
+        choices=["chroma", "int8", "pq"],
+        default="chroma",
+        help="Query the fp32 Chroma index, or a compressed index saved by quantized_index.py --save_kind (default: chroma)"
+    )
+    return parser.parse_args()
+
+args = parse_args()
+if args.index != "chroma" and args.scope != "global":
+    raise SystemExit("Scoped retrieval filters on document metadata, which only the Chroma index stores")
+
 # Initialize ChromaDB client with the same collection name used during insertion
-chroma_client = ChromaClient(vector_name="evidence_bgebase", path="./chroma_store")
+if args.retrieval_server:
+    chroma_client = ChromaClient(vector_name="evidence_bgebase", remote_url=args.retrieval_server)
+else:
+    chroma_client = ChromaClient(
+        vector_name="evidence_bgebase",
+        path="./chroma_store",
+        embedding_function=build_embedding_function(args.encoder, cache_path=args.embedding_cache),
+        index=args.index
+    )
 
-# Load evidence_id_to_text mapping
-with open("../data/evidence_id_to_text.json", "r") as f:
-    evidence_id_to_text = json.load(f)
+# Memory-mapped evidence texts (built from evidence_id_to_text.json on first use)
+evidence_store = open_evidence_store("../data")
+
+# Hits on near-duplicates resolve to their canonical evidence id
+alias_ids = ChromaClient.load_alias_ids("../data")
 
 # Input claim to retrieve evidence for
 with open("../data/test.json", "r") as f:
     all_examples = json.load(f)
+
+# Scoped runs filter inside the vector search on the example membership keys chroma_add.py stores
+scope_filter = None
+if args.scope == "subset":
+    with open(args.subset_file, "r") as f:
+        subset_ids = {str(example_id) for ids in json.load(f).values() for example_id in ids}
+    all_examples = [example for example in all_examples if str(example["example_id"]) in subset_ids]
+    scope_filter = ChromaClient.example_filter(subset_ids)
+    print(f"Subset run: {len(all_examples)} examples")
+
 example_to_retrieved_evidence_map = {}
 for example in tqdm(all_examples, desc="Processing examples"):
     claim = example["claim"]
     example_id = example["example_id"]
+
+    where = scope_filter
+    if args.scope == "oracle":
+        where = ChromaClient.example_filter([example_id])
     
     # Perform vector similarity search
-    results = chroma_client.query(query_text=claim, top_k=20, include=["documents", "metadatas"])
+    results = chroma_client.query(query_text=claim, top_k=args.top_k, include=["documents", "metadatas"], where=where)
+    if args.scope == "oracle" and not results["ids"][0]:
+        continue  # No ingested evidence for this example
     
-    evidence_ids = []
-    evidence_text = []
-    for i, (text, meta) in enumerate(zip(results["documents"][0], results["metadatas"][0])):
-        evidence_id = meta["evidence_id"]
-        evidence_ids.append(evidence_id)
-        evidence_text.append(evidence_id_to_text[str(evidence_id)])
+    evidence_ids, _ = ChromaClient.canonical_hits(results["ids"][0], results["metadatas"][0], alias_ids)
+    evidence_text = evidence_store.get_many(evidence_ids, default="Evidence not found")
     
     example_to_retrieved_evidence_map[example_id] = {
         "claim": claim,
@@ -33,6 +138,32 @@ for example in tqdm(all_examples, desc="Processing examples"):
         "evidence_full_text": evidence_text
     }
 
+# Optional re-rank stage: score all (claim, evidence) pairs in large batches and keep the best
+if args.rerank_model:
+    from rerank import CrossEncoderReranker
+    reranker = CrossEncoderReranker(
+        model_name=args.rerank_model,
+        batch_size=args.rerank_batch_size,
+        cache_path=args.rerank_cache
+    )
+    example_ids = list(example_to_retrieved_evidence_map)
+    entries = [example_to_retrieved_evidence_map[eid] for eid in example_ids]
+    reranked = reranker.rerank_many(
+        [entry["claim"] for entry in entries],
+        [entry["top_20_evidences_ids"] for entry in entries],
+        [entry["evidence_full_text"] for entry in entries],
+        top_k=args.rerank_top_k
+    )
+    for entry, (evidence_ids, evidence_text, scores) in zip(entries, reranked):
+        entry["top_20_evidences_ids"] = evidence_ids
+        entry["evidence_full_text"] = evidence_text
+        entry["rerank_scores"] = scores
+    reranker.save_cache()
+    print(f"Re-ranked with {args.rerank_model}, kept top {args.rerank_top_k} per claim")
+
 # Save mapping to JSON
-with open("../data/retrieved_evidence_bgebase.json", "w") as f:
-    json.dump(example_to_retrieved_evidence_map, f, indent=2)
\ No newline at end of file
+with open(args.output_file, "w") as f:
+    json.dump(example_to_retrieved_evidence_map, f, indent=2)
+
+if args.embedding_cache and chroma_client.embedding_function is not None:
+    print(f"Embedding cache: {chroma_client.embedding_function.stats()}")
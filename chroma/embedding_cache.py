@@ -0,0 +1,106 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different reformulations share a cache entry."""
+    return " ".join(text.split())
+
+class CachedEmbeddingFunction(EmbeddingFunction):
+    """
+    Bounded in-memory LRU in front of another embedding function, optionally
+    backed by an on-disk SQLite store that survives between runs.
+
+    Entries are keyed by (model name, normalized text). Misses are embedded in
+    a single call to the wrapped function.
+    """
+    def __init__(self, embedding_function, model_name=None, max_size=100000, cache_path=None):
+        self.embedding_function = embedding_function
+        self.model_name = model_name or getattr(embedding_function, "model_name", type(embedding_function).__name__)
+        self.max_size = max_size
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self.db = None
+        if cache_path:
+            self.db = sqlite3.connect(cache_path, check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+            self.db.commit()
+
+    def _key(self, text):
+        return hashlib.sha1(f"{self.model_name}\x00{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+    def _remember(self, key, vector):
+        self.memory[key] = vector
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_size:
+            self.memory.popitem(last=False)
+
+    def __call__(self, input: Documents) -> list:
+        keys = [self._key(text) for text in input]
+        vectors = [None] * len(keys)
+        missing = {}
+
+        with self.lock:
+            for i, key in enumerate(keys):
+                if key in self.memory:
+                    self.memory.move_to_end(key)
+                    vectors[i] = self.memory[key]
+                    self.hits += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+
+            if missing and self.db is not None:
+                lookup = list(missing)
+                for start in range(0, len(lookup), 500):
+                    chunk = lookup[start:start + 500]
+                    rows = self.db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float32).tolist()
+                        self._remember(key, vector)
+                        for i in missing.pop(key):
+                            vectors[i] = vector
+                            self.disk_hits += 1
+
+        if missing:
+            texts = [input[positions[0]] for positions in missing.values()]
+            embedded = self.embedding_function(texts)
+            with self.lock:
+                for (key, positions), vector in zip(missing.items(), embedded):
+                    vector = list(vector)
+                    self._remember(key, vector)
+                    for i in positions:
+                        vectors[i] = vector
+                    self.misses += len(positions)
+                if self.db is not None:
+                    self.db.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                        [(key, np.asarray(vector, dtype=np.float32).tobytes())
+                         for key, vector in zip(missing, embedded)]
+                    )
+                    self.db.commit()
+
+        return vectors
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / total if total > 0 else 0.0
+
+    def stats(self):
+        return {
+            "memory_hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "memory_entries": len(self.memory)
+        }
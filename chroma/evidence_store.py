@@ -0,0 +1,102 @@
+import os
+import json
+import mmap
+import argparse
+import numpy as np
+
+class EvidenceStore:
+    """
+    Read-only evidence text store: one concatenated UTF-8 blob plus an int64
+    offsets array, both memory-mapped.
+
+    Text for evidence_id i lives at blob[offsets[i]:offsets[i + 1]]. Ids are the
+    dense integers assigned by chroma_add.py; an id that was never assigned has
+    an empty span. Because the files are mapped read-only, every process on a
+    node shares the same pages through the OS page cache.
+    """
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.offsets = np.load(f"{prefix}.offsets.npy", mmap_mode="r")
+        self._file = open(f"{prefix}.bin", "rb")
+        if os.fstat(self._file.fileno()).st_size > 0:
+            self._blob = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._blob = b""
+        self._view = memoryview(self._blob)
+
+    @staticmethod
+    def build(evidence_id_to_text, prefix):
+        """Write the blob and offsets for a {evidence_id: text} mapping (keys may be int or str)."""
+        texts = {int(k): v for k, v in evidence_id_to_text.items()}
+        size = max(texts, default=-1) + 1
+        encoded = [texts.get(i, "").encode('utf-8') for i in range(size)]
+        offsets = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        with open(f"{prefix}.bin", "wb") as f:
+            for b in encoded:
+                f.write(b)
+        np.save(f"{prefix}.offsets.npy", offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __contains__(self, evidence_id):
+        evidence_id = int(evidence_id)
+        return 0 <= evidence_id < len(self) and self.offsets[evidence_id + 1] > self.offsets[evidence_id]
+
+    def get_bytes(self, evidence_id):
+        """Zero-copy view of the UTF-8 bytes for one evidence id."""
+        evidence_id = int(evidence_id)
+        return self._view[self.offsets[evidence_id]:self.offsets[evidence_id + 1]]
+
+    def get(self, evidence_id, default=None):
+        if evidence_id not in self:
+            return default
+        return str(self.get_bytes(evidence_id), 'utf-8')
+
+    def get_many(self, evidence_ids, default=None):
+        """Fetch many texts with a single vectorized offsets lookup."""
+        ids = np.asarray(evidence_ids, dtype=np.int64)
+        if ids.size == 0:
+            return []
+        if len(self) == 0:
+            return [default] * ids.size
+        valid = (ids >= 0) & (ids < len(self))
+        safe = np.where(valid, ids, 0)
+        starts = self.offsets[safe]
+        ends = self.offsets[safe + 1]
+        valid &= ends > starts
+        view = self._view
+        return [
+            str(view[start:end], 'utf-8') if ok else default
+            for start, end, ok in zip(starts.tolist(), ends.tolist(), valid.tolist())
+        ]
+
+    def close(self):
+        self._view.release()
+        if isinstance(self._blob, mmap.mmap):
+            self._blob.close()
+        self._file.close()
+
+def open_evidence_store(data_dir="../data", name="evidence_store"):
+    """
+    Open the memory-mapped store in data_dir, converting evidence_id_to_text.json
+    on first use when the store has not been built yet.
+    """
+    prefix = os.path.join(data_dir, name)
+    if not os.path.exists(f"{prefix}.offsets.npy"):
+        with open(os.path.join(data_dir, "evidence_id_to_text.json"), "r") as f:
+            EvidenceStore.build(json.load(f), prefix)
+    return EvidenceStore(prefix)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the memory-mapped evidence store from evidence_id_to_text.json")
+    parser.add_argument("--input_file", type=str, default="../data/evidence_id_to_text.json")
+    parser.add_argument("--prefix", type=str, default="../data/evidence_store")
+    args = parser.parse_args()
+
+    with open(args.input_file, "r") as f:
+        evidence_id_to_text = json.load(f)
+    EvidenceStore.build(evidence_id_to_text, args.prefix)
+    store = EvidenceStore(args.prefix)
+    print(f"Wrote {len(store)} evidence slots to {args.prefix}.bin / {args.prefix}.offsets.npy")
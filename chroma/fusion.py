@@ -0,0 +1,67 @@
+def reciprocal_rank_fusion(ranked_id_lists, top_k=20, k=60):
+    """
+    Fuse several ranked evidence-id lists with Reciprocal Rank Fusion.
+
+    Args:
+        ranked_id_lists: list of evidence-id lists, each ordered best first
+        top_k: number of fused results to return
+        k: RRF damping constant (60 is the value from the original RRF paper)
+
+    Returns:
+        List of (evidence_id, score) tuples, best first. Ties are broken by the
+        best rank the id reached in any list, then by list order, so the result
+        is stable across runs.
+    """
+    scores = {}
+    best_position = {}
+    for list_index, ids in enumerate(ranked_id_lists):
+        for rank, evidence_id in enumerate(ids):
+            scores[evidence_id] = scores.get(evidence_id, 0.0) + 1.0 / (k + rank + 1)
+            position = (rank, list_index)
+            if evidence_id not in best_position or position < best_position[evidence_id]:
+                best_position[evidence_id] = position
+
+    ordered = sorted(scores, key=lambda eid: (-scores[eid], best_position[eid]))
+    return [(evidence_id, scores[evidence_id]) for evidence_id in ordered[:top_k]]
+
+def distance_fusion(ranked_id_lists, distance_lists, top_k=20):
+    """
+    Fuse ranked lists by min-max normalizing each list's distances into a
+    [0, 1] similarity and keeping the best similarity seen for every id.
+
+    Args:
+        ranked_id_lists: list of evidence-id lists, each ordered best first
+        distance_lists: distances returned by Chroma, aligned with ranked_id_lists
+        top_k: number of fused results to return
+
+    Returns:
+        List of (evidence_id, score) tuples, best first.
+    """
+    scores = {}
+    best_position = {}
+    for list_index, (ids, distances) in enumerate(zip(ranked_id_lists, distance_lists)):
+        if not ids:
+            continue
+        lo, hi = min(distances), max(distances)
+        span = hi - lo
+        for rank, (evidence_id, distance) in enumerate(zip(ids, distances)):
+            similarity = 1.0 - (distance - lo) / span if span > 0 else 1.0
+            if similarity > scores.get(evidence_id, -1.0):
+                scores[evidence_id] = similarity
+            position = (rank, list_index)
+            if evidence_id not in best_position or position < best_position[evidence_id]:
+                best_position[evidence_id] = position
+
+    ordered = sorted(scores, key=lambda eid: (-scores[eid], best_position[eid]))
+    return [(evidence_id, scores[evidence_id]) for evidence_id in ordered[:top_k]]
+
+def fuse(ranked_id_lists, distance_lists=None, top_k=20, method="rrf", rrf_k=60):
+    """Dispatch to the requested fusion method."""
+    if method == "rrf":
+        return reciprocal_rank_fusion(ranked_id_lists, top_k=top_k, k=rrf_k)
+    elif method == "distance":
+        if distance_lists is None:
+            raise ValueError("distance fusion requires distance_lists")
+        return distance_fusion(ranked_id_lists, distance_lists, top_k=top_k)
+    else:
+        raise ValueError(f"Unsupported fusion method: {method}")
@@ -0,0 +1,132 @@
+import re
+import json
+import zlib
+import argparse
+from collections import defaultdict
+import numpy as np
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_CITATION_RE = re.compile(r'(\(\s*[^()]*\d{4}[^()]*\)|\[\s*\d+(?:\s*,\s*\d+)*\s*\])\s*$')
+_PUNCT_RE = re.compile(r'[^\w\s]')
+
+def normalize_for_dedup(text):
+    """Lowercase, drop a trailing citation, quotes and punctuation, collapse whitespace."""
+    text = _CITATION_RE.sub("", text.strip())
+    text = _PUNCT_RE.sub(" ", text.lower())
+    return " ".join(text.split())
+
+def shingles(text, k=3):
+    words = normalize_for_dedup(text).split()
+    if len(words) < k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+class NearDuplicateIndex:
+    """
+    MinHash signatures with LSH banding for near-duplicate evidence sentences.
+
+    Candidates sharing at least one band bucket are verified against the
+    estimated Jaccard similarity of their signatures before they are merged.
+    """
+    def __init__(self, threshold=0.8, num_perm=128, bands=16, shingle_size=3, seed=1):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, _MAX_HASH, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, _MAX_HASH, size=num_perm, dtype=np.uint64)
+
+        self.buckets = [defaultdict(list) for _ in range(bands)]
+        self.signatures = {}
+
+    def signature(self, text):
+        grams = shingles(text, self.shingle_size)
+        if not grams:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        hashes = np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams))
+        permuted = (self.a[:, None] * hashes[None, :] + self.b[:, None]) % np.uint64(_MERSENNE_PRIME)
+        return permuted.min(axis=1)
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def find(self, text, signature=None):
+        """Return the evidence_id of the closest indexed near-duplicate, or None."""
+        if signature is None:
+            signature = self.signature(text)
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self.buckets[band].get(key, ()))
+
+        best_id, best_similarity = None, self.threshold
+        for candidate in sorted(candidates):
+            similarity = float(np.mean(self.signatures[candidate] == signature))
+            if similarity >= best_similarity and (best_id is None or similarity > best_similarity):
+                best_id, best_similarity = candidate, similarity
+        return best_id
+
+    def add(self, evidence_id, text, signature=None):
+        if signature is None:
+            signature = self.signature(text)
+        self.signatures[evidence_id] = signature
+        for band, key in enumerate(self._band_keys(signature)):
+            self.buckets[band][key].append(evidence_id)
+
+def diversity_report(retrieved_map, threshold=0.8, text_field="evidence_full_text"):
+    """
+    Measure how many top-k slots are spent on near-duplicates in an existing
+    retrieval output (one built without near-duplicate collapsing).
+
+    Returns:
+        dict with the average list length, average number of distinct
+        near-duplicate clusters, and the fraction of slots that were redundant.
+    """
+    index = NearDuplicateIndex(threshold=threshold)
+    cluster_of_text = {}
+    next_cluster = 0
+
+    total_slots, total_distinct = 0, 0
+    for entry in retrieved_map.values():
+        clusters = set()
+        for text in entry.get(text_field, []):
+            if text not in cluster_of_text:
+                signature = index.signature(text)
+                match = index.find(text, signature)
+                if match is None:
+                    match = next_cluster
+                    index.add(match, text, signature)
+                    next_cluster += 1
+                cluster_of_text[text] = match
+            clusters.add(cluster_of_text[text])
+        total_slots += len(entry.get(text_field, []))
+        total_distinct += len(clusters)
+
+    count = max(len(retrieved_map), 1)
+    return {
+        "examples": len(retrieved_map),
+        "avg_evidence_per_example": total_slots / count,
+        "avg_distinct_clusters": total_distinct / count,
+        "redundant_slot_rate": 1 - total_distinct / total_slots if total_slots else 0.0
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report near-duplicate redundancy in retrieved evidence")
+    parser.add_argument("--retrieved", type=str, default="../data/retrieved_evidence_bgebase.json")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+
+    with open(args.retrieved, "r") as f:
+        retrieved_map = json.load(f)
+    report = diversity_report(retrieved_map, threshold=args.threshold)
+    print(f"File: {args.retrieved}")
+    print(f"  Examples: {report['examples']}")
+    print(f"  Avg evidence per example: {report['avg_evidence_per_example']:.2f}")
+    print(f"  Avg distinct near-duplicate clusters: {report['avg_distinct_clusters']:.2f}")
+    print(f"  Redundant slots: {report['redundant_slot_rate']:.2%}")
@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction
+
+def export_onnx(model_name='BAAI/bge-base-en-v1.5', output_dir="./onnx/bge-base-en-v1.5", quantize=True):
+    """
+    Export a Hugging Face encoder to ONNX and optionally add an int8
+    dynamically-quantized copy next to it.
+
+    Returns:
+        Path of the model file that should be served (model_int8.onnx when quantized).
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+    except ImportError:
+        raise ImportError("ONNX export requires optimum. Please install it with: pip install optimum[onnxruntime]")
+
+    model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+    model.save_pretrained(output_dir)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(output_dir)
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    if not quantize:
+        return fp32_path
+
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    int8_path = os.path.join(output_dir, "model_int8.onnx")
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    return int8_path
+
+class OnnxEmbeddingFunction(EmbeddingFunction):
+    """
+    Drop-in replacement for SentenceTransformerEmbeddingFunction backed by an
+    exported (optionally int8-quantized) ONNX encoder.
+
+    Inputs are split into batches that run concurrently on a thread pool; each
+    ONNX Runtime session call releases the GIL, so batches use separate cores.
+    Pooling matches bge: CLS token followed by L2 normalization.
+    """
+    def __init__(self, model_dir="./onnx/bge-base-en-v1.5", quantized=True, batch_size=32,
+                 num_threads=4, intra_op_threads=1, max_length=512):
+        try:
+            import onnxruntime as ort
+            from transformers import AutoTokenizer
+        except ImportError:
+            raise ImportError("ONNX encoding requires onnxruntime. Please install it with: pip install onnxruntime")
+
+        model_file = "model_int8.onnx" if quantized else "model.onnx"
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.executor = ThreadPoolExecutor(max_workers=num_threads)
+
+    def _encode_batch(self, texts):
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np"
+        )
+        feeds = {name: value.astype(np.int64) for name, value in encoded.items() if name in self.input_names}
+        last_hidden_state = self.session.run(None, feeds)[0]
+        cls = last_hidden_state[:, 0]
+        return cls / np.linalg.norm(cls, axis=1, keepdims=True)
+
+    def encode(self, texts):
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        return np.vstack(list(self.executor.map(self._encode_batch, batches)))
+
+    def __call__(self, input: Documents) -> list:
+        return self.encode(list(input)).tolist()
+
+def parity_check(texts, onnx_function, model_name='BAAI/bge-base-en-v1.5'):
+    """
+    Compare ONNX embeddings against the fp32 SentenceTransformer model.
+
+    Returns:
+        dict with mean and minimum cosine similarity between the two encoders.
+    """
+    from sentence_transformers import SentenceTransformer
+    reference = SentenceTransformer(model_name, trust_remote_code=True)
+    expected = reference.encode(texts, normalize_embeddings=True)
+    actual = onnx_function.encode(texts)
+    cosines = np.sum(expected * actual, axis=1)
+    return {"mean_cosine": float(cosines.mean()), "min_cosine": float(cosines.min()), "count": len(texts)}
+
+def benchmark(embedding_function, texts, repeats=3):
+    """Return the best observed throughput in sentences per second."""
+    embedding_function(texts[:8])  # warm up
+    best = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        embedding_function(texts)
+        elapsed = time.perf_counter() - start
+        best = max(best, len(texts) / elapsed)
+    return best
+
+def load_sample_texts(evidence_file, limit):
+    with open(evidence_file, "r") as f:
+        evidence_id_to_text = json.load(f)
+    return list(evidence_id_to_text.values())[:limit]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export, verify and benchmark the ONNX bge encoder")
+    parser.add_argument("command", choices=["export", "check", "bench"])
+    parser.add_argument("--model_name", type=str, default='BAAI/bge-base-en-v1.5')
+    parser.add_argument("--model_dir", type=str, default="./onnx/bge-base-en-v1.5")
+    parser.add_argument("--no_quantize", action="store_true", help="Use the fp32 ONNX model instead of int8")
+    parser.add_argument("--evidence_file", type=str, default="../data/evidence_id_to_text.json")
+    parser.add_argument("--sample_size", type=int, default=1000)
+    parser.add_argument("--num_threads", type=int, default=4)
+    parser.add_argument("--batch_size", type=int, default=32)
+    parser.add_argument("--min_cosine", type=float, default=0.99,
+                        help="Parity check fails if the mean cosine falls below this value")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        path = export_onnx(args.model_name, args.model_dir, quantize=not args.no_quantize)
+        print(f"Exported encoder to: {path}")
+    else:
+        texts = load_sample_texts(args.evidence_file, args.sample_size)
+        onnx_function = OnnxEmbeddingFunction(
+            model_dir=args.model_dir,
+            quantized=not args.no_quantize,
+            batch_size=args.batch_size,
+            num_threads=args.num_threads
+        )
+        if args.command == "check":
+            result = parity_check(texts, onnx_function, args.model_name)
+            print(f"Parity over {result['count']} sentences: "
+                  f"mean cosine {result['mean_cosine']:.4f}, min cosine {result['min_cosine']:.4f}")
+            if result["mean_cosine"] < args.min_cosine:
+                raise SystemExit(f"Parity check failed: mean cosine below {args.min_cosine}")
+        else:
+            from chroma import SentenceTransformerEmbeddingFunction
+            torch_rate = benchmark(SentenceTransformerEmbeddingFunction(args.model_name), texts)
+            onnx_rate = benchmark(onnx_function, texts)
+            print(f"fp32 PyTorch: {torch_rate:.1f} sentences/s")
+            print(f"ONNX ({'fp32' if args.no_quantize else 'int8'}): {onnx_rate:.1f} sentences/s "
+                  f"({onnx_rate / torch_rate:.2f}x)")
@@ -0,0 +1,296 @@
+import os
+import json
+import argparse
+import tempfile
+import numpy as np
+
+class ScalarQuantizer:
+    """int8 scalar quantization with a per-dimension min/scale."""
+    name = "int8"
+
+    def fit(self, vectors):
+        self.low = vectors.min(axis=0)
+        self.scale = np.maximum(vectors.max(axis=0) - self.low, 1e-12) / 255.0
+        return self
+
+    def encode(self, vectors):
+        return np.clip(np.rint((vectors - self.low) / self.scale), 0, 255).astype(np.uint8)
+
+    def scores(self, query, codes, chunk_size=65536):
+        """Asymmetric inner product: float query against the dequantized codes, chunk by chunk."""
+        offset = float(query @ self.low)
+        weighted = (query * self.scale).astype(np.float32)
+        out = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), chunk_size):
+            out[start:start + chunk_size] = codes[start:start + chunk_size].astype(np.float32) @ weighted + offset
+        return out
+
+    def codebook_bytes(self):
+        return self.low.nbytes + self.scale.nbytes
+
+    def state(self):
+        return {"low": self.low, "scale": self.scale}
+
+    def load_state(self, state):
+        self.low, self.scale = state["low"], state["scale"]
+        return self
+
+class ProductQuantizer:
+    """Product quantization: m sub-spaces, 256 centroids each, one uint8 code per sub-space."""
+    name = "pq"
+
+    def __init__(self, m=96, iterations=20, sample_size=50000, seed=0):
+        self.m = m
+        self.iterations = iterations
+        self.sample_size = sample_size
+        self.seed = seed
+
+    def fit(self, vectors):
+        n, d = vectors.shape
+        if d % self.m != 0:
+            raise ValueError(f"Dimension {d} is not divisible by m={self.m}")
+        self.sub_dim = d // self.m
+        rng = np.random.RandomState(self.seed)
+        sample = vectors[rng.choice(n, size=min(n, self.sample_size), replace=False)]
+        self.centroids = np.stack([
+            self._kmeans(sample[:, j * self.sub_dim:(j + 1) * self.sub_dim], rng)
+            for j in range(self.m)
+        ])
+        return self
+
+    def _kmeans(self, data, rng, k=256):
+        k = min(k, len(data))
+        centroids = data[rng.choice(len(data), size=k, replace=False)].copy()
+        for _ in range(self.iterations):
+            assignment = self._nearest(data, centroids)
+            for c in range(k):
+                members = data[assignment == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+        if k < 256:
+            centroids = np.vstack([centroids, np.zeros((256 - k, data.shape[1]), dtype=centroids.dtype)])
+        return centroids
+
+    @staticmethod
+    def _nearest(data, centroids):
+        distances = (data ** 2).sum(axis=1, keepdims=True) - 2 * data @ centroids.T + (centroids ** 2).sum(axis=1)
+        return distances.argmin(axis=1)
+
+    def encode(self, vectors):
+        codes = np.empty((len(vectors), self.m), dtype=np.uint8)
+        for j in range(self.m):
+            codes[:, j] = self._nearest(vectors[:, j * self.sub_dim:(j + 1) * self.sub_dim], self.centroids[j])
+        return codes
+
+    def scores(self, query, codes):
+        """Asymmetric inner product via a per-query (m, 256) lookup table."""
+        table = np.einsum("jd,jkd->jk", query.reshape(self.m, self.sub_dim), self.centroids).astype(np.float32)
+        return table[np.arange(self.m), codes].sum(axis=1)
+
+    def codebook_bytes(self):
+        return self.centroids.nbytes
+
+    def state(self):
+        return {"centroids": self.centroids}
+
+    def load_state(self, state):
+        self.centroids = state["centroids"]
+        self.m, _, self.sub_dim = self.centroids.shape
+        return self
+
+class CompressedIndex:
+    """
+    Quantized codes held in memory for candidate generation, with an exact
+    re-rank of the top candidates against fp32 vectors that stay memory-mapped
+    on disk. Vectors are assumed L2-normalized (bge), so inner product ranks
+    the same as cosine or L2 distance.
+    """
+    def __init__(self, quantizer, codes, evidence_ids, full_vectors=None, doc_ids=None):
+        self.quantizer = quantizer
+        self.codes = codes
+        self.evidence_ids = np.asarray(evidence_ids)
+        self.full_vectors = full_vectors
+        # Chroma document ids, so hits on aliased near-duplicates can still be resolved
+        self.doc_ids = np.asarray(doc_ids) if doc_ids is not None else self.evidence_ids.astype(str)
+
+    @classmethod
+    def build(cls, quantizer, vectors, evidence_ids, full_vectors_path=None, doc_ids=None):
+        quantizer.fit(vectors)
+        full_vectors = None
+        if full_vectors_path:
+            np.save(full_vectors_path, vectors.astype(np.float32))
+            full_vectors = np.load(full_vectors_path, mmap_mode="r")
+        return cls(quantizer, quantizer.encode(vectors), evidence_ids, full_vectors, doc_ids)
+
+    def search(self, query, top_k=20, rerank=100):
+        """Return (evidence_ids, scores) of the top_k results, best first."""
+        positions, scores = self.rank(query, top_k, rerank)
+        return self.evidence_ids[positions].tolist(), scores.tolist()
+
+    def rank(self, query, top_k=20, rerank=100):
+        """Row positions and scores of the top_k results, best first."""
+        query = np.asarray(query, dtype=np.float32)
+        approx = self.quantizer.scores(query, self.codes)
+        shortlist_size = min(max(rerank, top_k), len(approx))
+        shortlist = np.argpartition(-approx, shortlist_size - 1)[:shortlist_size]
+        if self.full_vectors is not None and rerank > 0:
+            shortlist = np.sort(shortlist)
+            scores = np.asarray(self.full_vectors[shortlist]) @ query
+        else:
+            scores = approx[shortlist]
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return shortlist[order], scores[order]
+
+    def memory_bytes(self):
+        return self.codes.nbytes + self.quantizer.codebook_bytes() + self.evidence_ids.nbytes
+
+    def save(self, prefix):
+        np.savez(f"{prefix}.npz", codes=self.codes, evidence_ids=self.evidence_ids, doc_ids=self.doc_ids,
+                 kind=self.quantizer.name, **self.quantizer.state())
+
+    @classmethod
+    def load(cls, prefix, full_vectors_path=None):
+        data = np.load(f"{prefix}.npz")
+        kind = str(data["kind"])
+        quantizer = ScalarQuantizer() if kind == "int8" else ProductQuantizer()
+        quantizer.load_state({key: data[key] for key in data.files if key not in ("codes", "evidence_ids", "doc_ids", "kind")})
+        full_vectors = np.load(full_vectors_path, mmap_mode="r") if full_vectors_path else None
+        doc_ids = data["doc_ids"] if "doc_ids" in data.files else None
+        return cls(quantizer, data["codes"], data["evidence_ids"], full_vectors, doc_ids)
+
+def default_index_prefix(path, vector_name, kind):
+    """Where a compressed index of a collection is saved: next to the Chroma store it was exported from."""
+    return os.path.join(path, f"{vector_name}_{kind}")
+
+class CompressedCollection:
+    """
+    Read-only stand-in for a Chroma collection that answers queries from a
+    CompressedIndex, with exact re-rank against the memory-mapped fp32 vectors.
+    Only the codes stay in memory, so ChromaClient's query methods and
+    retrieval_server.py work unchanged on a much smaller index.
+    """
+    def __init__(self, index, embedding_function, rerank=100):
+        self.index = index
+        self.embedding_function = embedding_function
+        self.rerank = rerank
+
+    @classmethod
+    def load(cls, prefix, embedding_function, kind=None, rerank=100):
+        if not os.path.exists(f"{prefix}.npz"):
+            raise FileNotFoundError(f"No compressed index at {prefix}.npz; build one with quantized_index.py --save_kind")
+        full_vectors_path = f"{prefix}_full.npy"
+        index = CompressedIndex.load(prefix, full_vectors_path if os.path.exists(full_vectors_path) else None)
+        if kind is not None and index.quantizer.name != kind:
+            raise ValueError(f"{prefix}.npz holds a {index.quantizer.name} index, not {kind}")
+        return cls(index, embedding_function, rerank)
+
+    def query(self, query_texts, n_results=10, where=None, include=["documents", "metadatas", "distances"]):
+        if where is not None:
+            raise ValueError("The compressed index stores no metadata to filter on; use the Chroma index for scoped queries")
+        queries = np.asarray(self.embedding_function(list(query_texts)), dtype=np.float32)
+        ranked = [self.index.rank(query, top_k=n_results, rerank=self.rerank) for query in queries]
+        results = {"ids": [self.index.doc_ids[positions].tolist() for positions, _ in ranked]}
+        if "metadatas" in include:
+            results["metadatas"] = [[{"evidence_id": int(evidence_id)} for evidence_id in self.index.evidence_ids[positions]]
+                                    for positions, _ in ranked]
+        if "distances" in include:
+            # Squared L2 of unit vectors, the distance Chroma's default space reports
+            results["distances"] = [(2.0 - 2.0 * scores).tolist() for _, scores in ranked]
+        if "documents" in include:
+            results["documents"] = None  # Texts live in the evidence store, not in the index
+        return results
+
+    def count(self):
+        return len(self.index.codes)
+
+    def get(self, *args, **kwargs):
+        from retrieval_server import ReadOnlyCollectionError
+        raise ReadOnlyCollectionError("The compressed index is read-only; ingest with a Chroma-backed ChromaClient")
+
+    upsert = add = delete = update = get
+
+def export_vectors(collection, page_size=5000):
+    """Pull every embedding, evidence_id and document id out of a Chroma collection."""
+    vectors, evidence_ids, doc_ids = [], [], []
+    total = collection.count()
+    for offset in range(0, total, page_size):
+        page = collection.get(include=["embeddings", "metadatas"], limit=page_size, offset=offset)
+        vectors.append(np.asarray(page["embeddings"], dtype=np.float32))
+        evidence_ids.extend(meta["evidence_id"] for meta in page["metadatas"])
+        doc_ids.extend(page["ids"])
+    return np.vstack(vectors), np.asarray(evidence_ids), np.asarray(doc_ids)
+
+def tradeoff_report(vectors, evidence_ids, queries, quantizers, top_k=20, rerank_sizes=(0, 50, 200), work_dir=None):
+    """
+    Memory and recall@k against exact search for each quantizer and re-rank depth.
+    The fp32 copy used for re-ranking goes to a temporary directory (under work_dir if given).
+    """
+    exact_ids = [set(evidence_ids[np.argsort(-(vectors @ q))[:top_k]].tolist()) for q in queries]
+    rows = [{"index": "fp32 exact", "rerank": 0, "memory_mb": vectors.nbytes / 2**20, "recall": 1.0}]
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp_dir:
+        full_path = os.path.join(tmp_dir, "full_vectors.npy")
+        for quantizer in quantizers:
+            index = CompressedIndex.build(quantizer, vectors, evidence_ids, full_vectors_path=full_path)
+            for rerank in rerank_sizes:
+                hits = [len(set(index.search(q, top_k=top_k, rerank=rerank)[0]) & exact) / top_k
+                        for q, exact in zip(queries, exact_ids)]
+                label = quantizer.name if quantizer.name == "int8" else f"pq m={quantizer.m}"
+                rows.append({"index": label, "rerank": rerank,
+                             "memory_mb": index.memory_bytes() / 2**20, "recall": float(np.mean(hits))})
+            del index  # Release the memory map before the directory goes away
+    return rows
+
+if __name__ == "__main__":
+    from chroma import ChromaClient, build_embedding_function
+
+    parser = argparse.ArgumentParser(description="Memory/recall tradeoff of int8 and PQ compressed evidence indexes")
+    parser.add_argument("--vector_name", type=str, default="evidence_bgebase")
+    parser.add_argument("--path", type=str, default="./chroma_store")
+    parser.add_argument("--model_name", type=str, default='BAAI/bge-base-en-v1.5')
+    parser.add_argument("--claims_file", type=str, default="../data/example_to_claim.json")
+    parser.add_argument("--num_queries", type=int, default=500)
+    parser.add_argument("--top_k", type=int, default=20)
+    parser.add_argument("--pq_m", nargs="+", type=int, default=[64, 128],
+                        help="PQ sub-space counts to try; counts that do not divide the embedding dimension are skipped")
+    parser.add_argument("--rerank", nargs="+", type=int, default=[0, 50, 200],
+                        help="Exact re-rank depths to try (0 = ranking from codes only)")
+    parser.add_argument("--work_dir", type=str, default=None,
+                        help="Directory for the temporary fp32 copy used while measuring (default: system temp dir)")
+    parser.add_argument("--save_kind", choices=["int8", "pq"], default=None,
+                        help="Also save an index that ChromaClient(index=...) and retrieval_server.py --index can serve; "
+                             "pq uses the first valid --pq_m")
+    parser.add_argument("--save_prefix", type=str, default=None,
+                        help="Save as <prefix>.npz with fp32 vectors in <prefix>_full.npy "
+                             "(default: <path>/<vector_name>_<kind>; implies --save_kind int8 if not given)")
+    args = parser.parse_args()
+
+    embedding_function = build_embedding_function("torch", model_name=args.model_name)
+    client = ChromaClient(vector_name=args.vector_name, path=args.path, embedding_function=embedding_function)
+    vectors, evidence_ids, doc_ids = export_vectors(client.collection)
+
+    with open(args.claims_file, "r") as f:
+        claims = list(json.load(f).values())[:args.num_queries]
+    queries = np.asarray(embedding_function(claims), dtype=np.float32)
+
+    pq_m = [m for m in args.pq_m if vectors.shape[1] % m == 0]
+    for m in sorted(set(args.pq_m) - set(pq_m)):
+        print(f"Warning: --pq_m {m} does not divide the embedding dimension {vectors.shape[1]}, skipping...")
+    quantizers = [ScalarQuantizer()] + [ProductQuantizer(m=m) for m in pq_m]
+    rows = tradeoff_report(vectors, evidence_ids, queries, quantizers, top_k=args.top_k, rerank_sizes=args.rerank,
+                           work_dir=args.work_dir)
+
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} claim queries, recall@{args.top_k} vs exact")
+    print(f"{'index':<14} {'rerank':>7} {'memory MB':>10} {'recall':>8}")
+    for row in rows:
+        print(f"{row['index']:<14} {row['rerank']:>7} {row['memory_mb']:>10.1f} {row['recall']:>8.2%}")
+
+    if args.save_kind or args.save_prefix:
+        kind = args.save_kind or "int8"
+        if kind == "pq" and not pq_m:
+            parser.error("no --pq_m value divides the embedding dimension, cannot save a pq index")
+        quantizer = ScalarQuantizer() if kind == "int8" else ProductQuantizer(m=pq_m[0])
+        prefix = args.save_prefix or default_index_prefix(args.path, args.vector_name, kind)
+        index = CompressedIndex.build(quantizer, vectors, evidence_ids,
+                                      full_vectors_path=f"{prefix}_full.npy", doc_ids=doc_ids)
+        index.save(prefix)
+        print(f"Saved {kind} index to {prefix}.npz ({index.memory_bytes() / 2**20:.1f} MB in memory when served)")
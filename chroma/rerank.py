@@ -0,0 +1,91 @@
+import os
+import json
+import hashlib
+from sentence_transformers import CrossEncoder
+
+def claim_hash(claim):
+    """Stable hash of a claim used as part of the score cache key."""
+    return hashlib.md5(claim.strip().encode('utf-8')).hexdigest()
+
+class CrossEncoderReranker:
+    """
+    Re-rank bi-encoder hits with a cross-encoder.
+
+    (claim, evidence) pairs from many claims are scored together in large CPU
+    batches, and scores are cached by (claim hash, evidence_id) so re-running
+    with a different top_k never re-scores a pair.
+    """
+    def __init__(self, model_name="BAAI/bge-reranker-base", batch_size=64, cache_path=None, device="cpu"):
+        self.model_name = model_name
+        self.model = CrossEncoder(model_name, device=device)
+        self.batch_size = batch_size
+        self.cache_path = cache_path
+        self.cache = {}
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, "r") as f:
+                stored = json.load(f)
+            if stored.get("model_name") == model_name:
+                self.cache = stored["scores"]
+
+    @staticmethod
+    def _key(claim_digest, evidence_id):
+        return f"{claim_digest}:{evidence_id}"
+
+    def score_many(self, claims, evidence_id_lists, evidence_text_lists):
+        """
+        Score every (claim, evidence) pair, batching uncached pairs across claims.
+
+        Returns:
+            List of score lists aligned with evidence_id_lists.
+        """
+        digests = [claim_hash(claim) for claim in claims]
+
+        pending_keys = []
+        pending_pairs = []
+        seen = set()
+        for claim, digest, evidence_ids, evidence_texts in zip(claims, digests, evidence_id_lists, evidence_text_lists):
+            for evidence_id, text in zip(evidence_ids, evidence_texts):
+                key = self._key(digest, evidence_id)
+                if key in self.cache or key in seen:
+                    continue
+                seen.add(key)
+                pending_keys.append(key)
+                pending_pairs.append((claim, text))
+
+        if pending_pairs:
+            scores = self.model.predict(pending_pairs, batch_size=self.batch_size, show_progress_bar=False)
+            for key, score in zip(pending_keys, scores):
+                self.cache[key] = float(score)
+
+        return [
+            [self.cache[self._key(digest, evidence_id)] for evidence_id in evidence_ids]
+            for digest, evidence_ids in zip(digests, evidence_id_lists)
+        ]
+
+    def rerank_many(self, claims, evidence_id_lists, evidence_text_lists, top_k=10):
+        """
+        Re-rank the candidates of every claim and keep the top_k best.
+
+        Returns:
+            List of (evidence_ids, evidence_texts, scores) tuples, best first.
+        """
+        all_scores = self.score_many(claims, evidence_id_lists, evidence_text_lists)
+        reranked = []
+        for evidence_ids, evidence_texts, scores in zip(evidence_id_lists, evidence_text_lists, all_scores):
+            # Stable sort keeps the bi-encoder order for equal scores
+            order = sorted(range(len(evidence_ids)), key=lambda i: -scores[i])[:top_k]
+            reranked.append((
+                [evidence_ids[i] for i in order],
+                [evidence_texts[i] for i in order],
+                [scores[i] for i in order]
+            ))
+        return reranked
+
+    def rerank(self, claim, evidence_ids, evidence_texts, top_k=10):
+        return self.rerank_many([claim], [evidence_ids], [evidence_texts], top_k=top_k)[0]
+
+    def save_cache(self):
+        if not self.cache_path:
+            return
+        with open(self.cache_path, "w") as f:
+            json.dump({"model_name": self.model_name, "scores": self.cache}, f)
@@ -0,0 +1,206 @@
+import json
+import queue
+import argparse
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class ReadOnlyCollectionError(PermissionError):
+    """Raised by RemoteCollection for anything that would modify or page through the index."""
+
+class RemoteCollection:
+    """
+    Minimal stand-in for a Chroma collection that forwards queries to a
+    running retrieval_server.py, so ChromaClient's query methods work unchanged.
+    """
+    def __init__(self, url, timeout=60):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _post(self, path, payload):
+        request = urllib.request.Request(
+            f"{self.url}{path}",
+            data=json.dumps(payload).encode('utf-8'),
+            headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def query(self, query_texts, n_results=10, where=None, include=["documents", "metadatas", "distances"]):
+        return self._post("/query", {
+            "query_texts": list(query_texts),
+            "n_results": n_results,
+            "where": where,
+            "include": list(include)
+        })
+
+    def count(self):
+        with urllib.request.urlopen(f"{self.url}/health", timeout=self.timeout) as response:
+            return json.loads(response.read())["count"]
+
+    def get(self, *args, **kwargs):
+        raise ReadOnlyCollectionError("The retrieval server is read-only; ingest with a local ChromaClient")
+
+    upsert = add = delete = get
+
+class _PendingQuery:
+    def __init__(self, query_texts, n_results, where, include):
+        self.query_texts = query_texts
+        self.n_results = n_results
+        self.where = where
+        self.include = include
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class QueryCoalescer:
+    """
+    Collects concurrent query requests for up to max_wait_ms and answers each
+    group sharing a `where` clause with a single batched encode + search call.
+    """
+    def __init__(self, collection, max_batch=128, max_wait_ms=5, timeout=30):
+        self.collection = collection
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.timeout = timeout
+        self.pending = queue.Queue()
+        self.batches = 0
+        self.requests = 0
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def submit(self, query_texts, n_results, where, include):
+        pending = _PendingQuery(query_texts, n_results, where, include)
+        self.pending.put(pending)
+        if not pending.done.wait(self.timeout):
+            raise TimeoutError(f"Query not answered within {self.timeout}s")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _collect(self):
+        batch = [self.pending.get()]
+        texts = len(batch[0].query_texts)
+        while texts < self.max_batch:
+            try:
+                item = self.pending.get(timeout=self.max_wait)
+            except queue.Empty:
+                break
+            batch.append(item)
+            texts += len(item.query_texts)
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = self._collect()
+            groups = {}
+            for item in batch:
+                groups.setdefault(json.dumps(item.where, sort_keys=True), []).append(item)
+            for items in groups.values():
+                self._run_group(items)
+
+    def _run_group(self, items):
+        # Any failure, including a malformed request or result, is handed to every waiting
+        # request; the worker thread must never die and leave the rest waiting
+        try:
+            n_results = max(item.n_results for item in items)
+            include = sorted({field for item in items for field in item.include})
+            query_texts = [text for item in items for text in item.query_texts]
+            results = self.collection.query(
+                query_texts=query_texts,
+                n_results=n_results,
+                where=items[0].where,
+                include=include
+            )
+
+            self.batches += 1
+            self.requests += len(items)
+            offset = 0
+            for item in items:
+                span = slice(offset, offset + len(item.query_texts))
+                offset += len(item.query_texts)
+                item.result = {"ids": [ids[:item.n_results] for ids in results["ids"][span]]}
+                for field in item.include:
+                    values = results.get(field)
+                    item.result[field] = None if values is None else [row[:item.n_results] for row in values[span]]
+                item.done.set()
+        except Exception as e:
+            for item in items:
+                if not item.done.is_set():
+                    item.result = None
+                    item.error = e
+                    item.done.set()
+
+def make_handler(coalescer, collection):
+    class RetrievalHandler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {
+                    "count": collection.count(),
+                    "batches": coalescer.batches,
+                    "requests": coalescer.requests
+                })
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/query":
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                result = coalescer.submit(
+                    payload["query_texts"],
+                    payload.get("n_results", 10),
+                    payload.get("where"),
+                    payload.get("include", ["documents", "metadatas", "distances"])
+                )
+                self._send(200, result)
+            except Exception as e:
+                self._send(500, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return RetrievalHandler
+
+if __name__ == "__main__":
+    from chroma import ChromaClient, build_embedding_function
+
+    parser = argparse.ArgumentParser(description="Serve one embedding model and Chroma index to many local processes")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--vector_name", type=str, default="evidence_bgebase")
+    parser.add_argument("--path", type=str, default="./chroma_store")
+    parser.add_argument("--encoder", choices=["torch", "onnx", "onnx_int8"], default="torch")
+    parser.add_argument("--embedding_cache", type=str, default=None)
+    parser.add_argument("--index", choices=["chroma", "int8", "pq"], default="chroma",
+                        help="Serve the fp32 Chroma index, or a compressed index saved by quantized_index.py --save_kind")
+    parser.add_argument("--index_prefix", type=str, default=None,
+                        help="Compressed index location (default: <path>/<vector_name>_<index>)")
+    parser.add_argument("--rerank", type=int, default=100, help="Compressed index: hits re-scored exactly against fp32 vectors")
+    parser.add_argument("--max_batch", type=int, default=128, help="Maximum query texts per coalesced call")
+    parser.add_argument("--max_wait_ms", type=float, default=5, help="How long to wait for more requests to join a batch")
+    parser.add_argument("--query_timeout", type=float, default=30, help="Seconds a request waits for its batch before failing")
+    args = parser.parse_args()
+
+    client = ChromaClient(
+        vector_name=args.vector_name,
+        path=args.path,
+        embedding_function=build_embedding_function(args.encoder, cache_path=args.embedding_cache),
+        index=args.index,
+        index_prefix=args.index_prefix,
+        rerank=args.rerank
+    )
+    coalescer = QueryCoalescer(client.collection, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms,
+                               timeout=args.query_timeout)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(coalescer, client.collection))
+    print(f"Serving {args.vector_name} ({client.collection.count()} documents, {args.index} index) on http://{args.host}:{args.port}")
+    server.serve_forever()
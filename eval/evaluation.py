@@ -0,0 +1,906 @@
+import os
+import re
+import math
+import time
+import glob
+import json
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+LABELS = ["TRUE", "HALF-TRUE", "FALSE"]
+UNKNOWN = "UNKNOWN"
+LABEL_INDEX = {label: i for i, label in enumerate(LABELS)}
+
+# === Verdict parser ===
+# One prioritized rule ladder. Each output format uses a subset of the rules,
+# compiled into a single alternation of lookaheads so a text is scanned once
+# and no rule's match can hide another's. The highest-priority rule that
+# matched wins, at its first occurrence - the same answer as trying each
+# pattern's search() in turn.
+VERDICT_LABEL = r'TRUE|FALSE|HALF-TRUE'
+# (name, pattern, characters a match can start with)
+VERDICT_RULES = [
+    ("bracket", r'\[?VERDICT\]:\s*(?P<bracket_v>{L})', "[V"),
+    ("bold", r'\*\*VERDICT\*\*:.*?(?P<bold_v>{L})', "*"),
+    ("colon", r'VERDICT\s*:\s*(?P<colon_v>{L})', "V"),
+    ("loose", r'VERDICT.*?(?P<loose_v>{L})', "V"),
+    ("keyword", r'\b(?P<keyword_v>{L})\b', "TFH"),
+]
+RULE_PRIORITY = {name: i for i, (name, _, _) in enumerate(VERDICT_RULES)}
+# The rule sets eval.py used: single-mode lists never fell back to a bare keyword
+VERDICT_LADDERS = {
+    "single": ["bracket", "bold", "colon", "loose"],
+    "multi": ["bracket", "colon", "keyword"],
+}
+
+def _compile_ladder(rules):
+    rules = [rule for rule in VERDICT_RULES if rule[0] in rules]
+    # The leading class lets the scanner skip positions where no rule can start
+    starts = re.escape("".join(sorted(set("".join(chars for _, _, chars in rules)))))
+    alternatives = "|".join(f"(?=(?P<{name}>{pattern.format(L=VERDICT_LABEL)}))" for name, pattern, _ in rules)
+    return re.compile(f"(?=[{starts}])(?:{alternatives})", re.MULTILINE | re.DOTALL | re.IGNORECASE)
+
+LADDER_PATTERNS = {ladder: _compile_ladder(rules) for ladder, rules in VERDICT_LADDERS.items()}
+
+def normalize_label(label):
+    """Upper-case, hyphenated label ("half true" -> "HALF-TRUE"); anything else is UNKNOWN."""
+    if not label:
+        return UNKNOWN
+    label = re.sub(r"[\s_]+", "-", str(label).strip().upper())
+    return label if label in LABEL_INDEX else UNKNOWN
+
+def verdict_text(content):
+    """(text, ladder) of one answer_map entry: a list (single mode) or a dict with final_verdict (debate modes)."""
+    if isinstance(content, list):
+        return (content[0] if content else ""), "single"
+    if isinstance(content, dict):
+        return content.get("final_verdict", "") or content.get("verdict", ""), "multi"
+    return str(content or ""), "multi"
+
+def parse_verdict_text(text, ladder="multi"):
+    """(verdict, rule that fired); (UNKNOWN, None) if no rule matched."""
+    best, best_priority = (UNKNOWN, None), len(VERDICT_RULES)
+    for match in LADDER_PATTERNS[ladder].finditer(text or ""):
+        priority = RULE_PRIORITY[match.lastgroup]
+        if priority < best_priority:
+            best, best_priority = (match.group(f"{match.lastgroup}_v").upper(), match.lastgroup), priority
+            if priority == 0:
+                break
+    return best
+
+def parse_verdict(content):
+    """(verdict, rule, text) of one answer_map entry."""
+    text, ladder = verdict_text(content)
+    return (*parse_verdict_text(text, ladder), text)
+
+def extract_verdict(content):
+    return parse_verdict(content)[0]
+
+def determine_mode(sample_value):
+    return "single" if isinstance(sample_value, list) else "multi"
+
+# === Streaming readers ===
+# Answer maps hold whole debate transcripts, but only final_verdict (or the first
+# string of a single-mode list) is needed. These readers go through the file one
+# example at a time instead of json.load-ing the whole map.
+
+def _verdict_content(content):
+    """Shrink an answer_map entry to the part extract_verdict reads."""
+    if isinstance(content, list):
+        return content[:1]
+    if isinstance(content, dict):
+        return {"final_verdict": content.get("final_verdict", "") or content.get("verdict", "")}
+    return content
+
+def _iter_json_items_ijson(f):
+    """Event-based: only the verdict strings are kept, transcripts are skipped as they stream by."""
+    import ijson
+    current_id, content = None, None
+    for prefix, event, value in ijson.parse(f):
+        if prefix == "" and event == "map_key":
+            if current_id is not None:
+                yield current_id, _verdict_content(content)
+            current_id, content = value, None
+        elif current_id is None:
+            continue
+        elif prefix == current_id and event in ("start_map", "start_array"):
+            content = {} if event == "start_map" else []
+        elif prefix == f"{current_id}.item" and event == "string" and isinstance(content, list) and not content:
+            content.append(value)
+        elif prefix in (f"{current_id}.final_verdict", f"{current_id}.verdict") and isinstance(content, dict):
+            content[prefix.rsplit(".", 1)[1]] = value
+        elif prefix == current_id and event == "string":
+            content = value
+    if current_id is not None:
+        yield current_id, _verdict_content(content)
+
+def _iter_json_items_raw(f, chunk_size=1 << 20):
+    """Stdlib fallback: decodes one top-level value at a time from a bounded buffer."""
+    decoder = json.JSONDecoder()
+    buffer, eof = "", False
+
+    def fill():
+        nonlocal buffer, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+
+    def skip(chars):
+        nonlocal buffer
+        while True:
+            stripped = buffer.lstrip()
+            if stripped and stripped[0] in chars:
+                buffer = stripped[1:]
+                return stripped[0]
+            if stripped or eof:
+                raise ValueError(f"Malformed answer map near: {stripped[:40]!r}")
+            buffer = stripped
+            fill()
+
+    def decode():
+        nonlocal buffer
+        while True:
+            buffer = buffer.lstrip()
+            try:
+                value, end = decoder.raw_decode(buffer)
+                # A value ending exactly at the buffer edge may be truncated (e.g. a number)
+                if end < len(buffer) or eof:
+                    buffer = buffer[end:]
+                    return value
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+
+    fill()
+    skip("{")
+    if skip('"}') == "}":
+        return
+    buffer = '"' + buffer
+    while True:
+        key = decode()
+        skip(":")
+        yield key, _verdict_content(decode())
+        if skip(",}") == "}":
+            return
+
+def iter_answer_map(pred_file):
+    """Yield (example_id, verdict-bearing content) from a .json answer map or a .jsonl file
+    of {"example_id": ..., "final_verdict": ...} (or {id: entry}) lines."""
+    if pred_file.endswith(".jsonl"):
+        with open(pred_file, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if "example_id" in record:
+                    yield str(record["example_id"]), _verdict_content(record)
+                else:
+                    for example_id, content in record.items():
+                        yield example_id, _verdict_content(content)
+        return
+    try:
+        import ijson  # noqa: F401
+    except ImportError:
+        with open(pred_file, "r") as f:
+            yield from _iter_json_items_raw(f)
+        return
+    with open(pred_file, "rb") as f:
+        yield from _iter_json_items_ijson(f)
+
+def iter_verdicts(pred_file):
+    """Yield (example_id, verdict, mode) in one pass over the file."""
+    for example_id, content in iter_answer_map(pred_file):
+        yield example_id, extract_verdict(content), determine_mode(content)
+
+def load_predictions(pred_file):
+    """Returns ({example_id: verdict}, mode)."""
+    predictions, mode = {}, "multi"
+    for i, (example_id, verdict, item_mode) in enumerate(iter_verdicts(pred_file)):
+        if i == 0:
+            mode = item_mode
+        predictions[example_id] = verdict
+    return predictions, mode
+
+def load_groundtruth(groundtruth_file):
+    """Accepts GT_test_all.json ({id: label}) or test.json ([{example_id, veracity}, ...])."""
+    with open(groundtruth_file, "r") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return {str(k): normalize_label(v) for k, v in data.items()}
+    return {str(item["example_id"]): normalize_label(item["veracity"])
+            for item in data if "example_id" in item and "veracity" in item}
+
+def load_subset_ids(subset_file):
+    """Example ids from a {category: [ids]} file such as veracity_examples_results.json."""
+    with open(subset_file, "r") as f:
+        data = json.load(f)
+    return {str(example_id) for ids in data.values() for example_id in ids}
+
+# === Named subsets ===
+# Subsets are declared once, here or in data/subsets.json, and compiled into a
+# sorted id array plus a membership bitmap over the sorted groundtruth ids. The
+# compiled form is cached in data/subsets/ and rebuilt when the definition's
+# version, the definition itself or one of its source files changes. Relative
+# paths, here and in data/subsets.json, are resolved against the project root.
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_GROUNDTRUTH = os.path.join("data", "GT_test_all.json")
+SUBSETS_DIR = os.path.join(PROJECT_ROOT, "data", "subsets")
+SUBSET_DEFINITIONS_FILE = os.path.join(PROJECT_ROOT, "data", "subsets.json")
+
+def _project_path(path):
+    """Absolute paths unchanged, relative ones under the project root rather than the cwd."""
+    return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+
+# Keys: version, groundtruth (default DEFAULT_GROUNDTRUTH), ids_file ({category: [ids]}),
+# ids (inline list), labels (keep these groundtruth labels), limit (first N, file order)
+SUBSET_DEFINITIONS = {
+    "all": {"version": 1},
+    "veracity_150": {"version": 1, "ids_file": "veracity_examples_results.json"},
+    # First 2000 claims of test.json in file order, as calulate_metrics.py has always scored
+    "first_2000": {"version": 2, "groundtruth": os.path.join("data", "test.json"), "limit": 2000},
+    "true": {"version": 1, "labels": ["TRUE"]},
+    "half_true": {"version": 1, "labels": ["HALF-TRUE"]},
+    "false": {"version": 1, "labels": ["FALSE"]},
+    # Fixed claim set for benchmark.py
+    "bench_15": {"version": 1, "ids_file": "veracity_examples_results.json", "limit": 15},
+}
+
+def subset_definitions():
+    """Built-in definitions, overridden/extended by data/subsets.json if present."""
+    definitions = dict(SUBSET_DEFINITIONS)
+    if os.path.exists(SUBSET_DEFINITIONS_FILE):
+        with open(SUBSET_DEFINITIONS_FILE, "r") as f:
+            definitions.update(json.load(f))
+    return definitions
+
+def _id_array(ids):
+    """Sorted, de-duplicated ids: int64 when every id is numeric, strings otherwise."""
+    ids = {str(i) for i in ids}
+    if all(i.isdigit() for i in ids):
+        return np.array(sorted(int(i) for i in ids), dtype=np.int64)
+    return np.array(sorted(ids), dtype=str)
+
+def _query_array(example_ids, like):
+    if like.dtype == np.int64:
+        return np.array([int(i) if str(i).isdigit() else -1 for i in example_ids], dtype=np.int64)
+    return np.array([str(i) for i in example_ids], dtype=like.dtype)
+
+class Subset:
+    """Sorted ids of one named subset and its packed membership bitmap over the groundtruth ids."""
+    def __init__(self, name, version, ids, universe, bitmap):
+        self.name = name
+        self.version = version
+        self.ids = ids
+        self.universe = universe
+        self.bitmap = bitmap
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, example_id):
+        return bool(self.contains([example_id])[0])
+
+    def contains(self, example_ids):
+        """Vectorized membership: position in the groundtruth ids, then one bit lookup."""
+        if not len(self.universe) or not len(example_ids):
+            return np.zeros(len(example_ids), dtype=bool)
+        query = _query_array(example_ids, self.universe)
+        position = np.minimum(np.searchsorted(self.universe, query), len(self.universe) - 1)
+        members = np.unpackbits(self.bitmap, count=len(self.universe)).astype(bool)
+        return (self.universe[position] == query) & members[position]
+
+    def id_set(self):
+        return {str(i) for i in self.ids.tolist()}
+
+def _source_files(definition):
+    files = [definition.get("groundtruth", DEFAULT_GROUNDTRUTH)]
+    if "ids_file" in definition:
+        files.append(definition["ids_file"])
+    return files
+
+def _subset_digest(definition):
+    """Definition plus (size, mtime) of its source files: cheap to check, no file is read."""
+    stats = [(path, os.stat(_project_path(path)).st_size, os.stat(_project_path(path)).st_mtime_ns)
+             for path in _source_files(definition)]
+    return json.dumps([definition, stats], sort_keys=True)
+
+def build_subset(name, definition):
+    groundtruth = load_groundtruth(_project_path(definition.get("groundtruth", DEFAULT_GROUNDTRUTH)))
+    if "ids_file" in definition:
+        ids = [str(i) for i in sorted(load_subset_ids(_project_path(definition["ids_file"])))]
+    elif "ids" in definition:
+        ids = [str(i) for i in definition["ids"]]
+    else:
+        ids = list(groundtruth)
+    if "labels" in definition:
+        labels = {normalize_label(label) for label in definition["labels"]}
+        ids = [i for i in ids if groundtruth.get(i) in labels]
+    if "limit" in definition:
+        ids = ids[:definition["limit"]]
+    universe = _id_array(groundtruth)
+    ids = _id_array(ids)
+    members = np.zeros(len(universe), dtype=bool)
+    position = np.searchsorted(universe, ids)
+    in_universe = position < len(universe)
+    in_universe[in_universe] = universe[position[in_universe]] == ids[in_universe]
+    members[position[in_universe]] = True
+    return Subset(name, definition.get("version", 1), ids, universe, np.packbits(members))
+
+def load_subset(name, cache_dir=SUBSETS_DIR):
+    """Compiled subset by name, from the cache when it is still current."""
+    definitions = subset_definitions()
+    if name not in definitions:
+        raise ValueError(f"Unknown subset {name!r}; defined: {', '.join(sorted(definitions))}")
+    definition = definitions[name]
+    digest = _subset_digest(definition)
+    cache_file = os.path.join(cache_dir, f"{name}.v{definition.get('version', 1)}.npz")
+    if os.path.exists(cache_file):
+        cached = np.load(cache_file)
+        if str(cached["digest"]) == digest:
+            return Subset(name, definition.get("version", 1), cached["ids"], cached["universe"], cached["bitmap"])
+    subset = build_subset(name, definition)
+    os.makedirs(cache_dir, exist_ok=True)
+    np.savez_compressed(cache_file, ids=subset.ids, universe=subset.universe, bitmap=subset.bitmap, digest=np.array(digest))
+    return subset
+
+def resolve_subset_ids(subset):
+    """A subset name, or a {category: [ids]} file as before."""
+    if subset in subset_definitions():
+        return load_subset(subset).id_set()
+    return load_subset_ids(subset)
+
+def subset_metrics(vectors, subsets):
+    """
+    Metrics for every subset from one file's label vectors (evaluate_file with
+    keep_vectors): a (subsets x examples) membership matrix and one bincount.
+    """
+    n_cells = len(LABELS) * (len(LABELS) + 1)
+    members = np.stack([subset.contains(vectors["ids"]) for subset in subsets])
+    subset_idx, example_idx = np.nonzero(members)
+    cells = (subset_idx * n_cells + vectors["y_true"][example_idx].astype(np.int64) * (len(LABELS) + 1)
+             + vectors["y_pred"][example_idx])
+    cms = np.bincount(cells, minlength=len(subsets) * n_cells).reshape(len(subsets), len(LABELS), len(LABELS) + 1)
+    return {subset.name: metrics_from_confusion(cm) for subset, cm in zip(subsets, cms)}
+
+def format_subset_table(results):
+    rows = [r for r in results if "subsets" in r]
+    width = max([len(r["file"]) for r in rows] + [4])
+    name_width = max([len(name) for r in rows for name in r["subsets"]] + [6])
+    lines = [f"{'file':<{width}} {'subset':<{name_width}} {'n':>5} {'acc':>7} {'macroF1':>8} {'unk':>5}"]
+    for r in rows:
+        for name, m in r["subsets"].items():
+            lines.append(f"{r['file']:<{width}} {name:<{name_width}} {m['total']:>5} {m['accuracy']:>7.2%} "
+                         f"{m['macro_f1']:>8.2%} {m['unknown']:>5}")
+    return "\n".join(lines)
+
+def confusion_matrix(y_true, y_pred):
+    """3 x 4 counts: rows are true labels, columns are predicted labels plus UNKNOWN."""
+    true_idx = np.array([LABEL_INDEX[label] for label in y_true], dtype=np.int64)
+    pred_idx = np.array([LABEL_INDEX.get(label, len(LABELS)) for label in y_pred], dtype=np.int64)
+    cm = np.zeros((len(LABELS), len(LABELS) + 1), dtype=np.int64)
+    np.add.at(cm, (true_idx, pred_idx), 1)
+    return cm
+
+def metrics_from_confusion(cm):
+    tp = np.diag(cm[:, :len(LABELS)]).astype(float)
+    support = cm.sum(axis=1).astype(float)
+    predicted = cm[:, :len(LABELS)].sum(axis=0).astype(float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(support > 0, tp / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    total = int(cm.sum())
+    return {
+        "total": total,
+        "correct": int(tp.sum()),
+        "accuracy": float(tp.sum() / total) if total else 0.0,
+        "macro_f1": float(f1.mean()),
+        "unknown": int(cm[:, len(LABELS)].sum()),
+        "class_metrics": {label: {"precision": float(precision[i]), "recall": float(recall[i]), "f1": float(f1[i]),
+                                  "correct": int(tp[i]), "support": int(support[i])}
+                          for i, label in enumerate(LABELS)},
+        "confusion_matrix": cm.tolist(),
+    }
+
+def evaluate_predictions(prediction, groundtruth, subset_ids=None):
+    keys = [key for key in groundtruth
+            if key in prediction and groundtruth[key] != UNKNOWN and (subset_ids is None or key in subset_ids)]
+    return metrics_from_confusion(confusion_matrix([groundtruth[k] for k in keys], [prediction[k] for k in keys]))
+
+def evaluate_file(pred_file, groundtruth, subset_ids=None, keep_vectors=False, keep_failures=False):
+    """
+    Single streaming pass: the confusion matrix is updated as each verdict is read.
+    With keep_vectors, the per-example label indices are kept as well (for bootstrap
+    CIs and paired tests). parse_rules counts which ladder rule fired for every entry
+    in the file; with keep_failures, the texts no rule matched are kept too.
+    """
+    cm = np.zeros((len(LABELS), len(LABELS) + 1), dtype=np.int64)
+    mode, seen = "multi", set()
+    ids, y_true, y_pred = [], [], []
+    parse_rules, failures = {}, []
+    for i, (example_id, content) in enumerate(iter_answer_map(pred_file)):
+        verdict, rule, text = parse_verdict(content)
+        item_mode = determine_mode(content)
+        if i == 0:
+            mode = item_mode
+        parse_rules[rule or UNKNOWN] = parse_rules.get(rule or UNKNOWN, 0) + 1
+        if rule is None and keep_failures:
+            failures.append({"file": pred_file, "example_id": example_id, "mode": item_mode, "text": text})
+        true_label = groundtruth.get(example_id, UNKNOWN)
+        if true_label == UNKNOWN or example_id in seen or (subset_ids is not None and example_id not in subset_ids):
+            continue
+        seen.add(example_id)
+        t, p = LABEL_INDEX[true_label], LABEL_INDEX.get(verdict, len(LABELS))
+        cm[t, p] += 1
+        if keep_vectors:
+            ids.append(example_id)
+            y_true.append(t)
+            y_pred.append(p)
+    result = metrics_from_confusion(cm)
+    result.update({"file": pred_file, "mode": mode, "parse_rules": parse_rules})
+    if keep_failures:
+        result["parse_failures"] = failures
+    if keep_vectors:
+        result["vectors"] = {"ids": ids, "y_true": np.array(y_true, dtype=np.int8), "y_pred": np.array(y_pred, dtype=np.int8)}
+    return result
+
+# === Uncertainty: vectorized bootstrap and paired tests ===
+# Resamples are (n_resamples, n) index matrices; every metric is computed for all
+# resamples at once from per-resample confusion matrices.
+
+def resample_indices(n, n_resamples=2000, seed=0):
+    return np.random.default_rng(seed).integers(0, n, size=(n_resamples, n))
+
+def batched_confusion(y_true, y_pred, idx):
+    """(n_resamples, 3, 4) confusion matrices for the resampled examples."""
+    n_cols = len(LABELS) + 1
+    cells = len(LABELS) * n_cols
+    codes = y_true.astype(np.int64)[idx] * n_cols + y_pred.astype(np.int64)[idx]
+    codes += np.arange(idx.shape[0])[:, None] * cells
+    return np.bincount(codes.ravel(), minlength=idx.shape[0] * cells).reshape(idx.shape[0], len(LABELS), n_cols)
+
+def batched_metrics(cms):
+    """Accuracy and macro-F1 for a stack of confusion matrices."""
+    k = len(LABELS)
+    tp = np.diagonal(cms[:, :, :k], axis1=1, axis2=2).astype(float)
+    denom = cms.sum(axis=2) + cms[:, :, :k].sum(axis=1)  # support + predicted
+    f1 = np.divide(2 * tp, denom, out=np.zeros_like(tp), where=denom > 0)
+    total = cms.sum(axis=(1, 2))
+    return tp.sum(axis=1) / np.maximum(total, 1), f1.mean(axis=1)
+
+def bootstrap_ci(y_true, y_pred, n_resamples=2000, alpha=0.05, seed=0):
+    """Percentile bootstrap intervals for accuracy and macro-F1."""
+    if len(y_true) == 0:
+        return {"accuracy": (0.0, 0.0), "macro_f1": (0.0, 0.0)}
+    acc, f1 = batched_metrics(batched_confusion(y_true, y_pred, resample_indices(len(y_true), n_resamples, seed)))
+    bounds = [100 * alpha / 2, 100 * (1 - alpha / 2)]
+    return {"accuracy": tuple(np.percentile(acc, bounds)), "macro_f1": tuple(np.percentile(f1, bounds))}
+
+def mcnemar_test(correct_a, correct_b):
+    """McNemar's test on discordant pairs: exact binomial below 25 pairs, chi-square with continuity correction above."""
+    b = int(np.sum(correct_a & ~correct_b))
+    c = int(np.sum(~correct_a & correct_b))
+    n = b + c
+    if n == 0:
+        return {"b": b, "c": c, "p_value": 1.0}
+    if n < 25:
+        tail = sum(math.comb(n, i) for i in range(min(b, c) + 1)) / 2 ** n
+        return {"b": b, "c": c, "p_value": min(1.0, 2 * tail)}
+    chi2 = (abs(b - c) - 1) ** 2 / n
+    return {"b": b, "c": c, "p_value": math.erfc(math.sqrt(chi2 / 2))}
+
+def align_vectors(vectors_a, vectors_b):
+    """Label arrays of two results restricted to their common example ids."""
+    position_b = {example_id: i for i, example_id in enumerate(vectors_b["ids"])}
+    pairs = [(i, position_b[example_id]) for i, example_id in enumerate(vectors_a["ids"]) if example_id in position_b]
+    if not pairs:
+        empty = np.array([], dtype=np.int8)
+        return empty, empty, empty
+    ia, ib = map(np.array, zip(*pairs))
+    return vectors_a["y_true"][ia], vectors_a["y_pred"][ia], vectors_b["y_pred"][ib]
+
+def paired_comparison(vectors_a, vectors_b, n_resamples=2000, alpha=0.05, seed=0):
+    """Paired bootstrap (same resamples for both files) of the accuracy and macro-F1 differences A - B, plus McNemar."""
+    y_true, pred_a, pred_b = align_vectors(vectors_a, vectors_b)
+    n = len(y_true)
+    result = {"n": n}
+    if n == 0:
+        return result
+    idx = resample_indices(n, n_resamples, seed)
+    acc_a, f1_a = batched_metrics(batched_confusion(y_true, pred_a, idx))
+    acc_b, f1_b = batched_metrics(batched_confusion(y_true, pred_b, idx))
+    full_a = batched_metrics(batched_confusion(y_true, pred_a, np.arange(n)[None, :]))
+    full_b = batched_metrics(batched_confusion(y_true, pred_b, np.arange(n)[None, :]))
+    bounds = [100 * alpha / 2, 100 * (1 - alpha / 2)]
+    for name, delta, observed in (("accuracy", acc_a - acc_b, full_a[0][0] - full_b[0][0]),
+                                  ("macro_f1", f1_a - f1_b, full_a[1][0] - full_b[1][0])):
+        p_value = min(1.0, 2 * min(np.mean(delta <= 0), np.mean(delta >= 0)))
+        result[name] = {"delta": float(observed), "ci": tuple(np.percentile(delta, bounds)), "p_value": float(p_value)}
+    result["mcnemar"] = mcnemar_test(pred_a == y_true, pred_b == y_true)
+    return result
+
+def all_pairs_comparison(results, n_resamples=2000, alpha=0.05, seed=0):
+    rows = [r for r in results if "vectors" in r]
+    comparisons = []
+    for i in range(len(rows)):
+        for j in range(i + 1, len(rows)):
+            comparison = paired_comparison(rows[i]["vectors"], rows[j]["vectors"], n_resamples, alpha, seed)
+            comparison.update({"file_a": rows[i]["file"], "file_b": rows[j]["file"]})
+            comparisons.append(comparison)
+    return comparisons
+
+def format_comparisons(comparisons):
+    names = [os.path.basename(c[key]) for c in comparisons for key in ("file_a", "file_b")]
+    width = max(len(name) for name in names + ["file A"])
+    lines = [f"{'file A':<{width}} {'file B':<{width}} {'n':>5} {'d acc':>7} {'p':>6} {'d mF1':>7} {'p':>6} {'McNemar p':>10}"]
+    for c in comparisons:
+        if c["n"] == 0:
+            continue
+        lines.append(f"{os.path.basename(c['file_a']):<{width}} {os.path.basename(c['file_b']):<{width}} {c['n']:>5} "
+                     f"{c['accuracy']['delta']:>+7.2%} {c['accuracy']['p_value']:>6.3f} "
+                     f"{c['macro_f1']['delta']:>+7.2%} {c['macro_f1']['p_value']:>6.3f} {c['mcnemar']['p_value']:>10.3f}")
+    return "\n".join(lines)
+
+# === Failure corpus ===
+# Verdict texts no ladder rule could parse, one JSON record per line. New parser
+# rules can be checked against it; add an "expected" label to a record by hand
+# to turn it into a regression case.
+
+def load_failure_corpus(corpus_file):
+    if not os.path.exists(corpus_file):
+        return []
+    with open(corpus_file, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def update_failure_corpus(corpus_file, failures):
+    """Append failures whose text is not in the corpus yet; returns how many were added."""
+    known = {record["text"] for record in load_failure_corpus(corpus_file)}
+    added = 0
+    with open(corpus_file, "a") as f:
+        for record in failures:
+            if record["text"] not in known:
+                known.add(record["text"])
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                added += 1
+    return added
+
+def check_failure_corpus(corpus_file):
+    """Re-parse every corpus record with the current ladder."""
+    report = {"records": 0, "parsed": {}, "still_unknown": 0, "expected_mismatches": []}
+    for record in load_failure_corpus(corpus_file):
+        verdict, rule = parse_verdict_text(record["text"], "single" if record.get("mode") == "single" else "multi")
+        report["records"] += 1
+        if rule is None:
+            report["still_unknown"] += 1
+        else:
+            report["parsed"][rule] = report["parsed"].get(rule, 0) + 1
+        if "expected" in record and normalize_label(record["expected"]) != verdict:
+            report["expected_mismatches"].append({"example_id": record.get("example_id"),
+                                                  "expected": record["expected"], "parsed": verdict})
+    return report
+
+def format_parse_rules(results):
+    rows = [r for r in results if "error" not in r]
+    rules = [name for name, _, _ in VERDICT_RULES] + [UNKNOWN]
+    width = max([len(r["file"]) for r in rows] + [4])
+    lines = [f"{'file':<{width}} " + " ".join(f"{rule:>8}" for rule in rules)]
+    for r in rows:
+        lines.append(f"{r['file']:<{width}} " + " ".join(f"{r['parse_rules'].get(rule, 0):>8}" for rule in rules))
+    return "\n".join(lines)
+
+# === Live metrics while a run is in progress ===
+
+class LiveMetrics:
+    """
+    Running accuracy, per-class counts and UNKNOWN rate, updated as each verdict
+    lands and written to a small JSON file so a bad run can be stopped early.
+    """
+    def __init__(self, groundtruth_file, metrics_file, subset_ids=None):
+        self.groundtruth = load_groundtruth(groundtruth_file)
+        self.metrics_file = metrics_file
+        self.subset_ids = subset_ids
+        self.cm = np.zeros((len(LABELS), len(LABELS) + 1), dtype=np.int64)
+        self.seen = set()
+        self.unknown_total = 0
+        self.processed = 0
+        self.start_time = time.time()
+
+    def update(self, example_id, content):
+        """Fold one answer_map entry in; returns its verdict."""
+        verdict = extract_verdict(content)
+        if example_id in self.seen:
+            return verdict
+        self.seen.add(example_id)
+        self.processed += 1
+        self.unknown_total += verdict == UNKNOWN
+        true_label = self.groundtruth.get(str(example_id), UNKNOWN)
+        if true_label != UNKNOWN and (self.subset_ids is None or example_id in self.subset_ids):
+            self.cm[LABEL_INDEX[true_label], LABEL_INDEX.get(verdict, len(LABELS))] += 1
+        return verdict
+
+    def summary(self):
+        metrics = metrics_from_confusion(self.cm)
+        elapsed = time.time() - self.start_time
+        return {
+            "processed": self.processed,
+            "scored": metrics["total"],
+            "accuracy": metrics["accuracy"],
+            "macro_f1": metrics["macro_f1"],
+            "unknown": self.unknown_total,
+            "unknown_rate": self.unknown_total / self.processed if self.processed else 0.0,
+            "per_class": {label: {"support": m["support"], "correct": m["correct"], "predicted": int(self.cm[:, i].sum())}
+                          for i, (label, m) in enumerate(metrics["class_metrics"].items())},
+            "elapsed_seconds": elapsed,
+            "updated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    def write(self):
+        # Write-then-rename so a reader never sees a half-written file
+        summary = self.summary()
+        tmp_file = self.metrics_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(summary, f, indent=2)
+        os.replace(tmp_file, self.metrics_file)
+        return summary
+
+# === Agreement across prediction files ===
+
+def aligned_label_matrix(predictions, groundtruth, subset_ids=None):
+    """
+    Stack several {example_id: verdict} maps on the examples they all cover.
+    Returns (ids, y_true of shape (n,), predictions of shape (n_files, n)) as label indices.
+    """
+    common = [key for key in groundtruth
+              if groundtruth[key] != UNKNOWN and all(key in p for p in predictions)
+              and (subset_ids is None or key in subset_ids)]
+    y_true = np.array([LABEL_INDEX[groundtruth[key]] for key in common], dtype=np.int8)
+    y_pred = np.array([[LABEL_INDEX.get(p[key], len(LABELS)) for key in common] for p in predictions],
+                      dtype=np.int8).reshape(len(predictions), len(common))
+    return common, y_true, y_pred
+
+def agreement_report(y_true, y_pred):
+    """Pairwise agreement / error-overlap matrices, oracle-ensemble accuracy and per-example correctness bitmasks."""
+    n_files, n = y_pred.shape
+    correct = (y_pred == y_true[None, :])
+    onehot = np.stack([(y_pred == k) for k in range(len(LABELS) + 1)]).astype(np.float64)
+    agreement = np.einsum("kin,kjn->ij", onehot, onehot) / max(n, 1)
+    right, wrong = correct.astype(np.float64), (~correct).astype(np.float64)
+    both_wrong = wrong @ wrong.T / max(n, 1)
+    # [i, j]: fraction of examples file i gets right and file j gets wrong
+    i_right_j_wrong = right @ wrong.T / max(n, 1)
+
+    if n_files > 63:
+        raise ValueError("Bitmasks support at most 63 prediction files")
+    bitmask = (correct.astype(np.uint64) << np.arange(n_files, dtype=np.uint64)[:, None]).sum(axis=0)
+    any_right = correct.any(axis=0)
+    unique_right = correct & (correct.sum(axis=0) == 1)[None, :]
+    leave_one_out = [float(np.delete(correct, i, axis=0).any(axis=0).mean()) if n_files > 1 and n else 0.0
+                     for i in range(n_files)]
+    votes = np.stack([(y_pred == k).sum(axis=0) for k in range(len(LABELS))])
+    majority = votes.argmax(axis=0)
+    return {
+        "n": n,
+        "accuracy": correct.mean(axis=1).tolist() if n else [0.0] * n_files,
+        "agreement": agreement.tolist(),
+        "both_wrong": both_wrong.tolist(),
+        "i_right_j_wrong": i_right_j_wrong.tolist(),
+        "oracle_accuracy": float(any_right.mean()) if n else 0.0,
+        "oracle_without": leave_one_out,
+        "unique_correct": unique_right.sum(axis=1).tolist(),
+        "majority_vote_accuracy": float((majority == y_true).mean()) if n else 0.0,
+        "bitmask": bitmask,
+    }
+
+# === Cost-aware evaluation ===
+
+def usage_file_for(pred_file):
+    """Side file main.py --track_usage writes next to an answer map."""
+    return pred_file[:-len(".json")] + "_usage.json"
+
+def cost_metrics(result, usage):
+    """Accuracy / macro-F1 per 1k tokens, per generation second and per dollar, on the examples that have usage records."""
+    vectors = result["vectors"]
+    covered = np.array([example_id in usage for example_id in vectors["ids"]], dtype=bool)
+    if not covered.any():
+        return None
+    ids = [example_id for example_id, keep in zip(vectors["ids"], covered) if keep]
+    acc, f1 = batched_metrics(batched_confusion(vectors["y_true"][covered], vectors["y_pred"][covered],
+                                                np.arange(len(ids))[None, :]))
+    acc, f1 = float(acc[0]), float(f1[0])
+    per_claim = {key: sum(usage[i].get(key, 0) for i in ids) / len(ids)
+                 for key in ("calls", "total_tokens", "seconds", "cost_usd")}
+    metrics = {"covered": len(ids), "accuracy": acc, "macro_f1": f1,
+               "calls_per_claim": per_claim["calls"], "tokens_per_claim": per_claim["total_tokens"],
+               "seconds_per_claim": per_claim["seconds"], "usd_per_claim": per_claim["cost_usd"]}
+    for name, value in (("accuracy", acc), ("macro_f1", f1)):
+        metrics[f"{name}_per_1k_tokens"] = value / (per_claim["total_tokens"] / 1000) if per_claim["total_tokens"] else None
+        metrics[f"{name}_per_second"] = value / per_claim["seconds"] if per_claim["seconds"] else None
+        metrics[f"{name}_per_usd"] = value / per_claim["cost_usd"] if per_claim["cost_usd"] else None
+    return metrics
+
+def pareto_frontier(points):
+    """Indices of (cost, quality) points not dominated by a cheaper-or-equal, better-or-equal point."""
+    order = sorted(range(len(points)), key=lambda i: (points[i][0], -points[i][1]))
+    frontier, best = [], -np.inf
+    for i in order:
+        if points[i][1] > best:
+            frontier.append(i)
+            best = points[i][1]
+    return set(frontier)
+
+def format_cost_table(results):
+    rows = [r for r in results if r.get("cost")]
+    if not rows:
+        return "No usage files found (run main.py with --track_usage)."
+    on_tokens = pareto_frontier([(r["cost"]["tokens_per_claim"], r["cost"]["macro_f1"]) for r in rows])
+    on_seconds = pareto_frontier([(r["cost"]["seconds_per_claim"], r["cost"]["macro_f1"]) for r in rows])
+    width = max(len(os.path.basename(r["file"])) for r in rows)
+    fmt = lambda value, spec: format("-", spec.split(".")[0]) if value is None else format(value, spec)
+    lines = [f"{'file':<{width}} {'n':>5} {'calls':>6} {'tok/claim':>10} {'s/claim':>8} {'$/claim':>9} "
+             f"{'acc':>7} {'mF1':>7} {'mF1/1k tok':>11} {'mF1/s':>8} {'mF1/$':>9} pareto"]
+    for i, r in sorted(enumerate(rows), key=lambda x: x[1]["cost"]["tokens_per_claim"]):
+        c = r["cost"]
+        marks = ("T" if i in on_tokens else "") + ("S" if i in on_seconds else "")
+        lines.append(f"{os.path.basename(r['file']):<{width}} {c['covered']:>5} {c['calls_per_claim']:>6.1f} "
+                     f"{c['tokens_per_claim']:>10.0f} {c['seconds_per_claim']:>8.2f} {c['usd_per_claim']:>9.5f} "
+                     f"{c['accuracy']:>7.2%} {c['macro_f1']:>7.2%} {fmt(c['macro_f1_per_1k_tokens'], '>11.4f')} "
+                     f"{fmt(c['macro_f1_per_second'], '>8.4f')} {fmt(c['macro_f1_per_usd'], '>9.1f')} {marks:>6}")
+    lines.append("pareto: T = on the macro-F1 vs tokens/claim frontier, S = on the macro-F1 vs seconds/claim frontier")
+    return "\n".join(lines)
+
+# Each worker process loads the groundtruth once
+_worker_groundtruth = None
+_worker_subset_ids = None
+_worker_keep_vectors = False
+_worker_keep_failures = False
+
+def _init_worker(groundtruth_file, subset_file, keep_vectors=False, keep_failures=False):
+    global _worker_groundtruth, _worker_subset_ids, _worker_keep_vectors, _worker_keep_failures
+    _worker_groundtruth = load_groundtruth(groundtruth_file)
+    _worker_subset_ids = resolve_subset_ids(subset_file) if subset_file else None
+    _worker_keep_vectors = keep_vectors
+    _worker_keep_failures = keep_failures
+
+def _evaluate_in_worker(pred_file):
+    try:
+        return evaluate_file(pred_file, _worker_groundtruth, _worker_subset_ids, _worker_keep_vectors, _worker_keep_failures)
+    except (OSError, ValueError) as e:
+        return {"file": pred_file, "error": str(e)}
+
+def evaluate_files(pred_files, groundtruth_file, subset_file=None, workers=None, keep_vectors=False, keep_failures=False):
+    """Evaluate many prediction files in parallel worker processes, keeping input order."""
+    workers = workers or min(len(pred_files), os.cpu_count() or 1) or 1
+    if workers == 1:
+        _init_worker(groundtruth_file, subset_file, keep_vectors, keep_failures)
+        return [_evaluate_in_worker(f) for f in pred_files]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(groundtruth_file, subset_file, keep_vectors, keep_failures)) as executor:
+        return list(executor.map(_evaluate_in_worker, pred_files))
+
+def find_prediction_files(root="."):
+    """Every answer_map file under root (skipping .git and live-metrics side files)."""
+    files = glob.glob(os.path.join(root, "**", "*answer_map*.json"), recursive=True)
+    return sorted(f for f in files if f"{os.sep}.git{os.sep}" not in f
+                  and not f.endswith(("_live_metrics.json", "_usage.json")))
+
+def format_table(results, sort_by="macro_f1"):
+    rows = [r for r in results if "error" not in r]
+    rows.sort(key=lambda r: r[sort_by], reverse=sort_by != "file")
+    width = max([len(r["file"]) for r in rows] + [4])
+    with_ci = any("ci" in r for r in rows)
+    lines = [f"{'file':<{width}} {'mode':>6} {'n':>5} {'acc':>7} {'macroF1':>8} "
+             + " ".join(f"{'F1 ' + label:>12}" for label in LABELS) + f" {'unk':>5}"
+             + (f" {'acc CI':>15} {'macroF1 CI':>15}" if with_ci else "")]
+    for r in rows:
+        line = (f"{r['file']:<{width}} {r['mode']:>6} {r['total']:>5} {r['accuracy']:>7.2%} {r['macro_f1']:>8.2%} "
+                + " ".join(f"{r['class_metrics'][label]['f1']:>12.2%}" for label in LABELS)
+                + f" {r['unknown']:>5}")
+        if with_ci and "ci" in r:
+            line += "".join(f" {'[{:.1%}, {:.1%}]'.format(*r['ci'][metric]):>15}" for metric in ("accuracy", "macro_f1"))
+        lines.append(line)
+    for r in results:
+        if "error" in r:
+            lines.append(f"{r['file']}: ERROR {r['error']}")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate many prediction files in parallel into one table")
+    parser.add_argument("--prediction", nargs="*", default=[],
+                        help="Prediction file(s) to evaluate")
+    parser.add_argument("--discover", type=str, default=None,
+                        help="Also evaluate every *answer_map*.json under this directory")
+    parser.add_argument("--groundtruth", type=str, default="data/GT_test_all.json")
+    parser.add_argument("--subset", type=str, default=None,
+                        help="Only evaluate a named subset (e.g. veracity_150) or the ids in a {category: [ids]} file")
+    parser.add_argument("--subsets", nargs="+", default=None,
+                        help="Also report metrics for each of these named subsets, from the same pass over each file")
+    parser.add_argument("--list_subsets", action="store_true",
+                        help="List the defined subsets and their sizes, then exit")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--sort_by", choices=["macro_f1", "accuracy", "file"], default="macro_f1")
+    parser.add_argument("--bootstrap", type=int, default=0,
+                        help="Number of bootstrap resamples for accuracy/macro-F1 confidence intervals (0 = off)")
+    parser.add_argument("--compare", action="store_true",
+                        help="Paired bootstrap and McNemar tests between every pair of prediction files")
+    parser.add_argument("--cost", action="store_true",
+                        help="Join <file>_usage.json (main.py --track_usage) and report accuracy/F1 per token, second and dollar")
+    parser.add_argument("--parse_rules", action="store_true",
+                        help="Show which verdict-ladder rule fired how often, per file")
+    parser.add_argument("--failure_corpus", type=str, default=None,
+                        help="Append verdicts no rule could parse to this JSONL corpus (deduplicated by text)")
+    parser.add_argument("--check_corpus", type=str, default=None,
+                        help="Re-parse a failure corpus with the current ladder and exit")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default=None, help="Write the full results as JSON")
+    args = parser.parse_args()
+
+    if args.list_subsets:
+        for name, definition in sorted(subset_definitions().items()):
+            print(f"{name:<20} v{definition.get('version', 1):<3} {len(load_subset(name)):>6} ids  {json.dumps(definition)}")
+        raise SystemExit(0)
+
+    if args.check_corpus:
+        print(json.dumps(check_failure_corpus(args.check_corpus), indent=2))
+        raise SystemExit(0)
+
+    pred_files = list(args.prediction)
+    if args.discover:
+        pred_files += [f for f in find_prediction_files(args.discover) if f not in pred_files]
+    missing = [f for f in pred_files if not os.path.exists(f)]
+    for f in missing:
+        print(f"Warning: Prediction file {f} does not exist, skipping...")
+    pred_files = [f for f in pred_files if f not in missing]
+    if not pred_files:
+        parser.error("no prediction files to evaluate")
+
+    n_resamples = args.bootstrap or (2000 if args.compare else 0)
+    results = evaluate_files(pred_files, args.groundtruth, args.subset, args.workers,
+                             keep_vectors=n_resamples > 0 or args.cost or bool(args.subsets),
+                             keep_failures=bool(args.failure_corpus))
+    if args.bootstrap:
+        for r in results:
+            if "vectors" in r:
+                r["ci"] = bootstrap_ci(r["vectors"]["y_true"], r["vectors"]["y_pred"], args.bootstrap, args.alpha, args.seed)
+    print(f"Groundtruth file: {args.groundtruth}" + (f", subset: {args.subset}" if args.subset else ""))
+    print(format_table(results, args.sort_by))
+
+    if args.subsets:
+        subsets = [load_subset(name) for name in args.subsets]
+        for r in results:
+            if "vectors" in r:
+                r["subsets"] = subset_metrics(r["vectors"], subsets)
+        print("\nPer-subset metrics")
+        print(format_subset_table(results))
+
+    if args.parse_rules:
+        print("\nVerdict parse rules (entries per rule, whole file)")
+        print(format_parse_rules(results))
+
+    if args.failure_corpus:
+        added = update_failure_corpus(args.failure_corpus, [f for r in results for f in r.pop("parse_failures", [])])
+        print(f"\nAdded {added} unparseable verdicts to {args.failure_corpus}")
+
+    if args.cost:
+        for r in results:
+            if "vectors" in r and os.path.exists(usage_file_for(r["file"])):
+                with open(usage_file_for(r["file"]), "r") as f:
+                    r["cost"] = cost_metrics(r, json.load(f))
+        print("\nCost-aware metrics (per claim averages on examples with usage records)")
+        print(format_cost_table(results))
+
+    comparisons = []
+    if args.compare:
+        comparisons = all_pairs_comparison(results, n_resamples, args.alpha, args.seed)
+        print(f"\nPaired comparisons ({n_resamples} resamples; deltas are A - B on common examples)")
+        print(format_comparisons(comparisons))
+
+    if args.output:
+        for r in results:
+            r.pop("vectors", None)
+        with open(args.output, "w") as f:
+            json.dump({"results": results, "comparisons": comparisons} if args.compare else results, f, indent=2)
+        print(f"Results saved to: {args.output}")
@@ -3,6 +3,12 @@ import json
 from tqdm import tqdm
 import os
 from model.loader import load_model
+from model.usage import instrument, tracker
+from prompts.evidence_packing import EvidencePacker, parse_budgets, at_turn
+from agents.transcript_compaction import set_compaction, compact_turns
+from eval.evaluation import LiveMetrics, parse_verdict, resolve_subset_ids
+
+MODES = ["single", "multi", "multi_people", "multi_people_intent", "multi_people_3", "multi_people_3_intent", "multi_role", "multi_stance_3", "multi_party", "four_agents", "four_agents_people", "multi_intent", "multi_stance_3_intent", "four_agents_intent", "four_agents_people_intent", "multi_people_1r", "multi_people_2r", "multi_people_4r"]
 
 def run_single_agent(claim, evidence, model_info):
     from agents.single_agent import set_model_info, verify_claim
@@ -30,17 +36,20 @@ def run_multi_agent(claim, evidence, model_info):
     set_model_info(model_info)
     
     print("\n=== Running Multi-Agent Debate (3 rounds) ===")
-    pro_open = opening_pro(claim, evidence)
-    con_open = opening_con(claim, evidence)
-    pro_rebut = rebuttal_pro(claim, evidence, con_open)
-    con_rebut = rebuttal_con(claim, evidence, pro_open)
-    pro_close = closing_pro(claim, evidence)
-    con_close = closing_con(claim, evidence)
+    pro_open = opening_pro(claim, at_turn(evidence, "opening"))
+    con_open = opening_con(claim, at_turn(evidence, "opening"))
+    pro_rebut = rebuttal_pro(claim, at_turn(evidence, "rebuttal"), con_open)
+    con_rebut = rebuttal_con(claim, at_turn(evidence, "rebuttal"), pro_open)
+    pro_close = closing_pro(claim, at_turn(evidence, "closing"))
+    con_close = closing_con(claim, at_turn(evidence, "closing"))
     final_result = judge_final_verdict(
-        claim, evidence,
-        pro_open, con_open,
-        pro_rebut, con_rebut,
-        pro_close, con_close
+        claim, at_turn(evidence, "judge"),
+        *compact_turns(
+            claim,
+            pro_opening=pro_open, con_opening=con_open,
+            pro_rebuttal=pro_rebut, con_rebuttal=con_rebut,
+            pro_closing=pro_close, con_closing=con_close
+        )
     )
     return pro_open, con_open, pro_rebut, con_rebut, pro_close, con_close, final_result
 
@@ -58,17 +67,20 @@ def run_multi_agent_party(claim, evidence, model_info):
     set_model_info(model_info)
     
     print("\n=== Running Multi-Agent Party Debate (Democrat vs Republican) ===")
-    dem_open = opening_democrat(claim, evidence)
-    rep_open = opening_republican(claim, evidence)
-    dem_rebut = rebuttal_democrat(claim, evidence, rep_open)
-    rep_rebut = rebuttal_republican(claim, evidence, dem_open)
-    dem_close = closing_democrat(claim, evidence)
-    rep_close = closing_republican(claim, evidence)
+    dem_open = opening_democrat(claim, at_turn(evidence, "opening"))
+    rep_open = opening_republican(claim, at_turn(evidence, "opening"))
+    dem_rebut = rebuttal_democrat(claim, at_turn(evidence, "rebuttal"), rep_open)
+    rep_rebut = rebuttal_republican(claim, at_turn(evidence, "rebuttal"), dem_open)
+    dem_close = closing_democrat(claim, at_turn(evidence, "closing"))
+    rep_close = closing_republican(claim, at_turn(evidence, "closing"))
     final_result = judge_final_verdict_party(
-        claim, evidence,
-        dem_open, rep_open,
-        dem_rebut, rep_rebut,
-        dem_close, rep_close
+        claim, at_turn(evidence, "judge"),
+        *compact_turns(
+            claim,
+            democrat_opening=dem_open, republican_opening=rep_open,
+            democrat_rebuttal=dem_rebut, republican_rebuttal=rep_rebut,
+            democrat_closing=dem_close, republican_closing=rep_close
+        )
     )
     return dem_open, rep_open, dem_rebut, rep_rebut, dem_close, rep_close, final_result
     
@@ -81,17 +93,20 @@ def run_multi_agent_people(claim, evidence, model_info):
     set_model_info(model_info)
     
     print("\n=== Running Multi-Agent People Debate (Politician vs Scientist) ===")
-    pol_open = opening_politician(claim, evidence)
-    sci_open = opening_scientist(claim, evidence)
-    pol_rebut = rebuttal_politician(claim, evidence, sci_open)
-    sci_rebut = rebuttal_scientist(claim, evidence, pol_open)
-    pol_close = closing_politician(claim, evidence)
-    sci_close = closing_scientist(claim, evidence)
+    pol_open = opening_politician(claim, at_turn(evidence, "opening"))
+    sci_open = opening_scientist(claim, at_turn(evidence, "opening"))
+    pol_rebut = rebuttal_politician(claim, at_turn(evidence, "rebuttal"), sci_open)
+    sci_rebut = rebuttal_scientist(claim, at_turn(evidence, "rebuttal"), pol_open)
+    pol_close = closing_politician(claim, at_turn(evidence, "closing"))
+    sci_close = closing_scientist(claim, at_turn(evidence, "closing"))
     final_result = judge_final_verdict_people(
-        claim, evidence,
-        pol_open, sci_open,
-        pol_rebut, sci_rebut,
-        pol_close, sci_close
+        claim, at_turn(evidence, "judge"),
+        *compact_turns(
+            claim,
+            politician_opening=pol_open, scientist_opening=sci_open,
+            politician_rebuttal=pol_rebut, scientist_rebuttal=sci_rebut,
+            politician_closing=pol_close, scientist_closing=sci_close
+        )
     )
     return pol_open, sci_open, pol_rebut, sci_rebut, pol_close, sci_close, final_result
 
@@ -128,23 +143,26 @@ def run_multi_agent_role(claim, evidence, model_info):
     intent, support_role, oppose_role = infer_intent_and_roles(claim)
     
     # Step 2: Opening statements
-    pro_open = opening_pro_role(claim, evidence, support_role)
-    con_open = opening_con_role(claim, evidence, oppose_role)
+    pro_open = opening_pro_role(claim, at_turn(evidence, "opening"), support_role)
+    con_open = opening_con_role(claim, at_turn(evidence, "opening"), oppose_role)
     
     # Step 3: Rebuttals
-    pro_rebut = rebuttal_pro_role(claim, evidence, con_open, support_role)
-    con_rebut = rebuttal_con_role(claim, evidence, pro_open, oppose_role)
+    pro_rebut = rebuttal_pro_role(claim, at_turn(evidence, "rebuttal"), con_open, support_role)
+    con_rebut = rebuttal_con_role(claim, at_turn(evidence, "rebuttal"), pro_open, oppose_role)
     
     # Step 4: Closings
-    pro_close = closing_pro_role(claim, evidence, support_role)
-    con_close = closing_con_role(claim, evidence, oppose_role)
+    pro_close = closing_pro_role(claim, at_turn(evidence, "closing"), support_role)
+    con_close = closing_con_role(claim, at_turn(evidence, "closing"), oppose_role)
     
     # Step 5: Judge verdict
     final_result = judge_final_verdict_role(
-        claim, evidence,
-        pro_open, con_open,
-        pro_rebut, con_rebut,
-        pro_close, con_close
+        claim, at_turn(evidence, "judge"),
+        *compact_turns(
+            claim,
+            pro_opening=pro_open, con_opening=con_open,
+            pro_rebuttal=pro_rebut, con_rebuttal=con_rebut,
+            pro_closing=pro_close, con_closing=con_close
+        )
     )
     return intent, support_role, oppose_role, pro_open, con_open, pro_rebut, con_rebut, pro_close, con_close, final_result
 
@@ -160,25 +178,28 @@ def run_multi_agent_people_3(claim, evidence, model_info):
     print("\n=== Running Multi-Agent People 3 Debate (Journalist → Politician → Scientist) ===")
     
     # Opening statements: Journalist → Politician → Scientist
-    jour_open = opening_journalist(claim, evidence)
-    pol_open = opening_politician(claim, evidence, jour_open)
-    sci_open = opening_scientist(claim, evidence, jour_open)
+    jour_open = opening_journalist(claim, at_turn(evidence, "opening"))
+    pol_open = opening_politician(claim, at_turn(evidence, "opening"), jour_open)
+    sci_open = opening_scientist(claim, at_turn(evidence, "opening"), jour_open)
     
     # Rebuttal statements: Journalist → Politician → Scientist
-    jour_rebut = rebuttal_journalist(claim, evidence, pol_open, sci_open)
-    pol_rebut = rebuttal_politician(claim, evidence, sci_open, jour_open)
-    sci_rebut = rebuttal_scientist(claim, evidence, pol_open, jour_open)
+    jour_rebut = rebuttal_journalist(claim, at_turn(evidence, "rebuttal"), pol_open, sci_open)
+    pol_rebut = rebuttal_politician(claim, at_turn(evidence, "rebuttal"), sci_open, jour_open)
+    sci_rebut = rebuttal_scientist(claim, at_turn(evidence, "rebuttal"), pol_open, jour_open)
     
     # Closing statements: Journalist → Politician → Scientist
-    jour_close = closing_journalist(claim, evidence, pol_rebut, sci_rebut)
-    pol_close = closing_politician(claim, evidence, jour_rebut)
-    sci_close = closing_scientist(claim, evidence, jour_rebut)
+    jour_close = closing_journalist(claim, at_turn(evidence, "closing"), pol_rebut, sci_rebut)
+    pol_close = closing_politician(claim, at_turn(evidence, "closing"), jour_rebut)
+    sci_close = closing_scientist(claim, at_turn(evidence, "closing"), jour_rebut)
     
     final_result = judge_final_verdict_people_3(
-        claim, evidence,
-        jour_open, pol_open, sci_open,
-        jour_rebut, pol_rebut, sci_rebut,
-        jour_close, pol_close, sci_close
+        claim, at_turn(evidence, "judge"),
+        *compact_turns(
+            claim,
+            journalist_opening=jour_open, politician_opening=pol_open, scientist_opening=sci_open,
+            journalist_rebuttal=jour_rebut, politician_rebuttal=pol_rebut, scientist_rebuttal=sci_rebut,
+            journalist_closing=jour_close, politician_closing=pol_close, scientist_closing=sci_close
+        )
     )
     return jour_open, pol_open, sci_open, jour_rebut, pol_rebut, sci_rebut, jour_close, pol_close, sci_close, final_result
 
@@ -200,26 +221,29 @@ def run_multi_agent_people_3_intent(claim, evidence, model_info):
     con_claim = reformulate_claim_con(claim, intent)
     
     # Step 2: Opening statements: Journalist → Politician → Scientist
-    jour_open = opening_journalist(claim, evidence)
-    pol_open = opening_politician(pro_claim, evidence, jour_open)
-    sci_open = opening_scientist(con_claim, evidence, jour_open)
+    jour_open = opening_journalist(claim, at_turn(evidence, "opening"))
+    pol_open = opening_politician(pro_claim, at_turn(evidence, "opening"), jour_open)
+    sci_open = opening_scientist(con_claim, at_turn(evidence, "opening"), jour_open)
     
     # Step 3: Rebuttal statements: Journalist → Politician → Scientist
-    jour_rebut = rebuttal_journalist(claim, evidence, pol_open, sci_open)
-    pol_rebut = rebuttal_politician(pro_claim, evidence, sci_open, jour_open)
-    sci_rebut = rebuttal_scientist(con_claim, evidence, pol_open, jour_open)
+    jour_rebut = rebuttal_journalist(claim, at_turn(evidence, "rebuttal"), pol_open, sci_open)
+    pol_rebut = rebuttal_politician(pro_claim, at_turn(evidence, "rebuttal"), sci_open, jour_open)
+    sci_rebut = rebuttal_scientist(con_claim, at_turn(evidence, "rebuttal"), pol_open, jour_open)
     
     # Step 4: Closing statements: Journalist → Politician → Scientist
-    jour_close = closing_journalist(claim, evidence, pol_rebut, sci_rebut)
-    pol_close = closing_politician(pro_claim, evidence, jour_rebut)
-    sci_close = closing_scientist(con_claim, evidence, jour_rebut)
+    jour_close = closing_journalist(claim, at_turn(evidence, "closing"), pol_rebut, sci_rebut)
+    pol_close = closing_politician(pro_claim, at_turn(evidence, "closing"), jour_rebut)
+    sci_close = closing_scientist(con_claim, at_turn(evidence, "closing"), jour_rebut)
     
     # Step 5: Judge verdict
     final_result = judge_final_verdict(
-        claim, evidence,
-        jour_open, pol_open, sci_open,
-        jour_rebut, pol_rebut, sci_rebut,
-        jour_close, pol_close, sci_close
+        claim, at_turn(evidence, "judge"),
+        *compact_turns(
+            claim,
+            journalist_opening=jour_open, politician_opening=pol_open, scientist_opening=sci_open,
+            journalist_rebuttal=jour_rebut, politician_rebuttal=pol_rebut, scientist_rebuttal=sci_rebut,
+            journalist_closing=jour_close, politician_closing=pol_close, scientist_closing=sci_close
+        )
     )
     
     return intent, pro_claim, con_claim, jour_open, pol_open, sci_open, jour_rebut, pol_rebut, sci_rebut, jour_close, pol_close, sci_close, final_result
@@ -235,29 +259,32 @@ def run_four_agents(claim, evidence, model_info):
     
     print("\n=== Running 4-Agent Debate ===")
     # Opening statements
-    pro1_open = opening_pro1(claim, evidence)
-    pro2_open = opening_pro2(claim, evidence)
-    con1_open = opening_con1(claim, evidence)
-    con2_open = opening_con2(claim, evidence)
+    pro1_open = opening_pro1(claim, at_turn(evidence, "opening"))
+    pro2_open = opening_pro2(claim, at_turn(evidence, "opening"))
+    con1_open = opening_con1(claim, at_turn(evidence, "opening"))
+    con2_open = opening_con2(claim, at_turn(evidence, "opening"))
     
     # Rebuttals
-    pro1_rebut = rebuttal_pro1(claim, evidence, con1_open, con2_open)
-    pro2_rebut = rebuttal_pro2(claim, evidence, con1_open, con2_open)
-    con1_rebut = rebuttal_con1(claim, evidence, pro1_open, pro2_open)
-    con2_rebut = rebuttal_con2(claim, evidence, pro1_open, pro2_open)
+    pro1_rebut = rebuttal_pro1(claim, at_turn(evidence, "rebuttal"), con1_open, con2_open)
+    pro2_rebut = rebuttal_pro2(claim, at_turn(evidence, "rebuttal"), con1_open, con2_open)
+    con1_rebut = rebuttal_con1(claim, at_turn(evidence, "rebuttal"), pro1_open, pro2_open)
+    con2_rebut = rebuttal_con2(claim, at_turn(evidence, "rebuttal"), pro1_open, pro2_open)
     
     # Closings
-    pro1_close = closing_pro1(claim, evidence)
-    pro2_close = closing_pro2(claim, evidence)
-    con1_close = closing_con1(claim, evidence)
-    con2_close = closing_con2(claim, evidence)
+    pro1_close = closing_pro1(claim, at_turn(evidence, "closing"))
+    pro2_close = closing_pro2(claim, at_turn(evidence, "closing"))
+    con1_close = closing_con1(claim, at_turn(evidence, "closing"))
+    con2_close = closing_con2(claim, at_turn(evidence, "closing"))
     
     # Judge verdict
     final_result = judge_final_verdict(
-        claim, evidence,
-        pro1_open, pro2_open, con1_open, con2_open,
-        pro1_rebut, pro2_rebut, con1_rebut, con2_rebut,
-        pro1_close, pro2_close, con1_close, con2_close
+        claim, at_turn(evidence, "judge"),
+        *compact_turns(
+            claim,
+            pro1_opening=pro1_open, pro2_opening=pro2_open, con1_opening=con1_open, con2_opening=con2_open,
+            pro1_rebuttal=pro1_rebut, pro2_rebuttal=pro2_rebut, con1_rebuttal=con1_rebut, con2_rebuttal=con2_rebut,
+            pro1_closing=pro1_close, pro2_closing=pro2_close, con1_closing=con1_close, con2_closing=con2_close
+        )
     )
     
     return (pro1_open, pro2_open, con1_open, con2_open,
@@ -281,29 +308,32 @@ def run_four_agents_people(claim, evidence, model_info):
     domain_specialist = infer_domain_specialist(claim)
     
     # Step 2: Opening statements
-    pol_open = opening_politician(claim, evidence)
-    sci_open = opening_scientist(claim, evidence)
-    jour_open = opening_journalist(claim, evidence)
-    dom_open = opening_domain_scientist(claim, evidence, domain_specialist)
+    pol_open = opening_politician(claim, at_turn(evidence, "opening"))
+    sci_open = opening_scientist(claim, at_turn(evidence, "opening"))
+    jour_open = opening_journalist(claim, at_turn(evidence, "opening"))
+    dom_open = opening_domain_scientist(claim, at_turn(evidence, "opening"), domain_specialist)
     
     # Step 3: Rebuttals
-    pol_rebut = rebuttal_politician(claim, evidence, sci_open, jour_open, dom_open)
-    sci_rebut = rebuttal_scientist(claim, evidence, pol_open, jour_open, dom_open)
-    jour_rebut = rebuttal_journalist(claim, evidence, pol_open, sci_open, dom_open)
-    dom_rebut = rebuttal_domain_scientist(claim, evidence, pol_open, sci_open, jour_open, domain_specialist)
+    pol_rebut = rebuttal_politician(claim, at_turn(evidence, "rebuttal"), sci_open, jour_open, dom_open)
+    sci_rebut = rebuttal_scientist(claim, at_turn(evidence, "rebuttal"), pol_open, jour_open, dom_open)
+    jour_rebut = rebuttal_journalist(claim, at_turn(evidence, "rebuttal"), pol_open, sci_open, dom_open)
+    dom_rebut = rebuttal_domain_scientist(claim, at_turn(evidence, "rebuttal"), pol_open, sci_open, jour_open, domain_specialist)
     
     # Step 4: Closings
-    pol_close = closing_politician(claim, evidence)
-    sci_close = closing_scientist(claim, evidence)
-    jour_close = closing_journalist(claim, evidence)
-    dom_close = closing_domain_scientist(claim, evidence, domain_specialist)
+    pol_close = closing_politician(claim, at_turn(evidence, "closing"))
+    sci_close = closing_scientist(claim, at_turn(evidence, "closing"))
+    jour_close = closing_journalist(claim, at_turn(evidence, "closing"))
+    dom_close = closing_domain_scientist(claim, at_turn(evidence, "closing"), domain_specialist)
     
     # Step 5: Judge verdict
     final_result = judge_final_verdict(
-        claim, evidence, 
-        pol_open, sci_open, jour_open, dom_open,
-        pol_rebut, sci_rebut, jour_rebut, dom_rebut,
-        pol_close, sci_close, jour_close, dom_close
+        claim, at_turn(evidence, "judge"),
+        *compact_turns(
+            claim,
+            politician_opening=pol_open, scientist_opening=sci_open, journalist_opening=jour_open, domain_scientist_opening=dom_open,
+            politician_rebuttal=pol_rebut, scientist_rebuttal=sci_rebut, journalist_rebuttal=jour_rebut, domain_scientist_rebuttal=dom_rebut,
+            politician_closing=pol_close, scientist_closing=sci_close, journalist_closing=jour_close, domain_scientist_closing=dom_close
+        )
     )
     
     return (domain_specialist, pol_open, sci_open, jour_open, dom_open,
@@ -323,32 +353,35 @@ def run_multi_agent_stance_3(claim, evidence, model_info):
     print("\n=== Running Multi-Agent Stance 3 Debate (Pro vs Con vs Flexible) ===")
     
     # Step 1: Generate opening statements for pro and con first
-    pro_open = opening_pro(claim, evidence)
-    con_open = opening_con(claim, evidence)
+    pro_open = opening_pro(claim, at_turn(evidence, "opening"))
+    con_open = opening_con(claim, at_turn(evidence, "opening"))
     
     # Step 2: Generate flexible opening statement (needs pro and con arguments)
-    flex_open = opening_flexible(claim, evidence, pro_open, con_open)
+    flex_open = opening_flexible(claim, at_turn(evidence, "opening"), pro_open, con_open)
     
     # Step 3: Generate rebuttals
-    pro_rebut = rebuttal_pro(claim, evidence, con_open)
-    con_rebut = rebuttal_con(claim, evidence, pro_open)
+    pro_rebut = rebuttal_pro(claim, at_turn(evidence, "rebuttal"), con_open)
+    con_rebut = rebuttal_con(claim, at_turn(evidence, "rebuttal"), pro_open)
     
     # Step 4: Generate flexible rebuttal (needs pro and con arguments)
-    flex_rebut = rebuttal_flexible(claim, evidence, pro_rebut, con_rebut)
+    flex_rebut = rebuttal_flexible(claim, at_turn(evidence, "rebuttal"), pro_rebut, con_rebut)
     
     # Step 5: Generate closings
-    pro_close = closing_pro(claim, evidence)
-    con_close = closing_con(claim, evidence)
+    pro_close = closing_pro(claim, at_turn(evidence, "closing"))
+    con_close = closing_con(claim, at_turn(evidence, "closing"))
     
     # Step 6: Generate flexible closing (needs pro and con arguments)
-    flex_close = closing_flexible(claim, evidence, pro_close, con_close)
+    flex_close = closing_flexible(claim, at_turn(evidence, "closing"), pro_close, con_close)
     
     # Step 7: Judge verdict
     final_result = judge_final_verdict(
-        claim, evidence,
-        flex_open, pro_open, con_open,
-        flex_rebut, pro_rebut, con_rebut,
-        flex_close, pro_close, con_close
+        claim, at_turn(evidence, "judge"),
+        *compact_turns(
+            claim,
+            flexible_opening=flex_open, pro_opening=pro_open, con_opening=con_open,
+            flexible_rebuttal=flex_rebut, pro_rebuttal=pro_rebut, con_rebuttal=con_rebut,
+            flexible_closing=flex_close, pro_closing=pro_close, con_closing=con_close
+        )
     )
     
     return (flex_open, pro_open, con_open,
@@ -422,20 +455,23 @@ def run_multi_agent_people_4r(claim, evidence, model_info):
     set_model_info(model_info)
     
     print("\n=== Running Multi-Agent People Debate (4 rounds: Politician vs Scientist) ===")
-    pol_open = opening_politician(claim, evidence)
-    sci_open = opening_scientist(claim, evidence)
-    pol_rebut = rebuttal_politician(claim, evidence, sci_open)
-    sci_rebut = rebuttal_scientist(claim, evidence, pol_open)
-    pol_cross = cross_examination_politician(claim, evidence, sci_rebut)
-    sci_cross = cross_examination_scientist(claim, evidence, pol_rebut)
-    pol_close = closing_politician(claim, evidence)
-    sci_close = closing_scientist(claim, evidence)
+    pol_open = opening_politician(claim, at_turn(evidence, "opening"))
+    sci_open = opening_scientist(claim, at_turn(evidence, "opening"))
+    pol_rebut = rebuttal_politician(claim, at_turn(evidence, "rebuttal"), sci_open)
+    sci_rebut = rebuttal_scientist(claim, at_turn(evidence, "rebuttal"), pol_open)
+    pol_cross = cross_examination_politician(claim, at_turn(evidence, "rebuttal"), sci_rebut)
+    sci_cross = cross_examination_scientist(claim, at_turn(evidence, "rebuttal"), pol_rebut)
+    pol_close = closing_politician(claim, at_turn(evidence, "closing"))
+    sci_close = closing_scientist(claim, at_turn(evidence, "closing"))
     final_result = judge_final_verdict_people_4r(
-        claim, evidence,
-        pol_open, sci_open,
-        pol_rebut, sci_rebut,
-        pol_cross, sci_cross,
-        pol_close, sci_close
+        claim, at_turn(evidence, "judge"),
+        *compact_turns(
+            claim,
+            politician_opening=pol_open, scientist_opening=sci_open,
+            politician_rebuttal=pol_rebut, scientist_rebuttal=sci_rebut,
+            politician_cross_examination=pol_cross, scientist_cross_examination=sci_cross,
+            politician_closing=pol_close, scientist_closing=sci_close
+        )
     )
     return pol_open, sci_open, pol_rebut, sci_rebut, pol_cross, sci_cross, pol_close, sci_close, final_result
 
@@ -448,14 +484,17 @@ def run_multi_agent_people_2r(claim, evidence, model_info):
     set_model_info(model_info)
     
     print("\n=== Running Multi-Agent People Debate (2 rounds: Politician vs Scientist) ===")
-    pol_open = opening_politician(claim, evidence)
-    sci_open = opening_scientist(claim, evidence)
-    pol_rebut = rebuttal_politician(claim, evidence, sci_open)
-    sci_rebut = rebuttal_scientist(claim, evidence, pol_open)
+    pol_open = opening_politician(claim, at_turn(evidence, "opening"))
+    sci_open = opening_scientist(claim, at_turn(evidence, "opening"))
+    pol_rebut = rebuttal_politician(claim, at_turn(evidence, "rebuttal"), sci_open)
+    sci_rebut = rebuttal_scientist(claim, at_turn(evidence, "rebuttal"), pol_open)
     final_result = judge_final_verdict_people_2r(
-        claim, evidence,
-        pol_open, sci_open,
-        pol_rebut, sci_rebut
+        claim, at_turn(evidence, "judge"),
+        *compact_turns(
+            claim,
+            politician_opening=pol_open, scientist_opening=sci_open,
+            politician_rebuttal=pol_rebut, scientist_rebuttal=sci_rebut
+        )
     )
     return pol_open, sci_open, pol_rebut, sci_rebut, final_result
 
@@ -468,11 +507,14 @@ def run_multi_agent_people_1r(claim, evidence, model_info):
     set_model_info(model_info)
     
     print("\n=== Running Multi-Agent People Debate (1 round: Politician vs Scientist) ===")
-    pol_open = opening_politician(claim, evidence)
-    sci_open = opening_scientist(claim, evidence)
+    pol_open = opening_politician(claim, at_turn(evidence, "opening"))
+    sci_open = opening_scientist(claim, at_turn(evidence, "opening"))
     final_result = judge_final_verdict_people_1r(
-        claim, evidence,
-        pol_open, sci_open
+        claim, at_turn(evidence, "judge"),
+        *compact_turns(
+            claim,
+            politician_opening=pol_open, scientist_opening=sci_open
+        )
     )
     return pol_open, sci_open, final_result
 
@@ -480,15 +522,15 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "--mode",
-        choices=["single", "multi", "multi_people", "multi_people_intent", "multi_people_3", "multi_people_3_intent", "multi_role", "multi_stance_3", "multi_party", "four_agents", "four_agents_people", "multi_intent", "multi_stance_3_intent", "four_agents_intent", "four_agents_people_intent", "multi_people_1r", "multi_people_2r", "multi_people_4r"],
+        choices=MODES,
         default="single",
         help="Choose inference mode."
     )
     parser.add_argument(
         "--model",
-        choices=["llama", "qwen", "gpt"],
+        choices=["llama", "qwen", "gpt", "stub"],
         default="llama",
-        help="Choose model type: llama, qwen, or gpt"
+        help="Choose model type: llama, qwen, gpt, or stub (deterministic replies, for benchmark.py)"
     )
     parser.add_argument(
         "--model_path",
@@ -512,6 +554,56 @@ def main():
         required=True,
         help="Path to the input JSON file containing examples."
     )
+    parser.add_argument(
+        "--output_dir",
+        type=str,
+        default="data",
+        help="Directory for the answer map and its side files"
+    )
+    parser.add_argument(
+        "--pack_evidence",
+        action="store_true",
+        help="Render evidence as a numbered list packed into a per-turn token budget instead of the raw list"
+    )
+    parser.add_argument(
+        "--evidence_budgets",
+        type=str,
+        default=None,
+        help="Token budgets per turn type for --pack_evidence, e.g. 'opening=512,rebuttal=256,closing=192,judge=512'"
+    )
+    parser.add_argument(
+        "--track_usage",
+        action="store_true",
+        help="Record per-example token counts, generation seconds and (gpt) cost in <output>_usage.json"
+    )
+    parser.add_argument(
+        "--live_metrics",
+        action="store_true",
+        help="Keep running accuracy / per-class / UNKNOWN counters against --groundtruth in <output>_live_metrics.json"
+    )
+    parser.add_argument(
+        "--groundtruth",
+        type=str,
+        default="data/GT_test_all.json",
+        help="Groundtruth file used by --live_metrics"
+    )
+    parser.add_argument(
+        "--subset",
+        type=str,
+        default=None,
+        help="Only run the examples of a named evaluation subset (e.g. veracity_150) or a {category: [ids]} file"
+    )
+    parser.add_argument(
+        "--retry_unparsed",
+        action="store_true",
+        help="Regenerate examples already in the output file whose verdict no parser rule can read"
+    )
+    parser.add_argument(
+        "--compact_transcript",
+        choices=["none", "extractive", "llm"],
+        default="none",
+        help="Condense each debate turn before the judge: extractively, or with one LLM call per debate"
+    )
     args = parser.parse_args()
 
     print(f"Loading {args.model} model...")
@@ -519,6 +611,9 @@ def main():
         # if not args.api_key:
         #     raise ValueError("API key is required for GPT model. Use --api_key option.")
         model_info = load_model(model_type=args.model, api_key=args.api_key)
+    elif args.model == "stub":
+        from model.stub import load_stub
+        model_info = load_stub()
     elif args.model == "qwen":
         model_path = args.model_path or "Qwen/Qwen2.5-7B-Instruct"
         model_info = load_model(model_path=model_path, model_type=args.model)
@@ -527,6 +622,11 @@ def main():
         model_info = load_model(model_path=model_path, model_type=args.model)
     
     print(f"Model loaded successfully: {args.model}")
+    if args.track_usage:
+        model_info = instrument(model_info)
+
+    set_compaction(args.compact_transcript, model_info)
+    packer = EvidencePacker(model_info, parse_budgets(args.evidence_budgets)) if args.pack_evidence else None
 
     # Load input file
     print(f"Loading input file: {args.input_file}")
@@ -535,10 +635,18 @@ def main():
     
     # test test
     # all_examples = dict(list(all_examples.items())[:200])
+    subset_ids = None
+    if args.subset:
+        subset_ids = resolve_subset_ids(args.subset)
+        all_examples = {k: v for k, v in all_examples.items() if k in subset_ids}
+        print(f"Subset {args.subset}: {len(all_examples)} examples")
 
     # Generate output filename based on input filename and model
     input_basename = os.path.splitext(os.path.basename(args.input_file))[0]
-    output_file = os.path.join("data", f"{input_basename}_answer_map_{args.mode}_{args.model}.json")
+    suffix = "_packed" if args.pack_evidence else ""
+    if args.compact_transcript != "none":
+        suffix += f"_compact_{args.compact_transcript}"
+    output_file = os.path.join(args.output_dir, f"{input_basename}_answer_map_{args.mode}_{args.model}{suffix}.json")
     
     print(f"Output will be saved to: {output_file}")
     print(f"Processing {len(all_examples)} examples in {args.mode} mode with {args.model} model")
@@ -549,12 +657,42 @@ def main():
     except FileNotFoundError:
         answer_map = {}
 
-    for example_id, example in tqdm(all_examples.items(), desc=f"Processing examples ({args.mode} + {args.model})"):
+    # Verdicts are parsed inline, so failed parses are known without a separate eval run
+    unparsed = {example_id for example_id, content in answer_map.items() if parse_verdict(content)[1] is None}
+    if unparsed and args.retry_unparsed:
+        print(f"Retrying {len(unparsed)} examples with unparseable verdicts")
+        for example_id in unparsed:
+            del answer_map[example_id]
+        unparsed = set()
+
+    usage_file = output_file.replace(".json", "_usage.json")
+    usage_map = {}
+    if args.track_usage:
+        try:
+            with open(usage_file, "r") as f:
+                usage_map = json.load(f)
+        except FileNotFoundError:
+            pass
+
+    live_metrics = None
+    if args.live_metrics:
+        metrics_file = output_file.replace(".json", "_live_metrics.json")
+        live_metrics = LiveMetrics(args.groundtruth, metrics_file, subset_ids)
+        # Count examples finished by an earlier, resumed run
+        for example_id, content in answer_map.items():
+            live_metrics.update(example_id, content)
+        print(f"Live metrics will be written to: {metrics_file}")
+
+    progress = tqdm(all_examples.items(), desc=f"Processing examples ({args.mode} + {args.model})")
+    for example_id, example in progress:
         if example_id in answer_map:
             continue
 
         claim = example["claim"]
         evidence = example["evidence_full_text"]
+        tracker.start_example()
+        if packer is not None:
+            evidence = packer.pack(evidence)
 
         if args.mode == "single":
             result = run_single_agent(claim, evidence, model_info)
@@ -819,11 +957,30 @@ def main():
                 "final_verdict": final_result
             }
            
+        if args.track_usage:
+            usage_map[example_id] = tracker.example_usage()
+            with open(usage_file, "w") as f:
+                json.dump(usage_map, f, indent=2)
+
+        _, rule, _ = parse_verdict(answer_map[example_id])
+        if rule is None:
+            unparsed.add(example_id)
+            tqdm.write(f"Example {example_id}: no verdict could be parsed")
+
+        if live_metrics is not None:
+            live_metrics.update(example_id, answer_map[example_id])
+            summary = live_metrics.write()
+            progress.set_postfix(acc=f"{summary['accuracy']:.2%}", unk=f"{summary['unknown_rate']:.1%}")
+
         # Save final results
         with open(output_file, "w") as f:
             json.dump(answer_map, f, indent=2)
         print(f"Results saved to: {output_file}")
         print(f"Processed {len(answer_map)} examples")
+    if unparsed:
+        print(f"{len(unparsed)} examples have no parseable verdict; re-judge them with "
+              f"python -m agents.rejudge --answer_map {output_file} --input_file {args.input_file}, "
+              f"or rerun with --retry_unparsed to regenerate them")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
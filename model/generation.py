@@ -0,0 +1,27 @@
+def chat_prompt(system_prompt, user_prompt):
+    # Same layout as run_model in agents/*.py
+    return f"<|begin_of_text|><|system|>\n{system_prompt}\n<|user|>\n{user_prompt}<|assistant|>\n"
+
+def generate_batch(tokenizer, model, system_prompts, user_prompts, max_tokens=300):
+    """
+    Greedy generation for a batch of chat prompts in one padded generate call.
+    Returns only the newly generated text of each prompt.
+    """
+    # Decoder-only models need left padding so every prompt ends where generation starts
+    padding_side = tokenizer.padding_side
+    tokenizer.padding_side = "left"
+    if tokenizer.pad_token_id is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    inputs = tokenizer([chat_prompt(s, u) for s, u in zip(system_prompts, user_prompts)],
+                       return_tensors="pt", padding=True).to(model.device)
+    tokenizer.padding_side = padding_side
+    outputs = model.generate(
+        **inputs,
+        max_new_tokens=max_tokens,
+        do_sample=False,
+        eos_token_id=tokenizer.eos_token_id,
+        pad_token_id=tokenizer.pad_token_id,
+        use_cache=True
+    )
+    new_tokens = outputs[:, inputs["input_ids"].shape[1]:]
+    return [text.strip() for text in tokenizer.batch_decode(new_tokens, skip_special_tokens=True)]
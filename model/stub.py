@@ -0,0 +1,52 @@
+import re
+import hashlib
+from types import SimpleNamespace
+
+# A deterministic stand-in for a chat model: the same prompt always gets the same
+# reply, with no weights and no network. It is shaped like the OpenAI client, so
+# every agent's run_model takes its gpt path unchanged.
+
+STUB_LABELS = ["TRUE", "HALF-TRUE", "FALSE"]
+CLAIM_LINE = re.compile(r'Claim:\s*"?([^"\n]+)')
+FILLER = ("the evidence on this point suggests a careful reading of the claim and "
+          "its context before reaching any firm conclusion about what it implies").split()
+
+def _digest(text):
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest(), 16)
+
+def count_tokens(text):
+    """Whitespace tokens; good enough to notice a prompt that grew."""
+    return len(text.split())
+
+def stub_reply(user_prompt, max_tokens=300):
+    """
+    Filler of half the token budget. When the prompt asks for a verdict, the reply
+    starts with one, keyed on the claim rather than the whole prompt, so prompt
+    edits don't reshuffle verdicts but a prompt that stops asking for the
+    [VERDICT] format shows up as unparseable answers.
+    """
+    start = _digest(user_prompt)
+    words = [FILLER[(start + i) % len(FILLER)] for i in range(max(max_tokens // 2, 1))]
+    if "VERDICT" not in user_prompt.upper():
+        return " ".join(words)
+    claim = CLAIM_LINE.search(user_prompt)
+    verdict = STUB_LABELS[_digest(claim.group(1).strip() if claim else user_prompt) % len(STUB_LABELS)]
+    return f"[VERDICT]: {verdict}\n[REASON]: " + " ".join(words[:-4])
+
+class StubCompletions:
+    def create(self, model=None, messages=(), max_tokens=300, **kwargs):
+        prompt = "\n".join(message["content"] for message in messages)
+        user_prompt = next((m["content"] for m in reversed(messages) if m["role"] == "user"), prompt)
+        content = stub_reply(user_prompt, max_tokens)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=count_tokens(prompt), completion_tokens=count_tokens(content))
+        )
+
+class StubClient:
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=StubCompletions())
+
+def load_stub():
+    """model_info for the stub, in the (client, model_name) shape of the gpt path."""
+    return StubClient(), "stub"
@@ -0,0 +1,106 @@
+import time
+
+# USD per 1M (input, output) tokens for the gpt path
+GPT_PRICES_PER_1M = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+class UsageTracker:
+    """Token counts and generation time per example, filled in by the instrumented model."""
+    def __init__(self):
+        self.current = self._empty()
+        self.started = time.time()
+
+    @staticmethod
+    def _empty():
+        return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "seconds": 0.0, "cost_usd": 0.0}
+
+    def start_example(self):
+        self.current = self._empty()
+        self.started = time.time()
+
+    def record(self, prompt_tokens, completion_tokens, seconds, cost_usd=0.0, calls=1):
+        self.current["calls"] += calls
+        self.current["prompt_tokens"] += int(prompt_tokens)
+        self.current["completion_tokens"] += int(completion_tokens)
+        self.current["seconds"] += seconds
+        self.current["cost_usd"] += cost_usd
+
+    def example_usage(self):
+        usage = dict(self.current)
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        # Whole example, including prompt building and parsing between calls
+        usage["wall_seconds"] = time.time() - self.started
+        return usage
+
+tracker = UsageTracker()
+
+class InstrumentedModel:
+    """Wraps a HF model so every generate() call is timed and its tokens counted."""
+    def __init__(self, model, usage_tracker=tracker):
+        self._model = model
+        self._tracker = usage_tracker
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+    def generate(self, *args, **kwargs):
+        start = time.time()
+        outputs = self._model.generate(*args, **kwargs)
+        seconds = time.time() - start
+
+        input_ids = kwargs.get("input_ids", args[0] if args else None)
+        attention_mask = kwargs.get("attention_mask")
+        prompt_tokens = int(attention_mask.sum()) if attention_mask is not None else int(input_ids.numel())
+        new_tokens = outputs[:, input_ids.shape[1]:]
+        pad_token_id = getattr(getattr(self._model, "generation_config", None), "pad_token_id", None)
+        completion_tokens = int((new_tokens != pad_token_id).sum()) if pad_token_id is not None else int(new_tokens.numel())
+        self._tracker.record(prompt_tokens, completion_tokens, seconds, calls=input_ids.shape[0])
+        return outputs
+
+class _InstrumentedCompletions:
+    def __init__(self, completions, usage_tracker):
+        self._completions = completions
+        self._tracker = usage_tracker
+
+    def __getattr__(self, name):
+        return getattr(self._completions, name)
+
+    def create(self, *args, **kwargs):
+        start = time.time()
+        response = self._completions.create(*args, **kwargs)
+        seconds = time.time() - start
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        input_price, output_price = GPT_PRICES_PER_1M.get(kwargs.get("model"), (0.0, 0.0))
+        cost = (prompt_tokens * input_price + completion_tokens * output_price) / 1e6
+        self._tracker.record(prompt_tokens, completion_tokens, seconds, cost)
+        return response
+
+class _InstrumentedChat:
+    def __init__(self, chat, usage_tracker):
+        self._chat = chat
+        self.completions = _InstrumentedCompletions(chat.completions, usage_tracker)
+
+    def __getattr__(self, name):
+        return getattr(self._chat, name)
+
+class InstrumentedClient:
+    """Wraps an OpenAI client so chat.completions.create() records usage and cost."""
+    def __init__(self, client, usage_tracker=tracker):
+        self._client = client
+        self.chat = _InstrumentedChat(client.chat, usage_tracker)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+def instrument(model_info, usage_tracker=tracker):
+    """Return model_info with usage tracking; the (first, second) shape the agents expect is kept."""
+    first, second = model_info
+    if hasattr(first, 'chat') and hasattr(first.chat, 'completions'):
+        return InstrumentedClient(first, usage_tracker), second
+    return first, InstrumentedModel(second, usage_tracker)
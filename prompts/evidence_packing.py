@@ -0,0 +1,118 @@
+# === Token-budgeted evidence packing ===
+# Templates interpolate `{evidence}` directly. A PackedEvidence renders there as a
+# compact numbered list that fits the token budget of the current turn type, so
+# long evidence lists no longer inflate every prompt of a debate.
+
+DEFAULT_BUDGETS = {
+    "opening": 512,
+    "rebuttal": 256,
+    "closing": 192,
+    "judge": 512,
+    "default": 512,
+}
+
+def parse_budgets(spec):
+    """Parse "opening=400,rebuttal=200,..." into a budget dict on top of DEFAULT_BUDGETS."""
+    budgets = dict(DEFAULT_BUDGETS)
+    if not spec:
+        return budgets
+    for item in spec.split(","):
+        turn, _, value = item.partition("=")
+        if turn.strip() not in budgets:
+            raise ValueError(f"Unknown turn type '{turn.strip()}'. Choose from {sorted(budgets)}")
+        budgets[turn.strip()] = int(value)
+    return budgets
+
+class TokenCounter:
+    """Counts tokens with the active model's tokenizer, caching per sentence."""
+    def __init__(self, model_info=None):
+        self.cache = {}
+        self._encode = self._build_encoder(model_info)
+
+    @staticmethod
+    def _build_encoder(model_info):
+        if model_info is not None and len(model_info) == 2:
+            first, second = model_info
+            if hasattr(first, 'chat') and hasattr(first.chat, 'completions'):
+                try:
+                    import tiktoken
+                    try:
+                        encoding = tiktoken.encoding_for_model(second)
+                    except KeyError:
+                        encoding = tiktoken.get_encoding("cl100k_base")
+                    return lambda texts: [len(ids) for ids in encoding.encode_batch(texts)]
+                except ImportError:
+                    pass
+            else:
+                tokenizer = first
+                return lambda texts: [len(ids) for ids in tokenizer(texts, add_special_tokens=False)["input_ids"]]
+        # Rough fallback: ~4 characters per token
+        return lambda texts: [max(1, len(text) // 4) for text in texts]
+
+    def count_many(self, texts):
+        missing = [text for text in dict.fromkeys(texts) if text not in self.cache]
+        if missing:
+            self.cache.update(zip(missing, self._encode(missing)))
+        return [self.cache[text] for text in texts]
+
+class PackedEvidence:
+    """
+    Evidence for one example, measured once. Items keep their rank-order number
+    in every turn, so an argument citing [3] in the opening still points at the
+    same sentence when the judge sees a smaller budget.
+    """
+    def __init__(self, sentences, token_counts, budgets, turn="default"):
+        self.sentences = sentences
+        self.token_counts = token_counts
+        self.budgets = budgets
+        self.turn = turn
+        self._rendered = {}
+
+    def for_turn(self, turn):
+        view = PackedEvidence(self.sentences, self.token_counts, self.budgets, turn)
+        view._rendered = self._rendered
+        return view
+
+    def selected(self, turn=None):
+        """Numbers (1-based) of the highest-ranked items that fit the turn's budget."""
+        budget = self.budgets.get(turn or self.turn, self.budgets["default"])
+        chosen, used = [], 0
+        for number, count in enumerate(self.token_counts, start=1):
+            # "[n] " prefix and newline cost a few tokens per item
+            cost = count + 4
+            if used + cost > budget:
+                continue
+            chosen.append(number)
+            used += cost
+        return chosen
+
+    def render(self, turn=None):
+        turn = turn or self.turn
+        if turn not in self._rendered:
+            self._rendered[turn] = "\n".join(f"[{n}] {self.sentences[n - 1]}" for n in self.selected(turn))
+        return self._rendered[turn]
+
+    def __str__(self):
+        return self.render()
+
+    def __format__(self, spec):
+        return format(self.render(), spec)
+
+    def __len__(self):
+        return len(self.sentences)
+
+class EvidencePacker:
+    def __init__(self, model_info=None, budgets=None):
+        self.counter = TokenCounter(model_info)
+        self.budgets = budgets or dict(DEFAULT_BUDGETS)
+
+    def pack(self, evidence):
+        """Wrap an example's ranked evidence list (best first)."""
+        sentences = [str(sentence).strip() for sentence in evidence if str(sentence).strip()]
+        return PackedEvidence(sentences, self.counter.count_many(sentences), self.budgets)
+
+def at_turn(evidence, turn):
+    """Evidence view for a turn type; plain lists pass through unchanged."""
+    if isinstance(evidence, PackedEvidence):
+        return evidence.for_turn(turn)
+    return evidence
@@ -0,0 +1,232 @@
+# === Prompt template registry ===
+# Each template is split into static, per-example and per-turn segments so a
+# backend can see which part of a prompt is a reusable prefix. Templates are
+# derived from the existing user_prompt_* functions, so the rendered text is
+# exactly what those functions return. A function that takes structured
+# arguments points at its flat-argument form with a `template` attribute, and
+# fields the function case-folds (e.g. .lower()) carry that transform.
+import re
+import inspect
+import importlib
+from typing import NamedTuple
+
+TEMPLATE_MODULES = [
+    "prompts.templates",
+    "prompts.templates_four",
+    "prompts.templates_four_people",
+    "prompts.templates_party",
+    "prompts.templates_pcj_3",
+    "prompts.templates_people",
+    "prompts.templates_people_3",
+    "prompts.templates_role",
+    "prompts.templates_role_3",
+    "prompts.templates_stance_3",
+]
+
+# Fields that stay fixed for every turn of one example; everything else
+# (opponent arguments, earlier turns) changes per turn.
+EXAMPLE_FIELDS = {
+    "claim", "evidence", "intent", "pro_claim", "con_claim",
+    "support_role", "oppose_role", "domain_specialist",
+}
+
+# Same chat layout as run_model in agents/*.py
+CHAT_HEADER = "<|begin_of_text|><|system|>\n{system}\n<|user|>\n"
+CHAT_FOOTER = "<|assistant|>\n"
+
+SENTINEL = re.compile(r"\x00(\d+)\x00")
+
+# str methods a template may apply to a field; sentinels pass through them unchanged
+TRANSFORMS = ["lower", "upper", "title", "capitalize"]
+
+class Segment(NamedTuple):
+    kind: str   # "static", "example" or "turn"
+    text: str   # literal text for static segments, field name otherwise
+    transform: str = None   # name of the str method applied to the field value
+
+class RenderedPrompt:
+    def __init__(self, segments):
+        self.segments = segments
+        self.text = "".join(text for _, text in segments)
+
+    @property
+    def boundaries(self):
+        """(kind, start, end) character spans of each segment."""
+        spans, start = [], 0
+        for kind, text in self.segments:
+            spans.append((kind, start, start + len(text)))
+            start += len(text)
+        return spans
+
+    @property
+    def static_prefix(self):
+        """Leading text that is identical for every example rendered with this template."""
+        prefix = []
+        for kind, text in self.segments:
+            if kind != "static":
+                break
+            prefix.append(text)
+        return "".join(prefix)
+
+    def token_ids(self, tokenizer, registry=None):
+        """
+        Token ids built segment by segment, with static segments taken from the
+        registry's per-tokenizer cache. Returns (ids, [(kind, start, end)] in tokens).
+        Segment-wise tokenization keeps the static prefix's ids identical across
+        examples, which is what KV-prefix reuse needs.
+        """
+        registry = registry or default_registry()
+        ids, spans = [], []
+        for kind, text in self.segments:
+            piece = registry.static_ids(tokenizer, text) if kind == "static" else encode(tokenizer, text)
+            spans.append((kind, len(ids), len(ids) + len(piece)))
+            ids.extend(piece)
+        return ids, spans
+
+def encode(tokenizer, text):
+    return tokenizer(text, add_special_tokens=False)["input_ids"]
+
+def _apply(value, transform):
+    text = f"{value}"
+    return getattr(text, transform)() if transform else text
+
+class PromptTemplate:
+    def __init__(self, name, fields, segments):
+        self.name = name
+        self.fields = fields
+        self.segments = segments
+
+    @classmethod
+    def from_function(cls, name, fn):
+        """
+        Derive the segment layout of an f-string template function by rendering it
+        with sentinel values. Case transforms of a field are detected by rendering
+        once more with probe values. Raises ValueError if the output is still not
+        a pure interpolation of the arguments. Default-valued arguments take the
+        branch where they are given.
+        """
+        fn = getattr(fn, "template", fn)
+        fields = list(inspect.signature(fn).parameters)
+        rendered = fn(*[f"\x00{i}\x00" for i in range(len(fields))])
+        segments, position = [], 0
+        for match in SENTINEL.finditer(rendered):
+            if match.start() > position:
+                segments.append(Segment("static", rendered[position:match.start()]))
+            field = fields[int(match.group(1))]
+            segments.append(Segment("example" if field in EXAMPLE_FIELDS else "turn", field))
+            position = match.end()
+        if position < len(rendered):
+            segments.append(Segment("static", rendered[position:]))
+
+        probe = [f"Probe{i} value" for i in range(len(fields))]
+        template = cls(name, fields, cls._detect_transforms(segments, dict(zip(fields, probe)), fn(*probe)))
+        if template.render(*probe).text != fn(*probe):
+            raise ValueError(f"{name} is not a pure f-string template")
+        return template
+
+    @staticmethod
+    def _detect_transforms(segments, values, rendered):
+        """Walk the probe rendering and record which transform each field occurrence went through."""
+        detected, position = [], 0
+        for segment in segments:
+            if segment.kind == "static":
+                detected.append(segment)
+                position += len(segment.text)
+                continue
+            for transform in [None] + TRANSFORMS:
+                text = _apply(values[segment.text], transform)
+                if rendered.startswith(text, position):
+                    detected.append(segment._replace(transform=transform))
+                    position += len(text)
+                    break
+            else:
+                return segments  # Leave it to the purity check to reject
+        return detected
+
+    def render(self, *args, **kwargs):
+        values = dict(zip(self.fields, args), **kwargs)
+        return RenderedPrompt([
+            ("static", segment.text) if segment.kind == "static"
+            else (segment.kind, _apply(values[segment.text], segment.transform))
+            for segment in self.segments
+        ])
+
+    def render_chat(self, system_prompt, *args, **kwargs):
+        """Full local-model prompt: the system header and chat markers are static segments too."""
+        body = self.render(*args, **kwargs).segments
+        return RenderedPrompt([("static", CHAT_HEADER.format(system=system_prompt))] + body + [("static", CHAT_FOOTER)])
+
+class TemplateRegistry:
+    def __init__(self):
+        self.templates = {}
+        self.skipped = {}
+        self._static_cache = {}
+
+    def register(self, template):
+        self.templates[template.name] = template
+        return template
+
+    def register_module(self, module_name):
+        module = importlib.import_module(module_name)
+        short_name = module_name.rsplit(".", 1)[-1]
+        for fn_name, fn in inspect.getmembers(module, inspect.isfunction):
+            if fn.__module__ != module.__name__ or "prompt" not in fn_name or fn_name.startswith("get_"):
+                continue
+            name = f"{short_name}.{fn_name}"
+            try:
+                self.register(PromptTemplate.from_function(name, fn))
+            except Exception as e:
+                # Not a pure interpolation, or the template itself is broken
+                self.skipped[name] = f"{type(e).__name__}: {e}"
+
+    def get(self, name):
+        return self.templates[name]
+
+    def __contains__(self, name):
+        return name in self.templates
+
+    def static_ids(self, tokenizer, text):
+        """Token ids of a static segment, computed once per tokenizer. Identical
+        instruction text shared across template modules is tokenized once."""
+        key = (getattr(tokenizer, "name_or_path", None) or id(tokenizer), text)
+        if key not in self._static_cache:
+            self._static_cache[key] = encode(tokenizer, text)
+        return self._static_cache[key]
+
+    def pretokenize(self, tokenizer):
+        """Warm the static-segment cache for every registered template."""
+        for template in self.templates.values():
+            for segment in template.segments:
+                if segment.kind == "static":
+                    self.static_ids(tokenizer, segment.text)
+
+    def stats(self):
+        static = [s.text for t in self.templates.values() for s in t.segments if s.kind == "static"]
+        return {
+            "templates": len(self.templates),
+            "skipped": len(self.skipped),
+            "static_segments": len(static),
+            "distinct_static_segments": len(set(static)),
+            "static_chars": sum(map(len, static)),
+            "distinct_static_chars": sum(map(len, set(static))),
+        }
+
+_default_registry = None
+
+def default_registry():
+    """Registry of every template in prompts/templates*.py, built on first use."""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = TemplateRegistry()
+        for module_name in TEMPLATE_MODULES:
+            _default_registry.register_module(module_name)
+    return _default_registry
+
+if __name__ == "__main__":
+    registry = default_registry()
+    for name, template in sorted(registry.templates.items()):
+        layout = " ".join(s.kind[0].upper() if s.kind == "static" else f"<{s.text}>" for s in template.segments)
+        print(f"{name:<60} prefix={len(template.render(*template.fields).static_prefix):>5} chars  {layout}")
+    for name, reason in registry.skipped.items():
+        print(f"skipped {name}: {reason}")
+    print(registry.stats())
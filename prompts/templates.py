@@ -180,3 +180,47 @@ Your task is to rephrase the claim using a critical, opposing tone that challeng
 Only output the reformulated claim directly, without extra explanations.
 
 Reformulated (Con) Claim:"""
+
+# === Transcript Compaction ===
+def user_prompt_compact_transcript(claim, turns):
+    transcript = "\n\n".join(f"### {label}\n{text}" for label, text in turns.items())
+    return user_prompt_compact_turns(claim, transcript, ", ".join(turns))
+
+def user_prompt_compact_turns(claim, transcript, labels):
+    return f"""Condense each turn of the following debate about a claim.
+
+Claim: "{claim}"
+
+{transcript}
+
+For every turn ({labels}), write one line in exactly this format:
+<turn label>: CLAIMS: <at most two sentences with the points the speaker made> | EVIDENCE: <evidence the speaker cited, or "none">
+
+Only output these lines, one per turn, in the same order."""
+
+# The registry derives the layout from the flat-argument form
+user_prompt_compact_transcript.template = user_prompt_compact_turns
+
+# === Re-judging an unparseable verdict ===
+def user_prompt_rejudge(claim, evidence, transcript, previous_verdict):
+    return f"""You are a neutral judge evaluating a factual debate. A previous judgment of this debate did not state a verdict in the required format.
+
+Claim: {claim}
+
+Evidence:
+{evidence}
+
+{transcript}
+
+--- Previous Judgment (no usable verdict) ---
+{previous_verdict}
+
+Decide whether the claim is TRUE, FALSE, or HALF-TRUE.
+
+Your reply MUST start with exactly one of these three lines, with nothing before it:
+[VERDICT]: TRUE
+[VERDICT]: FALSE
+[VERDICT]: HALF-TRUE
+Then add one line:
+[REASON]: <your justification in at most three sentences>
+"""
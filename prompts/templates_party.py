@@ -86,7 +86,7 @@ Begin your argument with your position. Highlight facts that support the claim a
 
 Do not exceed 150 words."""
 
-def user_prompt_opening_pro(claim, evidence):
+def user_prompt_opening_pro(claim, evidence, role="Democrat"):
     return f"""Evaluate the following claim. Based on your stance as a {role}, either support or oppose the claim. 
 Present your opening argument using the evidence given.
 
@@ -98,7 +98,7 @@ Begin your argument with your position. Highlight facts that support the claim a
 
 Do not exceed 150 words."""
 
-def user_prompt_opening_con(claim, evidence):
+def user_prompt_opening_con(claim, evidence, role="Republican"):
     return f"""Evaluate the following claim. Based on your stance as a {role}, either support or oppose the claim. 
 Present your opening argument using the evidence given.
 
@@ -137,7 +137,7 @@ Write your rebuttal, explaining why you disagree with the opponent and defending
 
 Do not exceed 150 words."""
 
-def user_prompt_rebuttal_pro(claim, evidence, con_argument):
+def user_prompt_rebuttal_pro(claim, evidence, con_argument, role="Democrat"):
     return f"""You are a {role} in a debate about the claim below. Your opponent party has made an argument about the veracity of the claim.
 
 Claim: {claim}
@@ -150,7 +150,7 @@ Write your rebuttal, explaining why you disagree with the opponent and defending
 
 Do not exceed 150 words."""
 
-def user_prompt_rebuttal_con(claim, evidence, pro_argument):
+def user_prompt_rebuttal_con(claim, evidence, pro_argument, role="Republican"):
     return f"""You are a {role} in a debate about the claim below. Your opponent party has made an argument about the veracity of the claim.
 
 Claim: {claim}
@@ -186,7 +186,7 @@ Provide a closing statement reinforcing your position about the claim.
 
 Do not exceed 150 words."""
 
-def user_prompt_closing_pro(claim, evidence):
+def user_prompt_closing_pro(claim, evidence, role="Democrat"):
     return f"""You are the {role} in a political debate about the claim below. Summarize your final position.
 
 Claim: {claim}
@@ -197,7 +197,7 @@ Provide a closing statement reinforcing your position about the claim.
 
 Do not exceed 150 words."""
 
-def user_prompt_closing_con(claim, evidence):
+def user_prompt_closing_con(claim, evidence, role="Republican"):
     return f"""You are the {role} in a political debate about the claim below. Summarize your final position.
 
 Claim: {claim}